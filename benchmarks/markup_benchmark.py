@@ -0,0 +1,88 @@
+"""
+Micro-benchmark of the markdown to ReportLab markup conversion.
+
+Compares `markdown_to_markup` with the regex chain that
+`MOOCFormatter.sanitize_content` used before it, on the content and
+dialogue cells of a storyboard repeated `--scale` times.
+
+Usage:
+    python -m benchmarks.markup_benchmark --scale 200
+"""
+import argparse
+import json
+import re
+import time
+from typing import Callable, Dict, List
+from src.formatters.markup import markdown_to_markup
+
+DEFAULT_INPUT = "example_data/output/chunking_big_cleaned_results.json"
+
+# Cells that once produced markup ReportLab rejects or renders wrongly, with
+# their expected conversion, checked by tests/test_markup.py
+EDGE_CASES = "tests/data/markup_edge_cases.json"
+
+
+def legacy_sanitize_content(content: str) -> str:
+    """The regex chain previously used by `MOOCFormatter.sanitize_content`."""
+    content = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', content)
+    content = re.sub(r'<a.*?>(.*?)</a>', r'\1', content)
+    content = re.sub(r'!\[.*?\]\(.*?\)', '[Image]', content)
+    content = re.sub(r'<img.*?/>', '[Image]', content)
+    content = content.replace('* ', '• ')
+    allowed_tags = ['b', 'i', 'u', 'br']
+    content = re.sub(r'<(?!/?(?:' + '|'.join(allowed_tags) + r')\b)[^>]*>', '', content)
+    return content
+
+
+def load_cells(input_file: str, scale: int) -> List[str]:
+    """Return the content and dialogue cells of a results file and the edge cases, repeated `scale` times."""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    with open(EDGE_CASES, 'r', encoding='utf-8') as f:
+        edge_cases = json.load(f)
+    cells = []
+    for item in results:
+        cells.append(item["result"]["content"])
+        cells.append(item["result"]["dialogue"])
+    cells.extend(edge_cases)
+    return cells * scale
+
+
+def measure(convert: Callable[[str], str], cells: List[str], repeat: int) -> Dict[str, float]:
+    """Convert every cell `repeat` times and report the best run."""
+    total_chars = sum(len(cell) for cell in cells)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for cell in cells:
+            convert(cell)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": round(best, 4),
+        "cells_per_second": round(len(cells) / best, 1),
+        "mb_per_second": round(total_chars / best / 1e6, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown to ReportLab markup conversion")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Storyboard results JSON")
+    parser.add_argument("--scale", type=int, default=200, help="Times the storyboard is repeated")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per converter, the best is reported")
+    args = parser.parse_args()
+
+    cells = load_cells(args.input, args.scale)
+    report = {
+        "cells": len(cells),
+        "characters": sum(len(cell) for cell in cells),
+        "legacy_chain": measure(legacy_sanitize_content, cells, args.repeat),
+        "markdown_to_markup": measure(markdown_to_markup, cells, args.repeat)
+    }
+    report["speedup"] = round(
+        report["legacy_chain"]["seconds"] / report["markdown_to_markup"]["seconds"], 2
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Local stand-ins for the Unstructured and OpenAI APIs, for benchmarks.
+
+Both servers replay the recorded payloads in `example_data`, so the
+pipeline does realistic parsing, chunking and rendering work without
+spending API money. Latency, error rate and rate limiting are configurable.
+"""
+import email
+import gzip
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from pypdf import PdfReader
+
+DEFAULT_PARTITION = "example_data/processed_input/no_chunking.json"
+DEFAULT_RESULTS = "example_data/output/chunking_big_cleaned_results.json"
+
+# Prompt caching as documented by OpenAI: prefixes of at least 1024 tokens,
+# matched in increments of 128 tokens
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT_TOKENS = 128
+
+
+class ServerBehavior:
+    """
+    Latency, failure and rate-limit behaviour of a mock server.
+
+    Rate limiting uses a fixed one-second window: requests beyond
+    `requests_per_second` in the current window get a 429 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        requests_per_second: Optional[float] = None,
+        seed: int = 0
+    ):
+        """
+        Initialize the ServerBehavior.
+
+        Args:
+            latency (float): Seconds added to every response
+            jitter (float): Extra random latency, uniform in [0, jitter] seconds
+            error_rate (float): Fraction of requests answered with a 500
+            requests_per_second (Optional[float]): Requests allowed per second, unlimited if None
+            seed (int): Seed of the random generator, for reproducible runs
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests_per_second = requests_per_second
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.counts = {"requests": 0, "errors": 0, "rate_limited": 0, "bytes_received": 0}
+
+    def admit(self, body_size: int) -> Optional[int]:
+        """
+        Record a request and decide how to answer it.
+
+        Args:
+            body_size (int): Size of the request body in bytes
+
+        Returns:
+            Optional[int]: Status code to fail with, or None to serve the request
+        """
+        with self.lock:
+            self.counts["requests"] += 1
+            self.counts["bytes_received"] += body_size
+            if self.requests_per_second is not None:
+                now = time.monotonic()
+                if now - self.window_start >= 1.0:
+                    self.window_start = now
+                    self.window_count = 0
+                self.window_count += 1
+                if self.window_count > self.requests_per_second:
+                    self.counts["rate_limited"] += 1
+                    return 429
+            failed = self.random.random() < self.error_rate
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        time.sleep(delay)
+        if failed:
+            with self.lock:
+                self.counts["errors"] += 1
+            return 500
+        return None
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return a copy of the request counters."""
+        with self.lock:
+            return dict(self.counts)
+
+
+class EventStream(list):
+    """Response sent as server-sent events, one `data:` line per item."""
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Shared plumbing: body reading, admission and JSON responses."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def read_body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_events(self, events: EventStream, delay: float = 0.0) -> None:
+        # No length is known up front, so the connection is closed after the stream
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for event in events:
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the stream
+            pass
+
+    def do_GET(self) -> None:
+        # Request counters, so a benchmark in another process can attribute requests to stages
+        if self.path == "/_stats":
+            self.send_json(200, self.server.behavior.snapshot())
+        else:
+            self.send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self) -> None:
+        body = self.read_body()
+        status = self.server.behavior.admit(len(body))
+        if status == 429:
+            self.send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit"}}, {"Retry-After": "1"})
+        elif status is not None:
+            self.send_json(status, {"error": {"message": "Injected failure", "type": "server_error"}})
+        else:
+            response = self.server.respond(self, body)
+            if isinstance(response, EventStream):
+                self.send_events(response, getattr(self.server, "chunk_delay", 0.0))
+            else:
+                self.send_json(200, response)
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded HTTP server running in the background on a free local port."""
+
+    daemon_threads = True
+
+    def __init__(self, behavior: Optional[ServerBehavior] = None):
+        super().__init__(("127.0.0.1", 0), _MockHandler)
+        self.behavior = behavior or ServerBehavior()
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def respond(self, handler: BaseHTTPRequestHandler, body: bytes) -> Any:
+        raise NotImplementedError
+
+    def start(self) -> "MockServer":
+        """Serve requests on a daemon thread."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class MockUnstructuredServer(MockServer):
+    """
+    Partition endpoint replaying a recorded no-chunking partition.
+
+    Each page of an uploaded PDF gets the elements of a recorded page,
+    cycling through the recording, with page numbers and element ids
+    rewritten so that they stay unique in longer documents.
+    """
+
+    def __init__(self, partition_path: str = DEFAULT_PARTITION, behavior: Optional[ServerBehavior] = None):
+        """
+        Initialize the MockUnstructuredServer.
+
+        Args:
+            partition_path (str): Recorded output of `process_pdf_no_chunking`
+            behavior (Optional[ServerBehavior]): Latency, errors and rate limits
+        """
+        super().__init__(behavior)
+        with open(partition_path, 'r', encoding='utf-8') as f:
+            elements = json.load(f)
+        self.pages: Dict[int, List[Dict[str, Any]]] = {}
+        for element in elements:
+            self.pages.setdefault(element.get("metadata", {}).get("page_number", 1), []).append(element)
+        self.page_numbers = sorted(self.pages)
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/general/v0/general"
+
+    def respond(self, handler: BaseHTTPRequestHandler, body: bytes) -> List[Dict[str, Any]]:
+        message = email.message_from_bytes(
+            b"Content-Type: " + handler.headers["Content-Type"].encode("latin-1") + b"\r\n\r\n" + body
+        )
+        pdf = next(part for part in message.get_payload() if part.get_filename()).get_payload(decode=True)
+        page_count = len(PdfReader(io.BytesIO(pdf)).pages)
+
+        response = []
+        for page in range(1, page_count + 1):
+            recorded_page = self.page_numbers[(page - 1) % len(self.page_numbers)]
+            for element in self.pages[recorded_page]:
+                element = json.loads(json.dumps(element))
+                element["element_id"] = hashlib.sha256(f"{page}:{element['element_id']}".encode()).hexdigest()[:32]
+                metadata = element.setdefault("metadata", {})
+                metadata["page_number"] = page
+                metadata.pop("parent_id", None)
+                response.append(element)
+        return response
+
+
+class MockOpenAIServer(MockServer):
+    """
+    Chat completions endpoint replaying recorded slides and validations.
+
+    Generation requests get the recorded slides in turn; validation
+    requests (follow-up turns of a generation conversation) get the recorded
+    score and feedback. Usage is reported from the request and response
+    sizes (about four characters per token). Prompt caching is simulated at
+    message boundaries: the longest prefix of schema and messages already
+    seen is reported as `cached_tokens`.
+
+    Streamed requests get the response in chunks of `chunk_size`
+    characters, `chunk_delay` seconds apart, followed by a usage chunk.
+    """
+
+    def __init__(
+        self,
+        results_path: str = DEFAULT_RESULTS,
+        behavior: Optional[ServerBehavior] = None,
+        chunk_size: int = 16,
+        chunk_delay: float = 0.0
+    ):
+        """
+        Initialize the MockOpenAIServer.
+
+        Args:
+            results_path (str): Recorded storyboard results
+            behavior (Optional[ServerBehavior]): Latency, errors and rate limits
+            chunk_size (int): Characters per streamed chunk
+            chunk_delay (float): Seconds between streamed chunks
+        """
+        super().__init__(behavior)
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        with open(results_path, 'r', encoding='utf-8') as f:
+            self.results = [item["result"] for item in json.load(f)]
+        self.next_result = 0
+        self.result_lock = threading.Lock()
+        self.seen_prefixes = set()
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def respond(self, handler: BaseHTTPRequestHandler, body: bytes) -> Dict[str, Any]:
+        request = json.loads(body)
+        with self.result_lock:
+            result = self.results[self.next_result % len(self.results)]
+            self.next_result += 1
+
+        if request["messages"][-1]["role"] == "user" and len(request["messages"]) > 2:
+            content = {"score": result["groundedness_score"], "feedback": result["feedback"]}
+        else:
+            content = {"title": result["title"], "content": result["content"], "dialogue": result["dialogue"]}
+        content = json.dumps(content)
+
+        prompt_tokens, cached_tokens = self.prompt_usage(request)
+        completion_tokens = len(content) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+        if request.get("stream"):
+            return self.stream_chunks(request["model"], content, usage)
+        return {
+            "id": f"chatcmpl-mock-{self.next_result}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    def stream_chunks(self, model: str, content: str, usage: Dict[str, Any]) -> EventStream:
+        """Split a completion into `chat.completion.chunk` events."""
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": "chatcmpl-mock-stream",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+
+        events = EventStream([chunk({"role": "assistant", "content": ""})])
+        for start in range(0, len(content), self.chunk_size):
+            events.append(chunk({"content": content[start:start + self.chunk_size]}))
+        events.append(chunk({}, "stop"))
+        events.append({**chunk({}), "choices": [], "usage": usage})
+        return events
+
+    def prompt_usage(self, request: Dict[str, Any]) -> Tuple[int, int]:
+        """Return the prompt tokens and cached prompt tokens of a request."""
+        # The structured output schema comes before the messages in the prefix
+        schema = json.dumps(request.get("response_format"), sort_keys=True)
+        digest = hashlib.sha256(schema.encode())
+        characters = len(schema)
+        prefixes = []
+        for message in request["messages"]:
+            digest.update(json.dumps(message, sort_keys=True).encode())
+            characters += len(message["content"])
+            prefixes.append((digest.hexdigest(), characters // 4))
+
+        cached_tokens = 0
+        with self.result_lock:
+            for prefix, tokens in prefixes:
+                if prefix in self.seen_prefixes and tokens >= CACHE_MIN_TOKENS:
+                    cached_tokens = tokens - tokens % CACHE_INCREMENT_TOKENS
+                self.seen_prefixes.add(prefix)
+        return prefixes[-1][1], cached_tokens
@@ -0,0 +1,214 @@
+"""
+End-to-end pipeline benchmark against local mock servers.
+
+Runs the `run.py` workload (partition, local chunking and element store,
+slide generation, PDF rendering) over synthetic PDFs of varying count and
+size. Unstructured and OpenAI are replaced by the replaying servers in
+`mock_servers.py`, so runs are free and repeatable. Every workload runs in
+a fresh process, so its peak RSS is its own.
+
+Results are written as JSON: per-stage wall time, requests, requests/sec,
+injected failures and peak RSS, plus the git revision, so runs can be
+compared across versions.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --documents 1 4 --pages 10 50 \\
+        --openai-latency 0.2 --error-rate 0.02 --output benchmarks/results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import requests
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from .mock_servers import MockOpenAIServer, MockUnstructuredServer, ServerBehavior
+
+STAGES = ("processing", "generation", "formatting")
+
+
+def make_pdf(path: str, pages: int) -> None:
+    """Write a text-only PDF with the given number of pages."""
+    pdf = canvas.Canvas(path, pagesize=letter)
+    for page in range(1, pages + 1):
+        pdf.drawString(72, 720, f"Benchmark document {Path(path).stem}, page {page}")
+        pdf.showPage()
+    pdf.save()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is in KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def server_stats(url: str) -> Dict[str, int]:
+    return requests.get(f"{url}/_stats", timeout=10).json()
+
+
+def run_workload(
+    documents: int,
+    pages: int,
+    unstructured: Dict[str, str],
+    openai: Dict[str, str],
+    settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Run one workload in the current process and measure each stage.
+
+    Args:
+        documents (int): Number of PDFs
+        pages (int): Pages per PDF
+        unstructured (Dict[str, str]): "url" and "base_url" of the mock Unstructured server
+        openai (Dict[str, str]): "url" and "base_url" of the mock OpenAI server
+        settings (Dict[str, Any]): Pipeline settings (see `main`)
+
+    Returns:
+        Dict[str, Any]: Workload description and per-stage measurements
+    """
+    # The OpenAI client reads these when the generator creates it
+    os.environ["OPENAI_BASE_URL"] = openai["url"]
+    os.environ["OPENAI_API_KEY"] = "mock"
+    from src.formatters.mooc_formatter import MOOCFormatter
+    from src.generators.presentation_generator import PresentationGenerator
+    from src.processors.unstructured_processor import UnstructuredProcessor
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work = Path(work_dir)
+        pdf_paths = []
+        for i in range(documents):
+            pdf_path = str(work / f"doc{i:04d}.pdf")
+            make_pdf(pdf_path, pages)
+            pdf_paths.append(pdf_path)
+
+        processor = UnstructuredProcessor(
+            "mock",
+            unstructured["url"],
+            pages_per_range=settings["pages_per_range"],
+            max_workers=settings["upload_workers"]
+        )
+        generator = PresentationGenerator(
+            output_dir=str(work / "output"),
+            max_concurrency=settings["concurrency"],
+            stream_generation=settings["stream"]
+        )
+        formatter = MOOCFormatter(output_dir=str(work / "pdf"), rows_per_table=settings["rows_per_table"])
+
+        def processing(pdf_path: str) -> str:
+            stem = Path(pdf_path).stem
+            no_chunking = str(work / f"{stem}_no_chunking.json")
+            chunked = str(work / f"{stem}.json")
+            store = str(work / f"{stem}.elements")
+            processor.process_pdf_no_chunking(pdf_path, no_chunking)
+            processor.chunk_elements(no_chunking, chunked)
+            processor.build_element_store(chunked, store)
+            return store
+
+        stage_functions = {
+            "processing": processing,
+            "generation": generator.run,
+            "formatting": formatter.format_results
+        }
+        stage_servers = {"processing": unstructured, "generation": openai, "formatting": None}
+
+        report = {"documents": documents, "pages": pages, "stages": {}}
+        inputs = pdf_paths
+        total_started = time.monotonic()
+        for stage in STAGES:
+            server = stage_servers[stage]
+            before = server_stats(server["base_url"]) if server else None
+            started = time.monotonic()
+            try:
+                inputs = [stage_functions[stage](path) for path in inputs]
+            except Exception as e:
+                report["error"] = f"{stage}: {type(e).__name__}: {e}"
+                break
+            finally:
+                wall = time.monotonic() - started
+                measured = {"wall_seconds": round(wall, 3), "peak_rss_mb": round(peak_rss_mb(), 1)}
+                if server:
+                    after = server_stats(server["base_url"])
+                    delta = {key: after[key] - before[key] for key in after}
+                    measured.update(delta)
+                    measured["requests_per_second"] = round(delta["requests"] / wall, 2) if wall else 0.0
+                report["stages"][stage] = measured
+        report["total_seconds"] = round(time.monotonic() - total_started, 3)
+        report["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return report
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against local mock servers")
+    parser.add_argument("--documents", type=int, nargs="+", default=[1, 4], help="Document counts to run")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50], help="Pages per document to run")
+    parser.add_argument("--unstructured-latency", type=float, default=0.5, help="Seconds per partition request")
+    parser.add_argument("--openai-latency", type=float, default=0.2, help="Seconds per chat completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--unstructured-rps", type=float, default=None, help="Unstructured requests per second before 429s")
+    parser.add_argument("--openai-rps", type=float, default=None, help="OpenAI requests per second before 429s")
+    parser.add_argument("--concurrency", type=int, default=4, help="Generator max_concurrency")
+    parser.add_argument("--pages-per-range", type=int, default=10, help="Pages per concurrent upload, 0 for whole PDFs")
+    parser.add_argument("--upload-workers", type=int, default=4, help="Concurrent page-range uploads")
+    parser.add_argument("--stream", action="store_true", help="Stream generation responses")
+    parser.add_argument("--rows-per-table", type=int, default=50, help="Formatter rows_per_table")
+    parser.add_argument("--output", default="benchmarks/results.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    settings = {
+        "concurrency": args.concurrency,
+        "pages_per_range": args.pages_per_range or None,
+        "upload_workers": args.upload_workers,
+        "rows_per_table": args.rows_per_table,
+        "stream": args.stream
+    }
+    unstructured_server = MockUnstructuredServer(behavior=ServerBehavior(
+        args.unstructured_latency, args.jitter, args.error_rate, args.unstructured_rps
+    ))
+    openai_server = MockOpenAIServer(behavior=ServerBehavior(
+        args.openai_latency, args.jitter, args.error_rate, args.openai_rps
+    ))
+
+    workloads: List[Dict[str, Any]] = []
+    # A fresh interpreter per workload, so peak RSS is not inherited
+    context = multiprocessing.get_context("spawn")
+    with unstructured_server, openai_server:
+        unstructured = {"url": unstructured_server.url, "base_url": unstructured_server.base_url}
+        openai = {"url": openai_server.url, "base_url": openai_server.base_url}
+        for documents in args.documents:
+            for pages in args.pages:
+                print(f"Running {documents} documents x {pages} pages...")
+                with context.Pool(1) as pool:
+                    report = pool.apply(run_workload, (documents, pages, unstructured, openai, settings))
+                workloads.append(report)
+                print(json.dumps(report))
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "settings": {**settings, **{key: value for key, value in vars(args).items() if key not in ("documents", "pages", "output")}},
+        "workloads": workloads
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of the PDF layouts of `MOOCFormatter`.
+
+Renders the example storyboard repeated up to each slide count with the
+single table (the default), the chunked layout (`rows_per_table`) and
+sections rendered in a process pool (`max_workers`), and reports the render
+time and page count of each.
+
+Usage:
+    python -m benchmarks.render_benchmark --slides 300 1000 3000
+"""
+import argparse
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+from pypdf import PdfReader
+from src.formatters.mooc_formatter import MOOCFormatter
+
+DEFAULT_INPUT = "example_data/output/chunking_big_cleaned_results.json"
+
+
+def load_slides(input_file: str, count: int) -> List[Dict[str, Any]]:
+    """Return the results of a storyboard repeated up to `count` slides."""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    return (results * (count // len(results) + 1))[:count]
+
+
+def measure(formatter: MOOCFormatter, slides: List[Dict[str, Any]], name: str) -> Dict[str, Any]:
+    """Render the slides once and report the time and page count."""
+    start = time.perf_counter()
+    path = formatter.create_pdf(slides, name)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 2),
+        "ms_per_slide": round(1000 * seconds / len(slides), 2),
+        "pages": len(PdfReader(path).pages)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF layouts of MOOCFormatter")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Storyboard results JSON")
+    parser.add_argument("--slides", type=int, nargs="+", default=[300, 1000, 3000], help="Slide counts")
+    parser.add_argument("--rows-per-table", type=int, default=50, help="Slides per table in chunked mode")
+    parser.add_argument("--workers", type=int, default=4, help="Processes rendering sections")
+    parser.add_argument("--slides-per-section", type=int, default=500, help="Slides per section")
+    args = parser.parse_args()
+
+    report = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        layouts = {
+            "single_table": MOOCFormatter(output_dir),
+            "chunked": MOOCFormatter(output_dir, rows_per_table=args.rows_per_table),
+            "sections": MOOCFormatter(
+                output_dir,
+                rows_per_table=args.rows_per_table,
+                slides_per_section=args.slides_per_section,
+                max_workers=args.workers
+            )
+        }
+        for count in args.slides:
+            slides = load_slides(args.input, count)
+            entry = {"slides": count}
+            for name, formatter in layouts.items():
+                entry[name] = measure(formatter, slides, f"{name}_{count}")
+            report.append(entry)
+            print(json.dumps(entry))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,157 @@
 import os
+import argparse
+from pathlib import Path
 from dotenv import load_dotenv
 from src.processors.unstructured_processor import UnstructuredProcessor
 from src.generators.presentation_generator import PresentationGenerator
+from src.generators.routing import ModelRouter
 from src.formatters.mooc_formatter import MOOCFormatter
+from src.utils.cache import ResponseCache
+from src.utils.config import ModelRoute
+from src.utils.metrics import MetricsRegistry
 
 load_dotenv()
 
-def main():
+def main(
+    resume: bool = False,
+    incremental: bool = False,
+    candidates: int = 1,
+    accept_score: float = 8.0,
+    routing: bool = False
+):
+    
+    # One registry for every stage of the run
+    metrics = MetricsRegistry()
     
     # Initialize processor
     api_key = os.getenv("UNSTRUCTURED_API_KEY")
     api_url = os.getenv("UNSTRUCTURED_API_URL")
-    processor = UnstructuredProcessor(api_key, api_url)
+    processor = UnstructuredProcessor(
+        api_key,
+        api_url,
+        pages_per_range=10,
+        max_workers=4,
+        metrics=metrics,
+        # Unchanged PDFs are not partitioned again; UNSTRUCTURED_OFFLINE=1 never calls the API
+        cache=ResponseCache("data/cache/unstructured_responses.db", max_bytes=2 * 1024 * 1024 * 1024, compress=True),
+        offline=os.getenv("UNSTRUCTURED_OFFLINE") == "1"
+    )
     
     # File paths
     pdf_file_path = "data/input/markdown_manual.pdf"
     no_chunking_output = "data/processed_input/no_chunking.json"
     chunking_output = "data/processed_input/chunking_big.json"
     cleaned_output = "data/processed_input/chunking_big_cleaned.json"
+    element_store_output = "data/processed_input/chunking_big.elements"
     no_base64_output = "data/processed_input/no_chunking_no_base64.json"
+    assets_output = "data/processed_input/no_chunking_assets.json"
+    asset_dir = "data/assets"
 
-    # Process without chunking
-    processor.process_pdf_no_chunking(pdf_file_path, no_chunking_output)
+    # When resuming, reuse the processed input of the interrupted run
+    if not (resume and Path(element_store_output).exists()):
+        # Process without chunking; a revised PDF only uploads its changed pages
+        if incremental:
+            processor.process_pdf_incremental(pdf_file_path, no_chunking_output)
+        else:
+            processor.process_pdf_no_chunking(pdf_file_path, no_chunking_output)
 
-    # Process with chunking
-    processor.process_pdf_with_chunking(pdf_file_path, chunking_output)
+        # Chunk by title locally from the same partition
+        processor.chunk_elements(no_chunking_output, chunking_output)
 
-    # Clean orig_elements
-    processor.clean_orig_elements(chunking_output, cleaned_output)
-    
-    # Remove base64 images
-    processor.remove_base64_images(no_chunking_output, no_base64_output)
+        # Index the chunks for the generator; orig_elements stays in a lazily read blob section
+        processor.build_element_store(chunking_output, element_store_output)
+
+        # Clean orig_elements
+        processor.clean_orig_elements(chunking_output, cleaned_output)
+        
+        # Remove base64 images
+        processor.remove_base64_images(no_chunking_output, no_base64_output)
+
+        # Keep the images as deduplicated files referenced from the JSON
+        processor.extract_assets(no_chunking_output, assets_output, asset_dir)
     
     
     
     # Initialize generator
-    generator = PresentationGenerator(output_dir="data/output")
-    
-    # Process input file
-    input_file = "data/processed_input/chunking_big_cleaned.json"  # Replace with your input file path
-    output_file = generator.run(input_file)
-    print(f"Results saved to: {output_file}")
-    
-    
+    # Validation and short chunks go to the small model; each model falls back to the other on 429s
+    router = ModelRouter(
+        [
+            ModelRoute(model="gpt-4o-mini", stages=["validation"]),
+            ModelRoute(model="gpt-4o-mini", stages=["generation"], max_prompt_tokens=1500)
+        ],
+        default_model="gpt-4o",
+        fallback_models=["gpt-4o", "gpt-4o-mini"],
+        metrics=metrics
+    ) if routing else None
+    generator = PresentationGenerator(
+        output_dir="data/output",
+        max_concurrency=4,
+        requests_per_minute=500,
+        tokens_per_minute=30000,
+        cache=ResponseCache("data/cache/llm_responses.db", max_bytes=500 * 1024 * 1024),
+        bypass_cache=os.getenv("BYPASS_LLM_CACHE") == "1",
+        metrics=metrics,
+        candidates=candidates,
+        accept_score=accept_score,
+        router=router
+    )
     
     # Initialize the formatter
-    formatter = MOOCFormatter(output_dir="data/pdf_presentation")
+    formatter = MOOCFormatter(output_dir="data/pdf_presentation", metrics=metrics)
+
+    # Process input file, laying out each slide in the PDF as soon as it is ready
+    input_file = element_store_output  # Replace with your input file path
+    pdf_path = formatter.format_stream(
+        generator.stream_run(input_file, resume=resume, incremental=incremental),
+        f"{Path(input_file).stem}_pdf"
+    )
+    print(f"Results saved to: {generator.results_path(input_file)}")
+    if router is not None:
+        print(f"Routing stats saved to: {router.write_stats('data/output/routing_stats.json')}")
 
-    # Format the results
-    pdf_path = formatter.format_results("data/output/chunking_big_cleaned_results.json")
+    # Timings, request counts and token usage of the whole run
+    metrics.write_report("data/output/metrics_report.json")
+    metrics.write_prometheus("data/output/metrics.prom")
+    for model, usage in metrics.usage_report().items():
+        cost = usage["estimated_cost_usd"]
+        print(f"{model}: {usage['prompt_tokens']} prompt tokens ({usage['cached_ratio']:.0%} cached), "
+              f"{usage['completion_tokens']} completion tokens, "
+              f"estimated cost {'unknown' if cost is None else f'${cost:.4f}'}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate a MOOC storyboard from a PDF")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping slides already in the results checkpoint"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Re-process a revised PDF: partition only changed pages and regenerate only changed chunks"
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=1,
+        help="Slides generated and validated concurrently per chunk, keeping the best scored one"
+    )
+    parser.add_argument(
+        "--accept-score",
+        type=float,
+        default=8.0,
+        help="Groundedness score at which a candidate is accepted and the others are cancelled"
+    )
+    parser.add_argument(
+        "--routing",
+        action="store_true",
+        help="Route validation and short chunks to gpt-4o-mini, falling back between models on 429s"
+    )
+    args = parser.parse_args()
+    main(
+        resume=args.resume,
+        incremental=args.incremental,
+        candidates=args.candidates,
+        accept_score=args.accept_score,
+        routing=args.routing
+    )
\ No newline at end of file
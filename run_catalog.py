@@ -0,0 +1,88 @@
+import os
+import argparse
+from dotenv import load_dotenv
+from src.processors.unstructured_processor import UnstructuredProcessor
+from src.generators.presentation_generator import PresentationGenerator
+from src.formatters.mooc_formatter import MOOCFormatter
+from src.runners.catalog_runner import CatalogRunner
+from src.utils.cache import ResponseCache
+from src.utils.dedup import DuplicateIndex
+from src.utils.metrics import MetricsRegistry
+
+load_dotenv()
+
+def main(args: argparse.Namespace):
+    
+    # One registry for every stage of every document
+    metrics = MetricsRegistry()
+    
+    # Shared by all documents, so the upload pool is sized for concurrent documents
+    processor = UnstructuredProcessor(
+        os.getenv("UNSTRUCTURED_API_KEY"),
+        os.getenv("UNSTRUCTURED_API_URL"),
+        pages_per_range=10,
+        max_workers=4,
+        metrics=metrics,
+        cache=ResponseCache("data/cache/unstructured_responses.db", max_bytes=2 * 1024 * 1024 * 1024, compress=True),
+        offline=os.getenv("UNSTRUCTURED_OFFLINE") == "1"
+    )
+    
+    # One generator for the catalog, so rate limits and the request cap are global
+    generator = PresentationGenerator(
+        output_dir="data/output",
+        max_concurrency=4,
+        requests_per_minute=500,
+        tokens_per_minute=30000,
+        cache=ResponseCache("data/cache/llm_responses.db", max_bytes=500 * 1024 * 1024),
+        bypass_cache=os.getenv("BYPASS_LLM_CACHE") == "1",
+        max_inflight_requests=args.openai_concurrency,
+        metrics=metrics,
+        # Opt-in: chunks repeated across the catalog (boilerplate, shared chapters) reuse their slide
+        dedup_index=DuplicateIndex("data/cache/dedup.db", threshold=args.dedup_threshold) if args.dedup_threshold else None
+    )
+    
+    formatter = MOOCFormatter(output_dir="data/pdf_presentation", rows_per_table=50)
+    
+    runner = CatalogRunner(
+        processor,
+        generator,
+        formatter,
+        processed_dir="data/processed_input",
+        max_documents=args.max_documents,
+        unstructured_concurrency=args.unstructured_concurrency,
+        render_workers=args.render_workers
+    )
+    results = runner.run(args.source, resume=args.resume)
+
+    # Timings, request counts and token usage of the whole run
+    metrics.write_report("data/output/metrics_report.json")
+    metrics.write_prometheus("data/output/metrics.prom")
+    for model, usage in metrics.usage_report().items():
+        cost = usage["estimated_cost_usd"]
+        print(f"{model}: {usage['prompt_tokens']} prompt tokens ({usage['cached_ratio']:.0%} cached), "
+              f"{usage['completion_tokens']} completion tokens, "
+              f"estimated cost {'unknown' if cost is None else f'${cost:.4f}'}")
+    
+    # Non-zero exit status when any document failed
+    return 0 if all(result.status == "completed" for result in results) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate MOOC storyboards for a catalog of PDFs")
+    parser.add_argument("source", help="Directory of PDFs, or a .txt/.json manifest listing them")
+    parser.add_argument("--max-documents", type=int, default=8, help="Documents in flight at the same time")
+    parser.add_argument("--unstructured-concurrency", type=int, default=2, help="Documents uploaded to Unstructured at the same time")
+    parser.add_argument("--openai-concurrency", type=int, default=16, help="OpenAI requests in flight at the same time")
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Off by default. Similarity (0-1) above which a chunk reuses the slide of a near-duplicate instead "
+             "of getting its own; lossy, since chunks that differ slightly share one slide (0.9 is a typical value)"
+    )
+    parser.add_argument("--render-workers", type=int, default=2, help="Processes rendering PDFs")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, reusing processed documents and results checkpoints"
+    )
+    raise SystemExit(main(parser.parse_args()))
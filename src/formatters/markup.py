@@ -0,0 +1,207 @@
+import re
+from typing import List, Match, Tuple
+
+# Inline markdown and HTML, matched in a single left-to-right pass over a
+# whole cell. Earlier alternatives win, so images are tried before links and
+# ***bold italic*** before bold before italic. Every alternative starts with
+# a literal character, which lets the scanner skip plain text without trying
+# them at each position, and none crosses a line break. The last group that
+# closes names the kind of match; a bare "&", "<" or ">" closes none.
+_INLINE = re.compile(
+    r"!\[(?P<image_alt>[^\]\n]*)\]\([^)\n]*\)"
+    r"|\[(?P<link_text>[^\]\n]+)\]\((?P<link_url>[^)\s]+)(?:[ \t]+\"[^\"\n]*\")?\)"
+    r"|<(?i:img)\b(?P<html_image>[^>\n]*)>"
+    r"|<(?i:a)\b[^>\n]*>(?P<html_link_text>.*?)</(?i:a)>"
+    r"|<(?P<tag>(?i:/?[biu]|br[ \t]*/?))>"
+    r"|`(?P<code_text>[^`\n]+)`"
+    r"|\*\*\*(?P<bold_italic_star>\S(?:.*?\S)?)\*\*\*"
+    r"|___(?P<bold_italic_under>\S(?:.*?\S)?)___"
+    r"|\*\*(?P<bold_star>\S(?:.*?\S)?)\*\*"
+    r"|__(?P<bold_under>\S(?:.*?\S)?)__"
+    r"|\*(?P<italic_star>[^\s*](?:[^*\n]*?[^\s*])?)\*"
+    r"|_(?<!\w_)(?P<italic_under>[^\s_](?:[^_\n]*?[^\s_])?)_(?!\w)"
+    r"|&|<|>"
+)
+
+# The start of a line: its indentation and, when the line is a code fence,
+# a heading or a list item, the fence, hashes or list marker
+_BLOCK = re.compile(
+    r"(?P<indent>[ \t]*)(?:"
+    r"(?P<fence>```|~~~)"
+    r"|(?P<heading>#{1,6})[ \t]+"
+    r"|(?P<marker>[-*+]|\d{1,9}[.)])[ \t]+"
+    r")?"
+)
+# First characters of the lines that are more than plain text
+_BLOCK_START = frozenset(" \t`~#-*+0123456789")
+_CLOSING_HASHES = re.compile(r"(?:[ \t]+#+)?[ \t]*$")
+
+_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+
+BULLET = "•"
+INDENT = "&nbsp;" * 4
+CODE_FONT = "Courier"
+
+
+def escape(text: str) -> str:
+    """Escape text for ReportLab paragraph markup."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _inline_match(match: Match) -> str:
+    kind = match.lastgroup
+    if kind is None:
+        return _ESCAPES[match.group()]
+    if kind == "image_alt":
+        alt = match.group("image_alt").strip()
+        return f"[Image: {escape(alt)}]" if alt else "[Image]"
+    if kind == "link_url":
+        url = escape(match.group("link_url")).replace('"', "&quot;")
+        return f'<a href="{url}" color="blue">{inline_markup(match.group("link_text"))}</a>'
+    if kind == "html_image":
+        return "[Image]"
+    if kind == "html_link_text":
+        return inline_markup(match.group("html_link_text"))
+    if kind == "code_text":
+        return f'<font face="{CODE_FONT}">{escape(match.group("code_text"))}</font>'
+    text = inline_markup(match.group(kind))
+    if kind.startswith("bold_italic"):
+        return f"<b><i>{text}</i></b>"
+    if kind.startswith("bold"):
+        return f"<b>{text}</b>"
+    return f"<i>{text}</i>"
+
+
+def inline_markup(text: str) -> str:
+    """
+    Convert inline markdown to ReportLab paragraph markup.
+
+    Handles bold, italic, inline code, links (kept as clickable links) and
+    images (shown as an "[Image]" placeholder). HTML links and images are
+    treated the same way. Every form of <br> becomes <br/>, and <b>, <i>
+    and <u> pass through when they are properly nested and closed within
+    their line; unbalanced ones are escaped like any other markup character,
+    since ReportLab rejects them. No conversion spans a line break, and line
+    breaks are kept as they are.
+
+    Args:
+        text (str): Markdown, one or more lines
+
+    Returns:
+        str: Paragraph markup
+    """
+    # Text without the characters markup starts with only needs escaping
+    if not ("*" in text or "_" in text or "[" in text or "`" in text or "<" in text):
+        return escape(text)
+    if "<" not in text:
+        return _INLINE.sub(_inline_match, text)
+
+    pieces: List[str] = []
+    # Name, piece index and original text of each HTML tag still open on
+    # the current line, and of those left open on earlier lines
+    open_tags: List[Tuple[str, int, str]] = []
+    unclosed: List[Tuple[str, int, str]] = []
+    line_start = 0
+    position = 0
+    for match in _INLINE.finditer(text):
+        pieces.append(text[position:match.start()])
+        position = match.end()
+        if match.lastgroup != "tag":
+            pieces.append(_inline_match(match))
+            continue
+        if open_tags and text.find("\n", line_start, match.start()) != -1:
+            unclosed.extend(open_tags)
+            open_tags = []
+        tag = match.group()
+        name = match.group("tag").lower()
+        if name.startswith("br"):
+            pieces.append("<br/>")
+        elif not name.startswith("/"):
+            if not open_tags:
+                line_start = match.start()
+            open_tags.append((name, len(pieces), tag))
+            pieces.append(f"<{name}>")
+        elif open_tags and open_tags[-1][0] == name[1:]:
+            open_tags.pop()
+            pieces.append(f"</{name[1:]}>")
+        else:
+            pieces.append(escape(tag))
+    for _, index, tag in unclosed + open_tags:
+        pieces[index] = escape(tag)
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+def markdown_to_markup(text: str) -> str:
+    """
+    Convert model-written markdown to ReportLab paragraph markup.
+
+    Inline markup is converted over the whole text with `inline_markup`,
+    which keeps the line breaks, so each converted line lines up with its
+    source line. Lines are then classified as fenced code, heading, list
+    item, blank or text; plain text lines are told apart by their first
+    character alone. Headings become bold lines. Nested list items are
+    indented by nesting level, with bullets for unordered items and the
+    item number for ordered ones. Code blocks keep their source text, line
+    breaks and indentation in a monospace font. Lines are joined with
+    <br/>, collapsing runs of blank lines.
+
+    Args:
+        text (str): Markdown text
+
+    Returns:
+        str: Paragraph markup
+    """
+    lines: List[str] = []
+    list_indents: List[int] = []
+    in_code = False
+    blank = False
+
+    for source, line in zip(text.split("\n"), inline_markup(text).split("\n")):
+        indented = False
+        if source[:1] in _BLOCK_START or in_code:
+            block = _BLOCK.match(source)
+            indent, fence, heading, marker = block.groups()
+            if fence:
+                in_code = not in_code
+                continue
+            if in_code:
+                code = escape(source.rstrip()).replace(" ", "&nbsp;")
+                lines.append(f'<font face="{CODE_FONT}">{code}</font>')
+                blank = False
+                continue
+            # Inline markup never touches the indentation, hashes or list
+            # marker, so the rest of the line starts at the same offset
+            line = line[block.end():].rstrip()
+            if heading:
+                list_indents = []
+                lines.append(f"<b>{_CLOSING_HASHES.sub('', line)}</b>")
+                blank = False
+                continue
+            if marker:
+                width = len(indent.expandtabs(4))
+                while list_indents and width < list_indents[-1]:
+                    list_indents.pop()
+                if not list_indents or width > list_indents[-1]:
+                    list_indents.append(width)
+                bullet = marker if marker[0].isdigit() else BULLET
+                lines.append(f"{INDENT * (len(list_indents) - 1)}{bullet} {line}")
+                blank = False
+                continue
+            indented = bool(indent)
+        else:
+            line = line.rstrip()
+
+        if not line:
+            if lines and not blank:
+                lines.append("")
+            blank = True
+            continue
+        if not indented:
+            list_indents = []
+        lines.append(line)
+        blank = False
+
+    while lines and not lines[-1]:
+        lines.pop()
+    return "<br/>".join(lines)
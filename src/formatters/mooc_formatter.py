@@ -1,39 +1,197 @@
 import json
-from typing import List, Dict, Any
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
-import re
+from pypdf import PdfWriter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.platypus import BaseDocTemplate, Flowable, Frame, PageTemplate, SimpleDocTemplate, Spacer, Table, TableStyle, Paragraph
 from reportlab.lib.units import inch
+from .markup import inline_markup, markdown_to_markup
+from ..utils.metrics import MetricsRegistry
+
+HEADER_ROW = ["Slide Content", "Instructor Dialogue"]
+COLUMN_WIDTHS = [3.25*inch, 3.25*inch]
+PAGE_MARGIN = 72
+# Default padding of a SimpleDocTemplate frame
+FRAME_PADDING = 6
+
+HEADER_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+]
+
+CELL_STYLE = [
+    # Table grid
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    # Cell alignment
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    # Cell padding
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+]
+
+ROW_COLORS = [colors.white, colors.lightgrey]
+
+
+class CellParagraph(Paragraph):
+    """
+    Paragraph that keeps its line breaks when wrapped again at the same width.
+    
+    Tables wrap each cell to measure rows and again when splitting across
+    pages or drawing; line breaking only depends on the width, so repeated
+    wraps reuse the first result.
+    """
+    
+    def wrap(self, availWidth, availHeight):
+        cached = getattr(self, "_wrap_cache", None)
+        # split() drops blPara when it gives up, so the lines must be recomputed
+        if cached is not None and cached[0] == availWidth and hasattr(self, "blPara"):
+            return cached[1]
+        size = super().wrap(availWidth, availHeight)
+        self._wrap_cache = (availWidth, size)
+        return size
+
+
+class SlideTable(Table):
+    """
+    Table that only splits inside a row when the row does not fit on a page.
+    
+    Rows that do not fit under the rows above them move to the next page
+    whole. Only a row taller than a whole page, which can only be placed at
+    the top of a frame, is continued on the next page. The single table and
+    the small tables of the chunked layout split the same way, so both
+    layouts paginate alike.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("splitInRow", 1)
+        super().__init__(*args, **kwargs)
+    
+    def split(self, availWidth, availHeight):
+        # Frame.split sets _frame while asking a flowable to split
+        frame = getattr(self, "_frame", None)
+        if frame is not None and not frame._atTop:
+            self._calc(availWidth, availHeight)
+            return self._splitRows(availHeight, doInRowSplit=False)
+        return super().split(availWidth, availHeight)
+
+
+class _FlowableFeed(list):
+    """
+    Flowable list that ReportLab fills from an iterator while it builds.
+    
+    `BaseDocTemplate.build` consumes its list from the front and checks its
+    length before each flowable; the next flowable is only pulled from the
+    iterator once the list is empty, so the document is laid out as the
+    flowables are produced.
+    """
+    
+    def __init__(self, source: Iterator[Flowable]):
+        super().__init__()
+        self.source = source
+    
+    def __len__(self):
+        if not super().__len__():
+            flowable = next(self.source, None)
+            if flowable is not None:
+                self.append(flowable)
+        return super().__len__()
+
+
+def _render_section(args: Tuple[str, int, List[Dict[str, Any]], int, str]) -> str:
+    """Render one section of a storyboard in a worker process."""
+    output_dir, rows_per_table, items, first_slide, path = args
+    formatter = MOOCFormatter(output_dir, rows_per_table=rows_per_table)
+    formatter.build_chunked(items, path, first_slide)
+    return path
+
 
 class MOOCFormatter:
-    """Class to format MOOC storyboard results into a PDF document."""
+    """
+    Class to format MOOC storyboard results into a PDF document.
     
-    def __init__(self, output_dir: str = "outputs"):
+    By default all slides go into a single table whose header row repeats
+    on every page. At every page break ReportLab rebuilds the rest of a
+    split table, so for large storyboards `rows_per_table` can render the
+    slides as a sequence of small tables instead, with the header drawn by
+    the page template. Both layouts are made of
+    `SlideTable`s and paginate identically: the same slides on the same
+    pages, one header at the top of each page
+    (`python -m benchmarks.render_benchmark` compares their render time).
+    
+    With `max_workers` > 1 the storyboard is also cut into sections of
+    `slides_per_section` slides. The sections are rendered in a process pool
+    and concatenated, each one starting on a new page, so unlike the other
+    layouts the page breaks depend on the section size.
+    """
+    
+    def __init__(
+        self,
+        output_dir: str = "outputs",
+        rows_per_table: Optional[int] = None,
+        slides_per_section: int = 500,
+        max_workers: int = 1,
+        metrics: Optional[MetricsRegistry] = None
+    ):
         """
         Initialize the MOOCFormatter.
         
         Args:
             output_dir (str): Directory where the PDF will be saved
+            rows_per_table (Optional[int]): Slides per table in chunked mode, None for a single table
+            slides_per_section (int): Slides per section rendered in its own process
+            max_workers (int): Processes rendering sections in parallel, 1 to render in-process
+            metrics (Optional[MetricsRegistry]): Registry for render timings. A formatter
+                sent to another process records into its own copy
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.rows_per_table = rows_per_table
+        self.slides_per_section = slides_per_section
+        self.max_workers = max_workers
+        self.metrics = metrics or MetricsRegistry()
         
-        # Create custom styles
-        self.styles = getSampleStyleSheet()
-        self.styles.add(ParagraphStyle(
+        self.styles = self._create_styles()
+
+    def _create_styles(self):
+        """Create the sample stylesheet with the custom cell style."""
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle(
             name='CellStyle',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             leading=14,
             spaceAfter=10
         ))
+        return styles
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Stylesheets cannot be pickled; they are recreated in the receiving process
+        state = self.__dict__.copy()
+        del state["styles"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.styles = self._create_styles()
 
     def sanitize_content(self, content: str) -> str:
         """
-        Sanitize content to be compatible with ReportLab's paragraph parser.
+        Convert markdown content to ReportLab paragraph markup.
+        
+        Uses the single-pass converter in `markup.py`, which handles
+        headings, nested lists, bold/italic, code, links and images, and
+        escapes any other markup so the paragraph parser never fails on it.
         
         Args:
             content (str): Raw content to sanitize
@@ -41,24 +199,7 @@ class MOOCFormatter:
         Returns:
             str: Sanitized content
         """
-        # Replace markdown-style links with simple text
-        content = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', content)
-        
-        # Replace HTML links with simple text
-        content = re.sub(r'<a.*?>(.*?)</a>', r'\1', content)
-        
-        # Remove image tags
-        content = re.sub(r'!\[.*?\]\(.*?\)', '[Image]', content)
-        content = re.sub(r'<img.*?/>', '[Image]', content)
-        
-        # Convert markdown bullet points to simple bullet points
-        content = content.replace('* ', '• ')
-        
-        # Clean up any remaining HTML tags except for basic formatting
-        allowed_tags = ['b', 'i', 'u', 'br']
-        content = re.sub(r'<(?!/?(?:' + '|'.join(allowed_tags) + r')\b)[^>]*>', '', content)
-        
-        return content
+        return markdown_to_markup(content)
         
     def format_slide_content(self, slide_number: int, title: str, content: str) -> str:
         """
@@ -76,12 +217,45 @@ class MOOCFormatter:
         sanitized_content = self.sanitize_content(content)
         
         # Format with slide number, title, and sanitized content
-        return f"<b>Slide {slide_number}:</b> {title}<br/><br/>{sanitized_content}"
+        return f"<b>Slide {slide_number}:</b> {inline_markup(title)}<br/><br/>{sanitized_content}"
+        
+    def slide_rows(self, json_data: List[Dict[str, Any]], first_slide: int = 1) -> List[List[CellParagraph]]:
+        """
+        Build the table rows (content and dialogue cells) of a list of slides.
+        
+        Args:
+            json_data (List[Dict[str, Any]]): List of slide results
+            first_slide (int): Number of the first slide
+            
+        Returns:
+            List[List[CellParagraph]]: One row per slide
+        """
+        rows = []
+        for idx, item in enumerate(json_data, first_slide):
+            result = item["result"]
+            
+            # Format and sanitize slide content
+            formatted_content = self.format_slide_content(
+                idx,
+                result["title"],
+                result["content"]
+            )
+            
+            # Sanitize dialogue content
+            sanitized_dialogue = self.sanitize_content(result["dialogue"])
+            
+            content_cell = CellParagraph(formatted_content, self.styles["CellStyle"])
+            dialogue_cell = CellParagraph(sanitized_dialogue, self.styles["CellStyle"])
+            rows.append([content_cell, dialogue_cell])
+        return rows
         
     def create_pdf(self, json_data: List[Dict[str, Any]], output_filename: str) -> str:
         """
         Create a PDF document from the MOOC storyboard results.
         
+        Entries of failed elements (with an `error` instead of a `result`)
+        are skipped.
+        
         Args:
             json_data (List[Dict[str, Any]]): List of slide results
             output_filename (str): Name of the output PDF file
@@ -91,71 +265,194 @@ class MOOCFormatter:
         """
         # Prepare the output path
         output_path = self.output_dir / f"{output_filename}.pdf"
+        json_data = [item for item in json_data if "result" in item]
+        
+        if self.max_workers > 1 and len(json_data) > self.slides_per_section:
+            self.build_sections(json_data, str(output_path))
+            return str(output_path)
+        if self.rows_per_table and json_data:
+            self.build_chunked(json_data, str(output_path))
+            return str(output_path)
         
         # Create the PDF document
         doc = SimpleDocTemplate(
             str(output_path),
             pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
+            rightMargin=PAGE_MARGIN,
+            leftMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN,
+            bottomMargin=PAGE_MARGIN
         )
         
-        # Prepare the table data
-        table_data = [["Slide Content", "Instructor Dialogue"]]  # Header row
-        
-        # Add content rows
-        for idx, item in enumerate(json_data, 1):
-            result = item["result"]
-            
-            # Format and sanitize slide content
-            formatted_content = self.format_slide_content(
-                idx,
-                result["title"],
-                result["content"]
-            )
-            
-            # Sanitize dialogue content
-            sanitized_dialogue = self.sanitize_content(result["dialogue"])
-            
-            content_cell = Paragraph(formatted_content, self.styles["CellStyle"])
-            dialogue_cell = Paragraph(sanitized_dialogue, self.styles["CellStyle"])
-            table_data.append([content_cell, dialogue_cell])
+        # Header row followed by content rows
+        table_data = [HEADER_ROW] + self.slide_rows(json_data)
         
         # Create the table
-        table = Table(
+        table = SlideTable(
             table_data,
-            colWidths=[3.25*inch, 3.25*inch],
+            colWidths=COLUMN_WIDTHS,
             repeatRows=1  # Repeat header row on each page
         )
         
         # Style the table
-        table.setStyle(TableStyle([
-            # Header styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            # Table grid
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            # Cell alignment
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        table.setStyle(TableStyle(
+            HEADER_STYLE
+            + CELL_STYLE
             # Alternate row colors
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            # Cell padding
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-        ]))
+            + [('ROWBACKGROUNDS', (0, 1), (-1, -1), ROW_COLORS)]
+        ))
         
         # Build the PDF
         doc.build([table])
         
         return str(output_path)
         
+    def build_chunked(self, json_data: List[Dict[str, Any]], output_path: str, first_slide: int = 1) -> None:
+        """
+        Render slides as a sequence of small tables under a page-drawn header.
+        
+        Each table holds `rows_per_table` slides and keeps the alternating
+        row colors of the single-table layout. The header row is drawn at
+        the top of every page by the page template, directly above a frame
+        that is shortened by the header height, so pages are the same as
+        with the single table and its repeated header row.
+        
+        Args:
+            json_data (List[Dict[str, Any]]): List of slide results
+            output_path (str): Path of the PDF file to write
+            first_slide (int): Number of the first slide
+        """
+        rows_per_table = self.rows_per_table or 50
+        doc = self._chunked_doc(output_path)
+        
+        tables = []
+        for start in range(0, len(json_data), rows_per_table):
+            rows = self.slide_rows(json_data[start:start + rows_per_table], first_slide + start)
+            tables.append(self._slide_table(rows, start % 2))
+        
+        doc.build(tables)
+        
+    def _chunked_doc(self, output_path: str) -> BaseDocTemplate:
+        """Create a document whose pages draw the header row above a shortened frame."""
+        page_width, page_height = letter
+        
+        header = Table([HEADER_ROW], colWidths=COLUMN_WIDTHS)
+        header.setStyle(TableStyle(HEADER_STYLE + CELL_STYLE))
+        _, header_height = header.wrap(page_width, page_height)
+        # Same position as the first row of a table at the top of the default frame
+        header_top = page_height - PAGE_MARGIN - FRAME_PADDING
+        
+        def draw_header(canvas, doc):
+            header.drawOn(canvas, PAGE_MARGIN, header_top - header_height)
+        
+        frame = Frame(
+            PAGE_MARGIN,
+            PAGE_MARGIN,
+            page_width - 2 * PAGE_MARGIN,
+            header_top - header_height - PAGE_MARGIN,
+            leftPadding=FRAME_PADDING,
+            rightPadding=FRAME_PADDING,
+            topPadding=0,
+            bottomPadding=FRAME_PADDING
+        )
+        return BaseDocTemplate(
+            output_path,
+            pagesize=letter,
+            pageTemplates=[PageTemplate(id="slides", frames=[frame], onPage=draw_header)]
+        )
+        
+    def _slide_table(self, rows: List[List[CellParagraph]], parity: int) -> Table:
+        """Build a table of slide rows whose first row has the color ROW_COLORS[parity]."""
+        table = SlideTable(rows, colWidths=COLUMN_WIDTHS)
+        # Rotate the row colors so they alternate across table boundaries
+        table.setStyle(TableStyle(
+            CELL_STYLE + [('ROWBACKGROUNDS', (0, 0), (-1, -1), ROW_COLORS[parity:] + ROW_COLORS[:parity])]
+        ))
+        return table
+        
+    def build_sections(self, json_data: List[Dict[str, Any]], output_path: str) -> None:
+        """
+        Render sections of `slides_per_section` slides in a process pool and
+        concatenate them into one PDF.
+        
+        Args:
+            json_data (List[Dict[str, Any]]): List of slide results
+            output_path (str): Path of the PDF file to write
+        """
+        with tempfile.TemporaryDirectory(dir=self.output_dir) as temp_dir:
+            sections = [
+                (
+                    str(self.output_dir),
+                    self.rows_per_table or 50,
+                    json_data[start:start + self.slides_per_section],
+                    start + 1,
+                    os.path.join(temp_dir, f"section_{i:05d}.pdf")
+                )
+                for i, start in enumerate(range(0, len(json_data), self.slides_per_section))
+            ]
+            print(f"Rendering {len(sections)} sections with {self.max_workers} workers...")
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                section_paths = list(executor.map(_render_section, sections))
+            
+            writer = PdfWriter()
+            for path in section_paths:
+                writer.append(path)
+            with open(output_path, 'wb') as f:
+                writer.write(f)
+            writer.close()
+        
+    def format_stream(self, results: Iterable[Dict[str, Any]], output_filename: str) -> str:
+        """
+        Render slide results into a PDF while they are still being produced.
+        
+        Results are consumed one at a time, e.g. from
+        `PresentationGenerator.stream_run`, and each one is laid out as its
+        own table row as soon as it arrives, so pages are completed while
+        later slides are still generating. Once the iterator is exhausted
+        only the last page remains to be finished and saved. The layout is
+        that of `rows_per_table`, whatever its value; `max_workers` does not
+        apply since sections need all slides up front. Entries of failed
+        elements are skipped. Without any result the PDF has a single page
+        with the header, as with `create_pdf`.
+        
+        Args:
+            results (Iterable[Dict[str, Any]]): Result entries in slide order
+            output_filename (str): Name of the output PDF file
+            
+        Returns:
+            str: Path to the generated PDF file
+        """
+        output_path = self.output_dir / f"{output_filename}.pdf"
+        last_result_at = None
+        
+        def tables() -> Iterator[Table]:
+            nonlocal last_result_at
+            index = 0
+            for item in results:
+                if "result" not in item:
+                    continue
+                last_result_at = time.monotonic()
+                yield self._slide_table(self.slide_rows([item], index + 1), index % 2)
+                self.metrics.inc("slides_rendered_total")
+                index += 1
+            if last_result_at is None:
+                # Without slides, still render a page with the header like `create_pdf`
+                yield Spacer(0, 0)
+        
+        try:
+            with self.metrics.span("render_stream"):
+                self._chunked_doc(str(output_path)).build(_FlowableFeed(tables()))
+            if last_result_at is not None:
+                # Time between the last slide and the finished PDF
+                self.metrics.observe("render_tail_seconds", time.monotonic() - last_result_at)
+            
+            print(f"PDF successfully generated at: {output_path}")
+            return str(output_path)
+            
+        except Exception as e:
+            print(f"Error formatting results: {e}")
+            raise
+        
     def format_results(self, input_file: str) -> str:
         """
         Format results from a JSON file into a PDF.
@@ -173,7 +470,9 @@ class MOOCFormatter:
                 
             # Create the PDF
             output_filename = Path(input_file).stem.replace('_results', '_pdf')
-            pdf_path = self.create_pdf(json_data, output_filename)
+            with self.metrics.span("render"):
+                pdf_path = self.create_pdf(json_data, output_filename)
+            self.metrics.inc("slides_rendered_total", sum("result" in item for item in json_data))
             
             print(f"PDF successfully generated at: {pdf_path}")
             return pdf_path
@@ -0,0 +1,142 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import jsonlines
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchJobError(Exception):
+    """Raised when an OpenAI batch job ends without producing output."""
+
+
+class OpenAIBatchRunner:
+    """
+    Class to run chat completion requests through the OpenAI Batch API.
+
+    A batch is written to a JSONL file, uploaded, polled until it reaches a
+    terminal status and its output file is parsed back into responses keyed
+    by `custom_id`.
+    """
+
+    def __init__(self, client: Any, poll_interval: float = 30.0, completion_window: str = "24h"):
+        """
+        Initialize the OpenAIBatchRunner.
+
+        Args:
+            client (Any): OpenAI client (or compatible object exposing files and batches)
+            poll_interval (float): Seconds to wait between status checks
+            completion_window (str): Batch completion window requested from the API
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+
+    def write_requests(self, requests: List[Tuple[str, Dict[str, Any]]], path: Path) -> Path:
+        """
+        Write requests to a Batch API input file.
+
+        Args:
+            requests (List[Tuple[str, Dict[str, Any]]]): Pairs of custom_id and request body
+            path (Path): Path of the JSONL file to write
+
+        Returns:
+            Path: Path of the written file
+        """
+        with jsonlines.open(path, mode='w') as writer:
+            for custom_id, body in requests:
+                writer.write({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": body
+                })
+        return path
+
+    def submit(self, path: Path) -> Any:
+        """
+        Upload a batch input file and create the batch job.
+
+        Args:
+            path (Path): Path of the JSONL input file
+
+        Returns:
+            Any: The created batch object
+        """
+        with open(path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        print(f"Submitted batch {batch.id} from {path}")
+        return batch
+
+    def wait(self, batch: Any) -> Any:
+        """
+        Poll a batch until it reaches a terminal status.
+
+        Args:
+            batch (Any): Batch object returned by submit
+
+        Returns:
+            Any: The batch object in its terminal state
+        """
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            time.sleep(self.poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            print(f"Batch {batch.id} status: {batch.status}")
+        return batch
+
+    def collect(self, batch: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        Download and parse the structured output of a finished batch.
+
+        Requests that failed inside the batch are left out of the result so
+        the caller can decide how to retry them.
+
+        Args:
+            batch (Any): Batch object in a terminal state
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Parsed JSON message content keyed by custom_id
+
+        Raises:
+            BatchJobError: If the batch produced no output file
+        """
+        if not batch.output_file_id:
+            raise BatchJobError(f"Batch {batch.id} ended with status '{batch.status}' and no output")
+
+        responses = {}
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                print(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                continue
+            message = response["body"]["choices"][0]["message"]["content"]
+            responses[record["custom_id"]] = json.loads(message)
+        return responses
+
+    def run(self, requests: List[Tuple[str, Dict[str, Any]]], path: Path) -> Dict[str, Dict[str, Any]]:
+        """
+        Write, submit and wait for a batch, then return its parsed responses.
+
+        Args:
+            requests (List[Tuple[str, Dict[str, Any]]]): Pairs of custom_id and request body
+            path (Path): Path of the JSONL input file to write
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Parsed JSON message content keyed by custom_id
+        """
+        if not requests:
+            return {}
+        self.write_requests(requests, path)
+        batch = self.wait(self.submit(path))
+        return self.collect(batch)
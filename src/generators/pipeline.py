@@ -0,0 +1,232 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Marks the end of a queue's input
+_DONE = object()
+
+
+class StageStats:
+    """Thread-safe counters describing the work done by one pipeline stage."""
+
+    def __init__(self, name: str, workers: int, work_queue: queue.Queue):
+        """
+        Initialize the StageStats.
+
+        Args:
+            name (str): Stage name
+            workers (int): Number of workers in the stage
+            work_queue (queue.Queue): Queue feeding the stage
+        """
+        self.name = name
+        self.workers = workers
+        self.queue = work_queue
+        self.completed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self.lock = threading.Lock()
+
+    def observe_queue(self) -> None:
+        """Record the current depth of the input queue."""
+        depth = self.queue.qsize()
+        with self.lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record(self, seconds: float) -> None:
+        """Record one completed item that took `seconds` of worker time."""
+        with self.lock:
+            self.completed += 1
+            self.busy_seconds += seconds
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Summarize the stage.
+
+        Args:
+            elapsed (float): Wall-clock seconds since the pipeline started
+
+        Returns:
+            Dict[str, Any]: Queue depth, throughput and worker utilization
+        """
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "completed": self.completed,
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "throughput_per_second": self.completed / elapsed if elapsed else 0.0,
+                "utilization": self.busy_seconds / (elapsed * self.workers) if elapsed else 0.0
+            }
+
+
+class SlidePipeline:
+    """
+    Two-stage generate -> validate pipeline connected by bounded queues.
+
+    Generation and validation run on separate worker pools, so element N+1
+    can be generating while element N is validating. The bounded queues
+    apply backpressure: when validation falls behind, generation blocks
+    instead of piling up slides in memory. Per-stage statistics show which
+    stage is the bottleneck: a stage with a full input queue and high
+    utilization is limiting throughput.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[Dict[str, Any]], Any],
+        validate: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+        generation_workers: int = 1,
+        validation_workers: int = 1,
+        queue_size: int = 8
+    ):
+        """
+        Initialize the SlidePipeline.
+
+        Args:
+            generate (Callable): Takes an element and returns its generated slide
+            validate (Callable): Takes an element and its slide and returns the result entry
+            generation_workers (int): Number of generation workers
+            validation_workers (int): Number of validation workers
+            queue_size (int): Capacity of each queue between stages
+        """
+        self.generate = generate
+        self.validate = validate
+        self.generation_queue = queue.Queue(maxsize=queue_size)
+        self.validation_queue = queue.Queue(maxsize=queue_size)
+        self.output_queue = queue.Queue()
+        self.generation_stats = StageStats("generation", generation_workers, self.generation_queue)
+        self.validation_stats = StageStats("validation", validation_workers, self.validation_queue)
+        self.stop = threading.Event()
+        self.started_at = None
+        self.finished_at = None
+        self._remaining_generators = generation_workers
+        self._remaining_validators = validation_workers
+        self._lock = threading.Lock()
+
+    def _feed(self, elements: List[Dict[str, Any]]) -> None:
+        for element in elements:
+            if self.stop.is_set():
+                break
+            self.generation_queue.put(element)
+            self.generation_stats.observe_queue()
+        for _ in range(self.generation_stats.workers):
+            self.generation_queue.put(_DONE)
+
+    def _generation_worker(self) -> None:
+        while True:
+            element = self.generation_queue.get()
+            if element is _DONE:
+                break
+            if self.stop.is_set():
+                continue
+            started = time.perf_counter()
+            try:
+                slide = self.generate(element)
+            except Exception as e:
+                self.stop.set()
+                self.output_queue.put(e)
+                continue
+            self.generation_stats.record(time.perf_counter() - started)
+            self.validation_queue.put((element, slide))
+            self.validation_stats.observe_queue()
+
+        # The last generation worker to finish closes the validation stage
+        with self._lock:
+            self._remaining_generators -= 1
+            last = self._remaining_generators == 0
+        if last:
+            for _ in range(self.validation_stats.workers):
+                self.validation_queue.put(_DONE)
+
+    def _validation_worker(self) -> None:
+        while True:
+            item = self.validation_queue.get()
+            if item is _DONE:
+                break
+            if self.stop.is_set():
+                continue
+            started = time.perf_counter()
+            try:
+                result = self.validate(*item)
+            except Exception as e:
+                self.stop.set()
+                self.output_queue.put(e)
+                continue
+            self.validation_stats.record(time.perf_counter() - started)
+            self.output_queue.put(result)
+
+        with self._lock:
+            self._remaining_validators -= 1
+            last = self._remaining_validators == 0
+        if last:
+            self.output_queue.put(_DONE)
+
+    def run(self, elements: List[Dict[str, Any]], on_result: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Push elements through both stages, handing each result to `on_result`.
+
+        Results are delivered in completion order from the calling thread.
+        If a stage raises, no new work is started, results already in flight
+        are still delivered, and the first error is raised at the end.
+
+        Args:
+            elements (List[Dict[str, Any]]): Elements to process
+            on_result (Callable): Receives each validated result entry
+        """
+        self.started_at = time.perf_counter()
+        threads = [threading.Thread(target=self._feed, args=(elements,), daemon=True)]
+        threads += [
+            threading.Thread(target=self._generation_worker, daemon=True)
+            for _ in range(self.generation_stats.workers)
+        ]
+        threads += [
+            threading.Thread(target=self._validation_worker, daemon=True)
+            for _ in range(self.validation_stats.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        error = None
+        while True:
+            item = self.output_queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                error = error or item
+                continue
+            try:
+                on_result(item)
+            except Exception as e:
+                self.stop.set()
+                error = error or e
+
+        for thread in threads:
+            thread.join()
+        self.finished_at = time.perf_counter()
+
+        if error is not None:
+            raise error
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return per-stage queue depth, throughput and utilization.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics keyed by stage name
+        """
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            stats.name: stats.snapshot(elapsed)
+            for stats in (self.generation_stats, self.validation_stats)
+        }
+
+    def bottleneck(self) -> Optional[str]:
+        """Return the name of the stage with the highest worker utilization."""
+        stats = self.stats()
+        if not any(stage["completed"] for stage in stats.values()):
+            return None
+        return max(stats, key=lambda name: stats[name]["utilization"])
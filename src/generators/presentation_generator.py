@@ -1,22 +1,126 @@
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+import hashlib
 import json
 import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 from pathlib import Path
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
 from pydantic import BaseModel, Field
 import jsonlines
-from ..prompts.gen_prompts import (
-    STORYBOARD_SYSTEM_PROMPT,
-    STORYBOARD_USER_PROMPT_TEMPLATE,
-)
-from ..prompts.val_prompts import (
-    VALIDATION_SYSTEM_PROMPT,
-    VALIDATION_USER_PROMPT_TEMPLATE
-)
+from ..prompts.gen_prompts import STORYBOARD_USER_PROMPT_TEMPLATE
+from ..prompts.shared_prompts import SYSTEM_PROMPT
+from ..prompts.val_prompts import VALIDATION_FOLLOW_UP_PROMPT
+from .batch import BatchJobError, OpenAIBatchRunner
+from ..processors.element_store import ELEMENT_STORE_SUFFIX, ElementStore
+from .pipeline import SlidePipeline
+from .routing import ModelRouter
+from ..utils.cache import ResponseCache
+from ..utils.checkpoint import CheckpointWriter, compact_checkpoint, iter_checkpoint, load_completed_ids
+from ..utils.config import StageConfig
+from ..utils.dedup import DuplicateIndex, DuplicateMatch
+from ..utils.json_stream import FieldBudgetExceeded, JsonFieldStream
+from ..utils.metrics import MetricsRegistry
+from ..utils.rate_limiter import RateLimiter, estimate_tokens
+from ..utils.validators import GroundednessScorer
 
 load_dotenv()
 
+DEFAULT_MODEL = "gpt-4o"
+
+# Rough upper bound of completion tokens per call, used for rate limiting
+COMPLETION_TOKENS_ESTIMATE = 1000
+
+# Sampling temperatures of the extra candidates of speculative generation;
+# the first candidate is always the plain request
+CANDIDATE_TEMPERATURES = (0.7, 1.0, 1.2)
+
+SLIDE_CONTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {
+            "type": "string",
+            "description": "The title of the slide"
+        },
+        "content": {
+            "type": "string",
+            "description": "The content that will appear on the slide, including overview and bullet points"
+        },
+        "dialogue": {
+            "type": "string",
+            "description": "The instructor's dialogue for this slide"
+        }
+    },
+    "required": ["title", "content", "dialogue"],
+    "additionalProperties": False
+}
+
+SLIDE_VALIDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {
+            "type": "number",
+            "description": "Groundedness score from 0 to 10"
+        },
+        "feedback": {
+            "type": "string",
+            "description": "Detailed feedback on title accuracy, content alignment, and dialogue appropriateness"
+        }
+    },
+    "required": ["score", "feedback"],
+    "additionalProperties": False
+}
+
+SLIDE_CONTENT_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "slide_content",
+        "schema": SLIDE_CONTENT_SCHEMA,
+        "strict": True
+    }
+}
+
+SLIDE_VALIDATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "slide_validation",
+        "schema": SLIDE_VALIDATION_SCHEMA,
+        "strict": True
+    }
+}
+
+
+def check_response(response: Dict[str, Any], response_format: Dict[str, Any], stage: str) -> None:
+    """
+    Check that a parsed response has every field its structured output format requires.
+    
+    Args:
+        response (Dict[str, Any]): Parsed JSON response
+        response_format (Dict[str, Any]): Structured output format of the request
+        stage (str): Stage of the request, used in the error message
+        
+    Raises:
+        ValueError: If the response is not an object or lacks a required field
+    """
+    required = response_format["json_schema"]["schema"]["required"]
+    missing = [field for field in required if not isinstance(response, dict) or field not in response]
+    if missing:
+        raise ValueError(f"{stage.capitalize()} response is missing {', '.join(missing)}: {str(response)[:200]}")
+
+
+class CandidateCancelled(Exception):
+    """Raised in a candidate request abandoned because another candidate was accepted."""
+
+
+def source_hash(text: str) -> str:
+    """Hash of an element's source text, used to recognise unchanged chunks across revisions."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 class SlideResult(BaseModel):
     """Model for the final slide result including validation."""
     title: str
@@ -24,6 +128,56 @@ class SlideResult(BaseModel):
     dialogue: str
     groundedness_score: float
     feedback: str
+    validated_by: str = "llm"
+    duplicate_of: Optional[str] = None
+    duplicate_similarity: Optional[float] = None
+    model: Optional[str] = None
+
+
+class _NotifyingWriter:
+    """Checkpoint writer wrapper calling `on_write` after each record is written."""
+
+    def __init__(self, writer: CheckpointWriter, on_write: Callable[[Dict[str, Any]], None]):
+        self.writer = writer
+        self.on_write = on_write
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.writer.write(record)
+        self.on_write(record)
+
+
+class _OrderedRelease:
+    """Checkpoint writer wrapper passing records to `on_result` in element order."""
+
+    def __init__(
+        self,
+        writer: CheckpointWriter,
+        element_ids: Iterable[str],
+        on_result: Callable[[Dict[str, Any]], None]
+    ):
+        self.writer = writer
+        self.order = list(element_ids)
+        self.next = 0
+        self.buffer: Dict[str, Dict[str, Any]] = {}
+        self.on_result = on_result
+        self.lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.writer.write(record)
+        self.release(record)
+
+    def release(self, record: Dict[str, Any]) -> None:
+        """Pass on a record, once every record before it has been passed on."""
+        with self.lock:
+            self.buffer[record['element_id']] = record
+            while self.next < len(self.order) and self.order[self.next] in self.buffer:
+                self.on_result(self.buffer.pop(self.order[self.next]))
+                self.next += 1
+
+
+# Marks the end of the results of `stream_run`
+_DONE = object()
+
 
 class PresentationGenerator:
     """
@@ -33,69 +187,466 @@ class PresentationGenerator:
     1. Generating slides from source content
     2. Validating the generated content for groundedness
     3. Saving the results with validation scores
+    
+    Documents can also be processed offline through the OpenAI Batch API
+    with `run_batch`, which trades latency for throughput and lower cost.
+    
+    Elements can be processed concurrently on a thread pool, bounded by
+    `max_concurrency` and by request/token rate limits. Results are always
+    saved in the original element order.
     """
     
-    def __init__(self, output_dir: str = "outputs"):
+    def __init__(
+        self,
+        output_dir: str = "outputs",
+        model: str = DEFAULT_MODEL,
+        max_concurrency: int = 1,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        cache: Optional[ResponseCache] = None,
+        bypass_cache: bool = False,
+        checkpoint_fsync_every: int = 10,
+        generation_stage: Optional[StageConfig] = None,
+        validation_stage: Optional[StageConfig] = None,
+        prescorer: Optional[GroundednessScorer] = None,
+        max_inflight_requests: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        stream_generation: bool = False,
+        field_budgets: Optional[Dict[str, int]] = None,
+        on_slide_field: Optional[Callable[[str, str, str], None]] = None,
+        dedup_index: Optional[DuplicateIndex] = None,
+        candidates: int = 1,
+        accept_score: Optional[float] = None,
+        candidate_temperatures: Tuple[float, ...] = CANDIDATE_TEMPERATURES,
+        router: Optional[ModelRouter] = None
+    ):
         """
         Initialize the PresentationGenerator.
         
         Args:
             output_dir (str): Directory where output files will be saved
+            model (str): OpenAI model used for generation and validation
+            max_concurrency (int): Number of elements processed in parallel
+            requests_per_minute (Optional[float]): Request rate limit, unlimited if None
+            tokens_per_minute (Optional[float]): Token rate limit, unlimited if None
+            cache (Optional[ResponseCache]): Cache for API responses, disabled if None
+            bypass_cache (bool): Skip cache lookups but still store fresh responses
+            checkpoint_fsync_every (int): Results written between fsyncs of the checkpoint
+            generation_stage (Optional[StageConfig]): Workers and limits of the generation stage
+            validation_stage (Optional[StageConfig]): Workers and limits of the validation stage
+            prescorer (Optional[GroundednessScorer]): Local scorer deciding which slides need LLM validation
+            max_inflight_requests (Optional[int]): Cap on concurrent API calls across all
+                runs sharing this generator, unlimited if None
+            metrics (Optional[MetricsRegistry]): Registry for request latency, rate-limit
+                waits, cache hits and token usage
+            stream_generation (bool): Stream generation responses and parse them incrementally
+            field_budgets (Optional[Dict[str, int]]): Maximum characters per slide field
+                ("title", "content", "dialogue") when streaming; a longer field cancels
+                the request with `FieldBudgetExceeded`
+            on_slide_field (Optional[Callable[[str, str, str], None]]): Called with the
+                element_id, field name and value of each slide field as soon as it is
+                complete, e.g. for progress display or a live preview
+            dedup_index (Optional[DuplicateIndex]): Index of already generated chunks;
+                near-duplicate chunks reuse their slide instead of calling the API
+            candidates (int): Slides generated and validated concurrently per element,
+                keeping the one with the highest groundedness score
+            accept_score (Optional[float]): Score at which a candidate is accepted
+                right away and the remaining ones are cancelled; if None, every
+                candidate is validated
+            candidate_temperatures (Tuple[float, ...]): Temperatures of the candidates
+                after the first, each also sent with its own seed
+            router (Optional[ModelRouter]): Picks the model of each request, falling back
+                to another model on 429s; every request uses `model` if None
+        
+        Setting either stage config runs `run` as a pipeline with separate
+        generation and validation worker pools instead of one pool that
+        processes whole elements. A prescorer takes precedence: it scores the
+        slides of each window of elements in one vectorized pass.
+        Multiple candidates replace the single generate+validate round trip of
+        `process_element`, so they apply to neither of those modes.
         """
         self.client = OpenAI()
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.checkpoint_fsync_every = checkpoint_fsync_every
+        self.pipelined = generation_stage is not None or validation_stage is not None
+        self.stage_configs = {
+            "generation": generation_stage or StageConfig(),
+            "validation": validation_stage or StageConfig()
+        }
+        self.stage_rate_limiters = {
+            stage: RateLimiter(config.requests_per_minute, config.tokens_per_minute)
+            for stage, config in self.stage_configs.items()
+        }
+        self.pipeline_stats = None
+        self.prescorer = prescorer
+        self.request_slots = threading.BoundedSemaphore(max_inflight_requests) if max_inflight_requests else None
+        self.metrics = metrics or MetricsRegistry()
+        self.stream_generation = stream_generation
+        self.field_budgets = field_budgets
+        self.on_slide_field = on_slide_field
+        self.dedup_index = dedup_index
+        self.candidates = candidates
+        self.accept_score = accept_score
+        self.candidate_temperatures = candidate_temperatures
+        self.router = router
+        if router is not None and router.metrics is None:
+            router.metrics = self.metrics
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate_slide(self, text: str) -> Dict[str, str]:
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Dict[str, Any],
+        stage: str,
+        parser: Optional[JsonFieldStream] = None,
+        options: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
+        """Send a chat completion request and parse its JSON, see `_complete_with_model`."""
+        return self._complete_with_model(messages, response_format, stage, parser, options, cancel)[0]
+
+    def _complete_with_model(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Dict[str, Any],
+        stage: str,
+        parser: Optional[JsonFieldStream] = None,
+        options: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Tuple[Dict[str, Any], str]:
         """
-        Generate a single slide with title, content and dialogue using GPT-4.
+        Send a structured-output chat completion request and parse its JSON.
+        
+        Every API call goes through this method so that it is subject to the
+        configured rate limits, both the global ones and those of its stage,
+        and to the cap on in-flight requests, and is recorded in `metrics`.
+        Responses are cached under a hash of the model,
+        the messages and the response format, so identical requests are only
+        paid for once.
+        
+        With a `router` the request goes to the models it picks, each tried in
+        turn while the previous one answers with a 429. The response is cached
+        under the model that answered it, and looked up under every model the
+        router may send the request to, in route order, so a response served
+        by a fallback is still found on the next run and keeps its model.
+        
+        With a parser the response is streamed through it as it arrives;
+        cached responses are fed to it whole, so its callbacks always run.
+        A request with a `cancel` event is streamed too, so that setting the
+        event stops it at the next chunk instead of waiting for the response.
+        
+        Args:
+            messages (List[Dict[str, str]]): Chat messages to send
+            response_format (Dict[str, Any]): Structured output format
+            stage (str): Stage the request belongs to, "generation" or "validation"
+            parser (Optional[JsonFieldStream]): Incremental parser of a streamed response
+            options (Optional[Dict[str, Any]]): Extra request parameters, e.g. temperature and seed
+            cancel (Optional[threading.Event]): Event abandoning the request once set
+            
+        Returns:
+            Tuple[Dict[str, Any], str]: Parsed JSON response and the model that
+                answered it, also when it was served from the cache
+            
+        Raises:
+            FieldBudgetExceeded: If the parser cancels a streamed response
+            CandidateCancelled: If `cancel` is set before the response is complete
+            RateLimitError: If the last model to try is rate limited
+            ValueError: If the response lacks a field required by `response_format`
+        """
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        candidates = self.router.candidates(stage, prompt_tokens) if self.router is not None else [self.model]
+        for model in candidates:
+            cached = self._cache_lookup(self._cache_key(messages, response_format, options, model))
+            if cached is not None:
+                self.metrics.inc("llm_cache_hits_total", stage=stage)
+                if parser is not None:
+                    parser.feed(json.dumps(cached, ensure_ascii=False))
+                return cached, model
+        
+        started = time.monotonic()
+        self.rate_limiter.acquire(prompt_tokens + COMPLETION_TOKENS_ESTIMATE)
+        self.stage_rate_limiters[stage].acquire(prompt_tokens + COMPLETION_TOKENS_ESTIMATE)
+        self.metrics.observe("rate_limit_wait_seconds", time.monotonic() - started, stage=stage)
+        
+        models = self.router.choose(stage, prompt_tokens) if self.router is not None else [self.model]
+        for attempt, model in enumerate(models):
+            fallback = models[attempt + 1] if attempt + 1 < len(models) else None
+            try:
+                content = self._send(model, messages, response_format, stage, parser, options, cancel, fallback)
+                break
+            except RateLimitError:
+                if self.router is None:
+                    raise
+                self.router.record_rate_limited(model, stage, fallback)
+                if fallback is None:
+                    raise
+                print(f"{model} is rate limited, falling back to {fallback}")
+        
+        parsed = json.loads(content)
+        check_response(parsed, response_format, stage)
+        cache_key = self._cache_key(messages, response_format, options, model)
+        if cache_key is not None:
+            self.cache.set_json(cache_key, parsed)
+        return parsed, model
+
+    def _send(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        response_format: Dict[str, Any],
+        stage: str,
+        parser: Optional[JsonFieldStream],
+        options: Optional[Dict[str, Any]],
+        cancel: Optional[threading.Event],
+        fallback: Optional[str]
+    ) -> str:
+        """
+        Send one request to one model and return the response text.
+        
+        When another model can take over, the client's own retries are
+        disabled so that a 429 reaches the caller right away.
+        
+        Args:
+            model (str): Model to send the request to
+            messages (List[Dict[str, str]]): Chat messages to send
+            response_format (Dict[str, Any]): Structured output format
+            stage (str): Stage the request belongs to
+            parser (Optional[JsonFieldStream]): Incremental parser of a streamed response
+            options (Optional[Dict[str, Any]]): Extra request parameters
+            cancel (Optional[threading.Event]): Event abandoning the request once set
+            fallback (Optional[str]): Model tried next if this one is rate limited
+            
+        Returns:
+            str: Response content
+        """
+        if self.router is not None:
+            self.router.acquire(model, sum(estimate_tokens(message["content"]) for message in messages))
+        client = self.client if fallback is None else self.client.with_options(max_retries=0)
+        
+        with self.request_slots or nullcontext():
+            if cancel is not None and cancel.is_set():
+                raise CandidateCancelled()
+            self.metrics.inc("llm_requests_total", stage=stage)
+            started = time.monotonic()
+            with self.metrics.span("llm_request", stage=stage):
+                if parser is None and cancel is None:
+                    response = client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                        **(options or {})
+                    )
+                    content, usage = response.choices[0].message.content, response.usage
+                else:
+                    content, usage = self._stream(client, model, messages, response_format, stage, parser, options, cancel)
+            if self.router is not None:
+                self.router.record_request(model, stage, time.monotonic() - started)
+        self.metrics.record_usage(usage, model, stage=stage)
+        return content
+
+    def _stream(
+        self,
+        client: OpenAI,
+        model: str,
+        messages: List[Dict[str, str]],
+        response_format: Dict[str, Any],
+        stage: str,
+        parser: Optional[JsonFieldStream],
+        options: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Tuple[str, Any]:
+        """
+        Stream a chat completion, optionally through an incremental parser.
+        
+        If the parser raises or `cancel` is set, the stream is closed so the
+        provider stops generating; the tokens of a cancelled response are
+        not reported.
+        
+        Args:
+            client (OpenAI): Client to send the request with
+            model (str): Model to send the request to
+            messages (List[Dict[str, str]]): Chat messages to send
+            response_format (Dict[str, Any]): Structured output format
+            stage (str): Stage the request belongs to
+            parser (Optional[JsonFieldStream]): Parser fed with every content delta
+            options (Optional[Dict[str, Any]]): Extra request parameters
+            cancel (Optional[threading.Event]): Event abandoning the stream once set
+            
+        Returns:
+            Tuple[str, Any]: Complete response text and its usage
+        """
+        started = time.monotonic()
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            stream=True,
+            stream_options={"include_usage": True},
+            **(options or {})
+        )
+        pieces = []
+        usage = None
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    raise CandidateCancelled()
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if not pieces:
+                    self.metrics.observe("llm_first_token_seconds", time.monotonic() - started, stage=stage)
+                pieces.append(delta)
+                if parser is not None:
+                    parser.feed(delta)
+        except (FieldBudgetExceeded, CandidateCancelled) as e:
+            stream.close()
+            reason = "budget" if isinstance(e, FieldBudgetExceeded) else "candidate"
+            self.metrics.inc("llm_streams_cancelled_total", stage=stage, reason=reason)
+            raise
+        return "".join(pieces), usage
+
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None
+    ) -> Optional[str]:
+        """Return the cache key of a request, or None when caching is disabled."""
+        if self.cache is None:
+            return None
+        model = model or self.model
+        if options:
+            return ResponseCache.make_key(model, messages, response_format, options)
+        return ResponseCache.make_key(model, messages, response_format)
+
+    def _cache_lookup(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a cached response, or None on a miss or when the cache is bypassed."""
+        if cache_key is None or self.bypass_cache:
+            return None
+        return self.cache.get_json(cache_key)
+
+    def _request_body(self, messages: List[Dict[str, str]], response_format: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the chat completion request body used in batch input files."""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "response_format": response_format
+        }
+
+    def generation_messages(self, text: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages used to generate a slide.
+        
+        The system prompt is the same for every request and the source text
+        comes right after it, so these messages are also the leading segment
+        of the validation conversation (see `prompts/shared_prompts.py`).
         
         Args:
             text (str): Source text to create slide from
             
         Returns:
-            Dict[str, str]: Dictionary containing slide title, content and dialogue
+            List[Dict[str, str]]: System and user messages
         """
         # Format the user prompt with the provided text
         user_prompt = STORYBOARD_USER_PROMPT_TEMPLATE.format(text=text)
         
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": STORYBOARD_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "slide_content",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "title": {
-                                "type": "string",
-                                "description": "The title of the slide"
-                            },
-                            "content": {
-                                "type": "string",
-                                "description": "The content that will appear on the slide, including overview and bullet points"
-                            },
-                            "dialogue": {
-                                "type": "string",
-                                "description": "The instructor's dialogue for this slide"
-                            }
-                        },
-                        "required": ["title", "content", "dialogue"],
-                        "additionalProperties": False
-                    },
-                    "strict": True
-                }
-            }
-        )
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def validation_messages(self, text: str, slide_title: str, slide_content: str, slide_dialogue: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages used to validate a slide.
         
-        return json.loads(response.choices[0].message.content)
+        Validation is a follow-up turn of the generation conversation: the
+        generation messages, the slide as the assistant's answer, then the
+        validation guidelines and request. The generation messages are a
+        prefix of the validation messages, so the source text can be served
+        from the provider's prompt cache instead of being processed again.
+        
+        Args:
+            text (str): Original source text
+            slide_title (str): Generated slide title
+            slide_content (str): Generated slide content
+            slide_dialogue (str): Generated instructor dialogue
+            
+        Returns:
+            List[Dict[str, str]]: Generation messages followed by the slide and the validation request
+        """
+        # The slide as the model returned it in the generation turn
+        slide = {"title": slide_title, "content": slide_content, "dialogue": slide_dialogue}
+        
+        return self.generation_messages(text) + [
+            {"role": "assistant", "content": json.dumps(slide, ensure_ascii=False)},
+            {"role": "user", "content": VALIDATION_FOLLOW_UP_PROMPT}
+        ]
 
-    def validate_slide(self, text: str, slide_title: str, slide_content: str, slide_dialogue: str) -> Dict[str, Any]:
+    def generate_slide(
+        self,
+        text: str,
+        on_field: Optional[Callable[[str, str], None]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Dict[str, str]:
+        """
+        Generate a single slide with title, content and dialogue using GPT-4.
+        
+        With `stream_generation` the response is parsed as it arrives:
+        `on_field` gets the title and content while the dialogue is still
+        being generated, and a field longer than its `field_budgets` entry
+        cancels the request.
+        
+        Args:
+            text (str): Source text to create slide from
+            on_field (Optional[Callable[[str, str], None]]): Called with the name and
+                value of each slide field once it is complete (streaming only)
+            options (Optional[Dict[str, Any]]): Extra request parameters, e.g. temperature and seed
+            cancel (Optional[threading.Event]): Event abandoning the request once set
+            
+        Returns:
+            Dict[str, str]: Dictionary containing slide title, content and dialogue,
+                and with a `router` the model that generated it
+            
+        Raises:
+            FieldBudgetExceeded: If a streamed field exceeds its budget
+            CandidateCancelled: If `cancel` is set before the slide is complete
+        """
+        parser = JsonFieldStream(on_field, self.field_budgets) if self.stream_generation else None
+        slide, model = self._complete_with_model(
+            self.generation_messages(text),
+            SLIDE_CONTENT_FORMAT,
+            "generation",
+            parser,
+            options,
+            cancel
+        )
+        if self.router is not None:
+            return {**slide, "model": model}
+        return slide
+
+    def _field_callback(self, element_id: str) -> Optional[Callable[[str, str], None]]:
+        """Bind `on_slide_field` to an element, or None when it is not set."""
+        if self.on_slide_field is None:
+            return None
+        return lambda field, value: self.on_slide_field(element_id, field, value)
+
+    def validate_slide(
+        self,
+        text: str,
+        slide_title: str,
+        slide_content: str,
+        slide_dialogue: str,
+        cancel: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
         """
         Validate the groundedness of generated content against source material.
         
@@ -104,51 +655,221 @@ class PresentationGenerator:
             slide_title (str): Generated slide title
             slide_content (str): Generated slide content
             slide_dialogue (str): Generated instructor dialogue
+            cancel (Optional[threading.Event]): Event abandoning the request once set
             
         Returns:
             Dict[str, Any]: Validation results including score and feedback
+            
+        Raises:
+            CandidateCancelled: If `cancel` is set before the validation is complete
         """
-        # Format the user prompt with all required content
-        user_prompt = VALIDATION_USER_PROMPT_TEMPLATE.format(
-            text=text,
-            slide_title=slide_title,
-            slide_content=slide_content,
-            slide_dialogue=slide_dialogue
+        return self._complete(
+            self.validation_messages(text, slide_title, slide_content, slide_dialogue),
+            SLIDE_VALIDATION_FORMAT,
+            "validation",
+            cancel=cancel
         )
+
+    def process_element(self, element: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate and validate the slide for a single input element.
         
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": VALIDATION_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "slide_validation",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "score": {
-                                "type": "number",
-                                "description": "Groundedness score from 0 to 10"
-                            },
-                            "feedback": {
-                                "type": "string",
-                                "description": "Detailed feedback on title accuracy, content alignment, and dialogue appropriateness"
-                            }
-                        },
-                        "required": ["score", "feedback"],
-                        "additionalProperties": False
-                    },
-                    "strict": True
-                }
-            }
+        Args:
+            element (Dict[str, Any]): Input element with element_id and text
+            
+        Returns:
+            Dict[str, Any]: Result entry with element_id and the slide result, or
+                a failed entry (see `failed_result`) when the slide exceeds its field budget
+        """
+        if self.candidates > 1:
+            return self._process_candidates(element)
+
+        # Generate slide
+        print(f"Generating slide for element {element['element_id']}...")
+        try:
+            slide = self.generate_slide(element['text'], self._field_callback(element['element_id']))
+        except FieldBudgetExceeded as e:
+            return self.failed_result(element['element_id'], "field_budget", str(e))
+        
+        # Validate slide
+        print(f"Validating slide for element {element['element_id']}...")
+        validation = self.validate_slide(
+            element['text'],
+            slide['title'],
+            slide['content'],
+            slide['dialogue']
+        )
+        
+        return self.build_result(element['element_id'], slide, validation)
+
+    def _candidate_options(self, index: int) -> Optional[Dict[str, Any]]:
+        """Sampling options of a candidate; the first one is the plain request."""
+        if index == 0:
+            return None
+        temperature = self.candidate_temperatures[(index - 1) % len(self.candidate_temperatures)]
+        return {"temperature": temperature, "seed": index}
+
+    def _process_candidates(self, element: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate several candidate slides for an element and keep the best validated one.
+        
+        Candidates are generated concurrently, each with its own sampling
+        options, and each is validated as soon as it is generated, so the
+        element takes about one generate+validate round trip. The candidate
+        with the highest groundedness score wins, ties going to the earlier
+        one. Once a candidate reaches `accept_score`, the others are
+        cancelled: queued requests never start and streamed ones are closed.
+        A failed candidate is skipped unless every candidate fails; when they
+        all exceed their field budget the element is recorded as failed.
+        
+        Args:
+            element (Dict[str, Any]): Input element with element_id and text
+            
+        Returns:
+            Dict[str, Any]: Result entry with element_id and the selected slide
+        """
+        element_id = element['element_id']
+        cancel = threading.Event()
+
+        def candidate(index: int) -> Tuple[Dict[str, str], Dict[str, Any]]:
+            slide = self.generate_slide(element['text'], options=self._candidate_options(index), cancel=cancel)
+            validation = self.validate_slide(
+                element['text'],
+                slide['title'],
+                slide['content'],
+                slide['dialogue'],
+                cancel=cancel
+            )
+            return slide, validation
+
+        print(f"Generating {self.candidates} candidate slides for element {element_id}...")
+        executor = ThreadPoolExecutor(max_workers=self.candidates)
+        futures = {executor.submit(candidate, index): index for index in range(self.candidates)}
+        pending = set(futures)
+        best = None
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=futures.get):
+                    try:
+                        slide, validation = future.result()
+                    except CandidateCancelled:
+                        continue
+                    except Exception as e:
+                        self.metrics.inc("candidates_failed_total")
+                        error = error or e
+                        continue
+                    self.metrics.inc("candidates_validated_total")
+                    index = futures[future]
+                    if best is None or (validation['score'], -index) > (best[2]['score'], -best[0]):
+                        best = (index, slide, validation)
+                if best is not None and self.accept_score is not None and best[2]['score'] >= self.accept_score:
+                    if pending:
+                        self.metrics.inc("candidates_cancelled_total", len(pending))
+                    break
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if best is None:
+            if isinstance(error, FieldBudgetExceeded):
+                return self.failed_result(element_id, "field_budget", str(error))
+            raise error
+        index, slide, validation = best
+        print(f"Element {element_id}: candidate {index + 1} of {self.candidates} selected (score {validation['score']})")
+
+        on_field = self._field_callback(element_id)
+        if on_field is not None:
+            for field in ("title", "content", "dialogue"):
+                on_field(field, slide[field])
+        return self.build_result(element_id, slide, validation)
+
+    def build_result(
+        self,
+        element_id: str,
+        slide: Dict[str, str],
+        validation: Dict[str, Any],
+        validated_by: str = "llm"
+    ) -> Dict[str, Any]:
+        """
+        Combine a generated slide and its validation into a result entry.
+        
+        Args:
+            element_id (str): Identifier of the source element
+            slide (Dict[str, str]): Generated slide title, content and dialogue, and
+                optionally the model that generated it
+            validation (Dict[str, Any]): Validation score and feedback
+            validated_by (str): "llm" or "local", depending on who scored the slide
+            
+        Returns:
+            Dict[str, Any]: Result entry with element_id and the slide result
+        """
+        # Store results using Pydantic model for validation
+        result = SlideResult(
+            title=slide['title'],
+            content=slide['content'],
+            dialogue=slide['dialogue'],
+            groundedness_score=validation['score'],
+            feedback=validation['feedback'],
+            validated_by=validated_by,
+            model=slide.get('model')
         )
+        if self.router is not None and result.model is not None and validated_by == "llm":
+            self.router.record_score(result.model, result.groundedness_score)
         
-        return json.loads(response.choices[0].message.content)
+        return {
+            "element_id": element_id,
+            "result": result.model_dump()
+        }
 
-    def run(self, input_file: str) -> str:
+    def failed_result(self, element_id: str, error: str, detail: str) -> Dict[str, Any]:
+        """
+        Build the result entry of an element whose slide could not be generated.
+        
+        Failed entries have an `error` instead of a `result`. They are kept
+        in the results file so the run can finish, are skipped by the
+        formatter and are generated again by a resumed run.
+        
+        Args:
+            element_id (str): Identifier of the source element
+            error (str): Failure reason, e.g. "field_budget"
+            detail (str): Error message
+            
+        Returns:
+            Dict[str, Any]: Result entry with element_id, error and detail
+        """
+        print(f"Element {element_id} failed: {detail}")
+        self.metrics.inc("elements_failed_total", error=error)
+        return {"element_id": element_id, "error": error, "detail": detail}
+
+    def save_results(self, results: List[Dict[str, Any]], input_file: str) -> str:
+        """
+        Save result entries next to the other outputs of this generator.
+        
+        Args:
+            results (List[Dict[str, Any]]): Result entries in element order
+            input_file (str): Path of the input file the results were created from
+            
+        Returns:
+            str: Path to the output results file
+        """
+        output_path = self.output_dir / f"{Path(input_file).stem}_results.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+        if self.cache is not None:
+            print(f"Response cache stats: {self.cache.stats()}")
+
+        return str(output_path)
+
+    def run(
+        self,
+        input_file: str,
+        resume: bool = False,
+        incremental: bool = False,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> str:
         """
         Process a JSON input file and generate slides for each text element.
         
@@ -156,8 +877,26 @@ class PresentationGenerator:
         - element_id: Unique identifier
         - text: Source content to create slide from
         
+        An element store written by `UnstructuredProcessor.build_element_store`
+        can be used instead of the JSON file.
+        
+        Each result is appended to a `*_results.jsonl` checkpoint as soon as
+        it completes, so a failure only loses the elements still in flight.
+        Once every element is done, the checkpoint is compacted into the
+        ordered `*_results.json` file.
+        
+        The source text hash of every element is saved next to the results
+        (`*_results.sources.json`). With `incremental`, e.g. after
+        re-processing a revised PDF, elements whose text is unchanged since
+        the previous run reuse their slide and only the others are generated.
+        
         Args:
-            input_file (str): Path to input JSON file
+            input_file (str): Path to input JSON file or element store
+            resume (bool): Skip elements already stored in an existing checkpoint
+            incremental (bool): Reuse the previous results of unchanged elements
+            on_result (Optional[Callable[[Dict[str, Any]], None]]): Called with each
+                result entry in element order, as soon as it and all earlier ones
+                are done; resumed and reused results are included
             
         Returns:
             str: Path to the output results file
@@ -166,49 +905,576 @@ class PresentationGenerator:
             Exception: If there's an error processing the document
         """
         try:
-            # Load input JSON
-            with open(input_file, 'r', encoding='utf-8') as f:
-                elements = json.load(f)
+            with self.metrics.span("generation"):
+                elements = self.load_elements(input_file)
+
+                checkpoint_path = self.checkpoint_path(input_file)
+                completed = load_completed_ids(str(checkpoint_path)) if resume else set()
+                pending = [element for element in elements if element['element_id'] not in completed]
+                if completed:
+                    print(f"Resuming: {len(elements) - len(pending)} of {len(elements)} elements already done")
+                previous = self.load_previous_results(input_file) if incremental else {}
+
+                with CheckpointWriter(str(checkpoint_path), self.checkpoint_fsync_every, append=resume) as writer:
+                    if on_result is not None:
+                        writer = _OrderedRelease(writer, (element['element_id'] for element in elements), on_result)
+                        if completed:
+                            for record in iter_checkpoint(str(checkpoint_path)):
+                                if "error" not in record:
+                                    writer.release(record)
+                    if previous:
+                        pending = self._reuse_unchanged(pending, previous, writer)
+                    if self.dedup_index is not None:
+                        self._process_deduplicated(pending, writer, Path(input_file).stem)
+                    else:
+                        self._process_to_checkpoint(pending, writer)
+
+                # Compact the checkpoint into the ordered results file
+                output_path = self.results_path(input_file)
+                compact_checkpoint(
+                    str(checkpoint_path),
+                    (element['element_id'] for element in elements),
+                    str(output_path)
+                )
+                with open(self.sources_path(input_file), 'w', encoding='utf-8') as f:
+                    json.dump({element['element_id']: source_hash(element['text']) for element in elements}, f)
+
+                if self.cache is not None:
+                    print(f"Response cache stats: {self.cache.stats()}")
+                print(f"Prompt cache: {self.prompt_cache_stats()}")
+                if self.router is not None:
+                    for model, stats in self.router.stats().items():
+                        print(f"Model {model}: {stats['requests']} requests, {stats['rate_limited']} rate limited, "
+                              f"mean score {stats['scores'].get('mean', 'n/a')}")
+
+                return str(output_path)
+
+        except Exception as e:
+            print(f"Error processing document: {e}")
+            raise
+
+    def stream_run(self, input_file: str, resume: bool = False, incremental: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Run `run` in a background thread and yield its results in element order.
+        
+        Each result is yielded as soon as it and all earlier ones are done,
+        so a consumer such as `MOOCFormatter.format_stream` can work on the
+        first slides while later ones are still generating. The results file
+        is written as usual at `results_path(input_file)`.
+        
+        Args:
+            input_file (str): Path to input JSON file or element store
+            resume (bool): Skip elements already stored in an existing checkpoint
+            incremental (bool): Reuse the previous results of unchanged elements
+            
+        Yields:
+            Dict[str, Any]: Result entries with element_id and the slide result
+            
+        Raises:
+            Exception: The error of `run`, after the results done before it
+        """
+        results: queue.Queue = queue.Queue()
+        error = None
+        
+        def produce() -> None:
+            nonlocal error
+            try:
+                self.run(input_file, resume=resume, incremental=incremental, on_result=results.put)
+            except Exception as e:
+                error = e
+            finally:
+                results.put(_DONE)
+        
+        producer = threading.Thread(target=produce, name="generation", daemon=True)
+        producer.start()
+        while True:
+            result = results.get()
+            if result is _DONE:
+                break
+            yield result
+        producer.join()
+        if error is not None:
+            raise error
+
+    def prompt_cache_stats(self) -> Dict[str, float]:
+        """
+        Share of prompt tokens served from the provider's prompt cache.
+        
+        Counted from the usage of every request recorded in `metrics`, so a
+        registry shared by several runs reports their combined ratio.
+        
+        Returns:
+            Dict[str, float]: Cached-token ratio per stage and overall
+        """
+        stats = {}
+        for stage in ("generation", "validation", None):
+            labels = {"stage": stage} if stage else {}
+            prompt = self.metrics.counter_value("llm_prompt_tokens_total", **labels)
+            cached = self.metrics.counter_value("llm_cached_tokens_total", **labels)
+            stats[stage or "overall"] = round(cached / prompt, 3) if prompt else 0.0
+        return stats
+
+    def load_elements(self, input_file: str) -> List[Dict[str, Any]]:
+        """
+        Load the element_id and text of every input element.
+        
+        Element stores (`.elements` files) are read through their index, so
+        only element texts are loaded; metadata and blobs such as
+        `orig_elements` are never parsed. Any other file is read as JSON.
+        
+        Args:
+            input_file (str): Path to an element store or a JSON file
+            
+        Returns:
+            List[Dict[str, Any]]: Elements with element_id and text
+        """
+        if Path(input_file).suffix == ELEMENT_STORE_SUFFIX:
+            with ElementStore(input_file) as store:
+                return [{"element_id": element_id, "text": text} for element_id, text in store.iter_texts()]
+
+        with open(input_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def checkpoint_path(self, input_file: str) -> Path:
+        """Return the JSONL checkpoint path used by `run` for an input file."""
+        return self.output_dir / f"{Path(input_file).stem}_results.jsonl"
+
+    def results_path(self, input_file: str) -> Path:
+        """Return the path of the ordered results file written by `run` for an input file."""
+        return self.output_dir / f"{Path(input_file).stem}_results.json"
+
+    def sources_path(self, input_file: str) -> Path:
+        """Return the path of the source text hashes saved by `run` for an input file."""
+        return self.output_dir / f"{Path(input_file).stem}_results.sources.json"
+
+    def load_previous_results(self, input_file: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the slides of the previous run on an input file, keyed by source text hash.
+        
+        Args:
+            input_file (str): Path to the input file of the previous run
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Slide results keyed by the hash of their
+                source text, empty if there is no complete previous run
+        """
+        sources_path = self.sources_path(input_file)
+        results_path = self.results_path(input_file)
+        if not (sources_path.exists() and results_path.exists()):
+            return {}
+        with open(sources_path, 'r', encoding='utf-8') as f:
+            sources = json.load(f)
+        with open(results_path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        return {
+            sources[entry['element_id']]: entry['result']
+            for entry in results
+            if entry['element_id'] in sources and 'result' in entry
+        }
+
+    def _reuse_unchanged(
+        self,
+        elements: List[Dict[str, Any]],
+        previous: Dict[str, Dict[str, Any]],
+        writer: CheckpointWriter
+    ) -> List[Dict[str, Any]]:
+        """
+        Checkpoint the previous slide of every element whose source text is unchanged.
+        
+        Args:
+            elements (List[Dict[str, Any]]): Elements to process
+            previous (Dict[str, Dict[str, Any]]): Previous slide results keyed by source text hash
+            writer (CheckpointWriter): Checkpoint receiving the reused results
+            
+        Returns:
+            List[Dict[str, Any]]: Elements whose text changed and that still need a slide
+        """
+        changed = []
+        for element in elements:
+            result = previous.get(source_hash(element['text']))
+            if result is None:
+                changed.append(element)
+            else:
+                writer.write({"element_id": element['element_id'], "result": result})
+        reused = len(elements) - len(changed)
+        self.metrics.inc("incremental_reused_total", reused)
+        print(f"Incremental run: {reused} of {len(elements)} slides reused, {len(changed)} to generate")
+        return changed
+
+    def _process_to_checkpoint(self, elements: List[Dict[str, Any]], writer: CheckpointWriter) -> None:
+        """
+        Process elements on the thread pool and checkpoint results as they finish.
+        
+        At most twice `max_concurrency` elements are queued at a time, so
+        memory does not grow with the length of the document. If an element
+        fails, the ones already in flight are still checkpointed before the
+        error is raised.
+        
+        Args:
+            elements (List[Dict[str, Any]]): Elements to process
+            writer (CheckpointWriter): Checkpoint receiving each result
+        """
+        if self.prescorer is not None:
+            self._process_prescored(elements, writer)
+            return
+        if self.pipelined:
+            self._process_pipelined(elements, writer)
+            return
+
+        error = None
+        in_flight = set()
 
-            # Process each element
-            results = []
+        def drain(futures) -> None:
+            nonlocal error
+            for future in futures:
+                try:
+                    writer.write(future.result())
+                except Exception as e:
+                    error = error or e
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
             for element in elements:
-                # Generate slide
-                print(f"Generating slide for element {element['element_id']}...")
-                slide = self.generate_slide(element['text'])
-                
-                # Validate slide
-                print(f"Validating slide for element {element['element_id']}...")
-                validation = self.validate_slide(
-                    element['text'],
-                    slide['title'],
-                    slide['content'],
-                    slide['dialogue']
+                if error is not None:
+                    break
+                if len(in_flight) >= self.max_concurrency * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    drain(done)
+                in_flight.add(executor.submit(self.process_element, element))
+            drain(wait(in_flight)[0])
+
+        if error is not None:
+            raise error
+
+    def _process_deduplicated(self, elements: List[Dict[str, Any]], writer: CheckpointWriter, document: str) -> None:
+        """
+        Reuse slides of near-duplicate chunks and generate only the unique ones.
+        
+        Each chunk is looked up in `dedup_index`, which holds the chunks of
+        earlier documents and runs; a match is checkpointed right away with
+        the stored slide, a `duplicate_of` pointer to its source and their
+        estimated similarity as `duplicate_similarity`. Chunks repeated
+        within the document are generated once and their copies are written
+        the same way when the first one completes. Every generated slide is
+        added to the index under "document#element_id".
+        
+        Args:
+            elements (List[Dict[str, Any]]): Elements to process
+            writer (CheckpointWriter): Checkpoint receiving each result
+            document (str): Name of the document, used in index keys
+        """
+        in_document = self.dedup_index.scratch()
+        signatures = {}
+        # Copies of each generated chunk with their estimated similarity to it
+        copies: Dict[str, List[Tuple[Dict[str, Any], float]]] = {}
+        unique = []
+        reused = 0
+        for element in elements:
+            key = f"{document}#{element['element_id']}"
+            signature = self.dedup_index.signature(element['text'])
+            match = self.dedup_index.query(signature, exclude=key)
+            if match is not None:
+                writer.write(self.reuse_result(element['element_id'], match))
+                reused += 1
+                continue
+            match = in_document.query(signature)
+            if match is not None:
+                copies.setdefault(match.key, []).append((element, match.similarity))
+                continue
+            in_document.add(key, signature, {})
+            signatures[element['element_id']] = (key, signature)
+            unique.append(element)
+
+        repeated = len(elements) - reused - len(unique)
+        self.metrics.inc("dedup_reused_total", reused + repeated)
+        print(f"Near-duplicate detection: {reused} chunks reuse indexed slides, "
+              f"{repeated} repeat chunks of this document, {len(unique)} to generate")
+
+        def index_result(result: Dict[str, Any]) -> None:
+            key, signature = signatures[result['element_id']]
+            if 'error' in result:
+                for copy, _ in copies.get(key, []):
+                    writer.write({**result, "element_id": copy['element_id']})
+                return
+            self.dedup_index.add(key, signature, result['result'])
+            for copy, similarity in copies.get(key, []):
+                match = DuplicateMatch(key=key, similarity=similarity, result=result['result'])
+                writer.write(self.reuse_result(copy['element_id'], match))
+
+        self._process_to_checkpoint(unique, _NotifyingWriter(writer, index_result))
+
+    def reuse_result(self, element_id: str, match: DuplicateMatch) -> Dict[str, Any]:
+        """
+        Build the result entry of a chunk from the slide of its near-duplicate.
+        
+        Args:
+            element_id (str): Identifier of the duplicate element
+            match (DuplicateMatch): Indexed chunk the slide was generated for
+            
+        Returns:
+            Dict[str, Any]: Result entry pointing at the original slide
+        """
+        result = SlideResult(**{**match.result, "duplicate_of": match.key, "duplicate_similarity": match.similarity})
+        return {"element_id": element_id, "result": result.model_dump()}
+
+    def _process_prescored(self, elements: List[Dict[str, Any]], writer: CheckpointWriter) -> None:
+        """
+        Generate slides in windows, score them locally and validate only uncertain ones.
+        
+        Elements are generated in windows of twice `max_concurrency` and
+        each window is scored in one vectorized pass, so memory does not grow
+        with the length of the document. Slides with a confident local score
+        are checkpointed as soon as their window is scored; the rest go to the
+        LLM validator while the next window generates. If an element fails,
+        the rest of its window and the validations in flight are still
+        checkpointed before the error is raised.
+        
+        Args:
+            elements (List[Dict[str, Any]]): Elements to process
+            writer (CheckpointWriter): Checkpoint receiving each result
+        """
+        def generate(element: Dict[str, Any]) -> Dict[str, str]:
+            print(f"Generating slide for element {element['element_id']}...")
+            return self.generate_slide(element['text'], self._field_callback(element['element_id']))
+
+        def validate(element: Dict[str, Any], slide: Dict[str, str]) -> Dict[str, Any]:
+            print(f"Validating slide for element {element['element_id']}...")
+            validation = self.validate_slide(element['text'], slide['title'], slide['content'], slide['dialogue'])
+            return self.build_result(element['element_id'], slide, validation)
+
+        error = None
+        window = self.max_concurrency * 2
+        validating = set()
+        scored = confident = 0
+
+        def drain(futures) -> None:
+            nonlocal error
+            for future in futures:
+                try:
+                    writer.write(future.result())
+                except Exception as e:
+                    error = error or e
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for start in range(0, len(elements), window):
+                if error is not None:
+                    break
+                batch = elements[start:start + window]
+                futures = [executor.submit(generate, element) for element in batch]
+                generated = []
+                for element, future in zip(batch, futures):
+                    try:
+                        generated.append((element, future.result()))
+                    except FieldBudgetExceeded as e:
+                        writer.write(self.failed_result(element['element_id'], "field_budget", str(e)))
+                    except Exception as e:
+                        error = error or e
+                if not generated:
+                    continue
+
+                local_scores = self.prescorer.score(
+                    [element['text'] for element, _ in generated],
+                    [slide for _, slide in generated]
                 )
-                
-                # Store results using Pydantic model for validation
-                result = SlideResult(
-                    title=slide['title'],
-                    content=slide['content'],
-                    dialogue=slide['dialogue'],
-                    groundedness_score=validation['score'],
-                    feedback=validation['feedback']
+                for (element, slide), local in zip(generated, local_scores):
+                    if local['uncertain']:
+                        validating.add(executor.submit(validate, element, slide))
+                    else:
+                        writer.write(self.build_result(element['element_id'], slide, local, validated_by="local"))
+                        confident += 1
+                scored += len(generated)
+
+                # Keep pending validations within one window
+                while len(validating) > window:
+                    done, validating = wait(validating, return_when=FIRST_COMPLETED)
+                    drain(done)
+            drain(wait(validating)[0])
+
+        print(f"Local pre-scoring: {confident} of {scored} slides need no LLM validation")
+        if error is not None:
+            raise error
+
+    def _process_pipelined(self, elements: List[Dict[str, Any]], writer: CheckpointWriter) -> None:
+        """
+        Process elements through the generate -> validate pipeline.
+        
+        Args:
+            elements (List[Dict[str, Any]]): Elements to process
+            writer (CheckpointWriter): Checkpoint receiving each result
+        """
+        def generate(element: Dict[str, Any]) -> Dict[str, Any]:
+            print(f"Generating slide for element {element['element_id']}...")
+            try:
+                return self.generate_slide(element['text'], self._field_callback(element['element_id']))
+            except FieldBudgetExceeded as e:
+                return self.failed_result(element['element_id'], "field_budget", str(e))
+
+        def validate(element: Dict[str, Any], slide: Dict[str, Any]) -> Dict[str, Any]:
+            # A failed element has nothing to validate and goes through as is
+            if 'error' in slide:
+                return slide
+            print(f"Validating slide for element {element['element_id']}...")
+            validation = self.validate_slide(element['text'], slide['title'], slide['content'], slide['dialogue'])
+            return self.build_result(element['element_id'], slide, validation)
+
+        generation_workers = self.stage_configs["generation"].workers
+        validation_workers = self.stage_configs["validation"].workers
+        pipeline = SlidePipeline(
+            generate,
+            validate,
+            generation_workers=generation_workers,
+            validation_workers=validation_workers,
+            queue_size=2 * max(generation_workers, validation_workers)
+        )
+        try:
+            pipeline.run(elements, writer.write)
+        finally:
+            self.pipeline_stats = pipeline.stats()
+            print(f"Pipeline stats: {self.pipeline_stats} (bottleneck: {pipeline.bottleneck()})")
+
+    def _run_batch_stage(
+        self,
+        runner: OpenAIBatchRunner,
+        requests: Dict[str, List[Dict[str, str]]],
+        response_format: Dict[str, Any],
+        stage: str,
+        path: Path
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve one stage of requests through the cache and a single batch job.
+        
+        Cached responses are reused without being sent. Requests that fail
+        inside the batch, are missing from its output (e.g. when it expired
+        partway) or whose response lacks a required field are retried
+        synchronously, as is every request of a batch that ends without any
+        output, so the stage always returns a response for every element.
+        
+        Args:
+            runner (OpenAIBatchRunner): Runner used to submit the batch
+            requests (Dict[str, List[Dict[str, str]]]): Messages keyed by element_id
+            response_format (Dict[str, Any]): Structured output format of the stage
+            stage (str): Stage the requests belong to
+            path (Path): Path of the batch input file
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Slides or validations keyed by element_id
+        """
+        responses = {}
+        pending = []
+        for element_id, messages in requests.items():
+            cached = self._cache_lookup(self._cache_key(messages, response_format))
+            if cached is not None:
+                responses[element_id] = cached
+            else:
+                pending.append((element_id, self._request_body(messages, response_format)))
+
+        print(f"Submitting {len(pending)} requests in batch ({len(responses)} served from cache)...")
+        try:
+            batch_responses = runner.run(pending, path)
+        except BatchJobError as e:
+            print(f"{e} - sending its {len(pending)} requests outside the batch...")
+            self.metrics.inc("batch_jobs_failed_total", stage=stage)
+            batch_responses = {}
+
+        for element_id, body in pending:
+            response = batch_responses.get(element_id)
+            if response is not None:
+                try:
+                    check_response(response, response_format, stage)
+                except ValueError as e:
+                    print(f"Discarding batch response of element {element_id}: {e}")
+                    response = None
+            if response is not None:
+                cache_key = self._cache_key(body["messages"], response_format)
+                if cache_key is not None:
+                    self.cache.set_json(cache_key, response)
+            else:
+                print(f"Retrying element {element_id} outside the batch...")
+                response = self._complete(body["messages"], response_format, stage)
+            responses[element_id] = response
+        return responses
+
+    def run_batch(self, input_file: str, poll_interval: float = 30.0) -> str:
+        """
+        Process a JSON input file through the OpenAI Batch API.
+        
+        All generation requests are submitted as one batch. Once it completes,
+        the dependent validation requests are submitted as a second batch, and
+        the results are saved in the same format as `run`.
+        
+        Batch requests are not routed: they all use `model`, since a batch
+        runs against a single model. Only the synchronous retries of failed
+        requests go through `router` like any other call.
+        
+        Args:
+            input_file (str): Path to input JSON file
+            poll_interval (float): Seconds to wait between batch status checks
+            
+        Returns:
+            str: Path to the output results file
+            
+        Raises:
+            Exception: If there's an error processing the document
+        """
+        try:
+            elements = self.load_elements(input_file)
+
+            runner = OpenAIBatchRunner(self.client, poll_interval=poll_interval)
+            stem = Path(input_file).stem
+
+            # Generation batch
+            slides = self._run_batch_stage(
+                runner,
+                {element['element_id']: self.generation_messages(element['text']) for element in elements},
+                SLIDE_CONTENT_FORMAT,
+                "generation",
+                self.output_dir / f"{stem}_generation_batch.jsonl"
+            )
+
+            # Slides scored confidently by the local prescorer skip LLM validation
+            local_validations = {}
+            if self.prescorer is not None:
+                local_scores = self.prescorer.score(
+                    [element['text'] for element in elements],
+                    [slides[element['element_id']] for element in elements]
                 )
-                
-                results.append({
-                    "element_id": element['element_id'],
-                    "result": result.model_dump()
-                })
+                local_validations = {
+                    element['element_id']: local
+                    for element, local in zip(elements, local_scores)
+                    if not local['uncertain']
+                }
 
-            # Save results to JSON file
-            output_path = self.output_dir / f"{Path(input_file).stem}_results.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            # Validation batch, built from the generated slides
+            validations = self._run_batch_stage(
+                runner,
+                {
+                    element['element_id']: self.validation_messages(
+                        element['text'],
+                        slides[element['element_id']]['title'],
+                        slides[element['element_id']]['content'],
+                        slides[element['element_id']]['dialogue']
+                    )
+                    for element in elements
+                    if element['element_id'] not in local_validations
+                },
+                SLIDE_VALIDATION_FORMAT,
+                "validation",
+                self.output_dir / f"{stem}_validation_batch.jsonl"
+            )
+            validations.update(local_validations)
 
-            return str(output_path)
+            results = [
+                self.build_result(
+                    element['element_id'],
+                    slides[element['element_id']],
+                    validations[element['element_id']],
+                    validated_by="local" if element['element_id'] in local_validations else "llm"
+                )
+                for element in elements
+            ]
+            return self.save_results(results, input_file)
 
         except Exception as e:
-            print(f"Error processing document: {e}")
+            print(f"Error processing document in batch mode: {e}")
             raise
 
 # Example usage:
@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from ..utils.config import ModelRoute
+from ..utils.metrics import Histogram, MetricsRegistry, estimate_cost
+from ..utils.rate_limiter import RateLimiter
+
+# Latency observations of a model and stage before its p95 is trusted
+MIN_LATENCY_SAMPLES = 5
+
+# Buckets of the groundedness score histograms (scores go from 0 to 10)
+SCORE_BUCKETS = tuple(float(score) for score in range(1, 11))
+
+
+class ModelRouter:
+    """
+    Picks the model of each chat completion from its stage, size and the observed load.
+
+    Routes are tried in order and the first one matching the stage and the
+    prompt size is preferred, e.g. a small model for validation and for
+    short chunks, the default model for everything else. A preferred model
+    is passed over while it is cooling down after a 429, while its own rate
+    limits have less than `min_headroom` of their quota left, when its
+    observed p95 latency exceeds `latency_budget`, or when the estimated
+    cost of the request exceeds `cost_budget`. The fallback models come
+    next, and models passed over are still tried last, so every request
+    gets a list of models to try in turn when one answers with a 429.
+
+    Latency, rate limits and the groundedness scores of the slides each
+    model generated are kept per model, so routes can be tuned from data.
+    """
+
+    def __init__(
+        self,
+        routes: List[ModelRoute],
+        default_model: str,
+        fallback_models: Optional[List[str]] = None,
+        latency_budget: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+        min_headroom: float = 0.1,
+        cooldown: float = 30.0,
+        completion_tokens: int = 1000,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize the ModelRouter.
+
+        Args:
+            routes (List[ModelRoute]): Routes in order of preference
+            default_model (str): Model of requests no route matches
+            fallback_models (Optional[List[str]]): Models tried after the matching
+                routes, in order; defaults to `default_model`
+            latency_budget (Optional[float]): Highest acceptable p95 request latency in seconds
+            cost_budget (Optional[float]): Highest acceptable estimated cost of one request in USD
+            min_headroom (float): Share of a route's rate limits that must be left to prefer it
+            cooldown (float): Seconds a model is passed over after a 429
+            completion_tokens (int): Completion tokens assumed when estimating costs
+            metrics (Optional[MetricsRegistry]): Registry for per-model latency, 429s and
+                fallbacks; a generator using the router fills in its own if None
+        """
+        self.routes = routes
+        self.default_model = default_model
+        self.fallback_models = fallback_models if fallback_models is not None else [default_model]
+        self.latency_budget = latency_budget
+        self.cost_budget = cost_budget
+        self.min_headroom = min_headroom
+        self.cooldown = cooldown
+        self.completion_tokens = completion_tokens
+        self.metrics = metrics
+        # Routes to the same model share the rate limits of the first one
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        for route in routes:
+            if route.model not in self.rate_limiters:
+                self.rate_limiters[route.model] = RateLimiter(route.requests_per_minute, route.tokens_per_minute)
+        self.lock = threading.Lock()
+        self.cooldown_until: Dict[str, float] = {}
+        self.latency: Dict[str, Dict[str, Histogram]] = {}
+        self.scores: Dict[str, Histogram] = {}
+        self.requests: Dict[str, int] = {}
+        self.rate_limited: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+
+    def candidates(self, stage: str, prompt_tokens: int) -> List[str]:
+        """
+        List every model that may answer a request, in route order and regardless of load.
+
+        The matching routes come first, then the default and fallback models.
+        A response is cached under the model that answered it, so its cache
+        entry is looked up under each of these models.
+
+        Args:
+            stage (str): Stage of the request, "generation" or "validation"
+            prompt_tokens (int): Estimated prompt tokens of the request
+
+        Returns:
+            List[str]: Model names, never empty
+        """
+        matching = [route.model for route in self.routes if self._matches(route, stage, prompt_tokens)]
+        ordered = []
+        for model in matching + [self.default_model] + self.fallback_models:
+            if model not in ordered:
+                ordered.append(model)
+        return ordered
+
+    def choose(self, stage: str, prompt_tokens: int) -> List[str]:
+        """
+        Order the models to try for a request.
+
+        Args:
+            stage (str): Stage of the request, "generation" or "validation"
+            prompt_tokens (int): Estimated prompt tokens of the request
+
+        Returns:
+            List[str]: Models to try in turn, never empty
+        """
+        ordered = self.candidates(stage, prompt_tokens)
+        usable = [model for model in ordered if self._usable(model, stage, prompt_tokens)]
+        return usable + [model for model in ordered if model not in usable]
+
+    def _matches(self, route: ModelRoute, stage: str, prompt_tokens: int) -> bool:
+        if route.stages is not None and stage not in route.stages:
+            return False
+        return route.max_prompt_tokens is None or prompt_tokens <= route.max_prompt_tokens
+
+    def _usable(self, model: str, stage: str, prompt_tokens: int) -> bool:
+        """Whether the current load and the budgets allow preferring a model."""
+        with self.lock:
+            if self.cooldown_until.get(model, 0.0) > time.monotonic():
+                return False
+            latency = self.latency.get(model, {}).get(stage)
+            if (
+                self.latency_budget is not None and latency is not None
+                and latency.count >= MIN_LATENCY_SAMPLES and latency.quantile(0.95) > self.latency_budget
+            ):
+                return False
+        limiter = self.rate_limiters.get(model)
+        if limiter is not None and limiter.headroom() < self.min_headroom:
+            return False
+        if self.cost_budget is not None:
+            cost = estimate_cost(model, prompt_tokens, 0, self.completion_tokens)
+            if cost is not None and cost > self.cost_budget:
+                return False
+        return True
+
+    def acquire(self, model: str, tokens: int) -> None:
+        """Block until the rate limits of a model allow a request carrying `tokens` tokens."""
+        limiter = self.rate_limiters.get(model)
+        if limiter is not None:
+            limiter.acquire(tokens)
+
+    def record_request(self, model: str, stage: str, seconds: float) -> None:
+        """Record the latency of a request a model answered."""
+        with self.lock:
+            histogram = self.latency.setdefault(model, {}).setdefault(stage, Histogram())
+            histogram.observe(seconds)
+            self.requests[model] = self.requests.get(model, 0) + 1
+        if self.metrics is not None:
+            self.metrics.observe("llm_model_request_seconds", seconds, model=model, stage=stage)
+
+    def record_rate_limited(self, model: str, stage: str, fallback: Optional[str]) -> None:
+        """
+        Record a 429 from a model and cool it down.
+
+        Args:
+            model (str): Model that answered with a 429
+            stage (str): Stage of the request
+            fallback (Optional[str]): Model tried next, None if there is none left
+        """
+        with self.lock:
+            self.cooldown_until[model] = time.monotonic() + self.cooldown
+            self.rate_limited[model] = self.rate_limited.get(model, 0) + 1
+            if fallback is not None:
+                self.fallbacks[model] = self.fallbacks.get(model, 0) + 1
+        if self.metrics is None:
+            return
+        self.metrics.inc("llm_rate_limited_total", model=model, stage=stage)
+        if fallback is not None:
+            self.metrics.inc("llm_fallbacks_total", model=model, fallback=fallback, stage=stage)
+
+    def record_score(self, model: str, score: float) -> None:
+        """Record the groundedness score of a slide a model generated."""
+        with self.lock:
+            histogram = self.scores.get(model)
+            if histogram is None:
+                histogram = self.scores[model] = Histogram(SCORE_BUCKETS)
+            histogram.observe(score)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize the requests of every model.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per model: requests, 429s, fallbacks to
+                another model, latency per stage and scores of its slides
+        """
+        with self.lock:
+            models = sorted(set(self.requests) | set(self.rate_limited) | set(self.scores))
+            return {
+                model: {
+                    "requests": self.requests.get(model, 0),
+                    "rate_limited": self.rate_limited.get(model, 0),
+                    "fallbacks": self.fallbacks.get(model, 0),
+                    "latency": {
+                        stage: histogram.snapshot()
+                        for stage, histogram in sorted(self.latency.get(model, {}).items())
+                    },
+                    "scores": self.scores[model].snapshot() if model in self.scores else {"count": 0, "sum": 0.0}
+                }
+                for model in models
+            }
+
+    def write_stats(self, path: str) -> str:
+        """Write `stats` as JSON and return its path."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats(), f, indent=2)
+        return path
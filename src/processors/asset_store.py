@@ -0,0 +1,154 @@
+import base64
+import hashlib
+import mimetypes
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from .title_chunker import decode_orig_elements, encode_orig_elements
+
+# Metadata field that replaces `image_base64` once the image is in the asset store
+ASSET_FIELD = "image_asset"
+
+DEFAULT_EXTENSION = ".bin"
+
+
+def asset_name(payload: bytes, mime_type: Optional[str] = None) -> str:
+    """
+    Return the content-addressed file name of an asset.
+
+    Args:
+        payload (bytes): Decoded asset bytes
+        mime_type (Optional[str]): MIME type reported by the API, e.g. "image/jpeg"
+
+    Returns:
+        str: sha256 of the content followed by an extension for the MIME type
+    """
+    extension = mimetypes.guess_extension(mime_type) if mime_type else None
+    return hashlib.sha256(payload).hexdigest() + (extension or DEFAULT_EXTENSION)
+
+
+def write_asset(asset_dir: str, payload: bytes, mime_type: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Store an asset under its content hash, unless it is already stored.
+
+    The file is written to a temporary name and moved into place, so
+    concurrent writers of the same asset never leave a partial file.
+
+    Args:
+        asset_dir (str): Directory of the asset store
+        payload (bytes): Decoded asset bytes
+        mime_type (Optional[str]): MIME type of the asset
+
+    Returns:
+        Tuple[str, bool]: Asset file name, and whether it was newly written
+    """
+    name = asset_name(payload, mime_type)
+    path = os.path.join(asset_dir, name)
+    if os.path.exists(path):
+        return name, False
+    fd, temp_path = tempfile.mkstemp(dir=asset_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return name, True
+
+
+def _extract_metadata(metadata: Dict[str, Any], asset_dir: str, counts: Dict[str, int]) -> None:
+    """Move the inline image of one metadata dict to the store, recursing into orig_elements."""
+    if isinstance(metadata.get("image_base64"), str):
+        payload = base64.b64decode(metadata.pop("image_base64"))
+        name, written = write_asset(asset_dir, payload, metadata.get("image_mime_type"))
+        metadata[ASSET_FIELD] = name
+        counts["written" if written else "reused"] += 1
+
+    if isinstance(metadata.get("orig_elements"), str):
+        orig_elements = decode_orig_elements(metadata["orig_elements"])
+        for element in orig_elements:
+            _extract_metadata(element.get("metadata", {}), asset_dir, counts)
+        metadata["orig_elements"] = encode_orig_elements(orig_elements)
+
+
+def extract_element_assets(element: Dict[str, Any], asset_dir: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Replace the inline images of an element with references to the asset store.
+
+    `image_base64` is decoded, stored once under its content hash and
+    replaced by the asset file name in `image_asset`. Images nested in the
+    compressed `orig_elements` payload are handled the same way and the
+    payload is re-encoded without them.
+
+    Args:
+        element (Dict[str, Any]): Element as returned by the Unstructured API
+        asset_dir (str): Directory of the asset store
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, int]]: The element, and the number of
+            assets written and reused
+    """
+    counts = {"written": 0, "reused": 0}
+    if isinstance(element.get("metadata"), dict):
+        _extract_metadata(element["metadata"], asset_dir, counts)
+    return element, counts
+
+
+def extract_assets(
+    elements: Iterable[Dict[str, Any]],
+    asset_dir: str,
+    max_workers: Optional[int] = None,
+    counts: Optional[Dict[str, int]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Extract the images of a stream of elements across a process pool.
+
+    Base64 decoding, hashing and decompressing `orig_elements` are CPU
+    bound, so elements are processed in worker processes. At most a few
+    elements per worker are in flight, so memory stays bounded for large
+    documents, and elements are yielded in their original order.
+
+    Args:
+        elements (Iterable[Dict[str, Any]]): Elements to process
+        asset_dir (str): Directory of the asset store, created if missing
+        max_workers (Optional[int]): Worker processes, the CPU count if None
+        counts (Optional[Dict[str, int]]): Dict updated with the number of
+            assets written and reused
+
+    Yields:
+        Dict[str, Any]: Each element with its images replaced by references
+    """
+    Path(asset_dir).mkdir(parents=True, exist_ok=True)
+    counts = counts if counts is not None else {}
+    counts.setdefault("written", 0)
+    counts.setdefault("reused", 0)
+    worker = partial(extract_element_assets, asset_dir=str(asset_dir))
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 4 * max_workers
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+
+        def drain(limit: int) -> Iterator[Dict[str, Any]]:
+            while len(pending) > limit:
+                element, element_counts = pending.popleft().result()
+                for key, value in element_counts.items():
+                    counts[key] += value
+                yield element
+
+        for element in elements:
+            pending.append(executor.submit(worker, element))
+            yield from drain(max_in_flight)
+        yield from drain(0)
+
+
+def asset_path(asset_dir: str, metadata: Dict[str, Any]) -> Optional[Path]:
+    """Return the path of an element's stored image, or None if it has none."""
+    name = metadata.get(ASSET_FIELD)
+    return None if name is None else Path(asset_dir) / name
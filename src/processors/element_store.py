@@ -0,0 +1,199 @@
+import base64
+import json
+import mmap
+import shutil
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ELEMENT_STORE_SUFFIX = ".elements"
+
+# Metadata fields holding base64 payloads; they are stored decoded in the blob section
+BLOB_FIELDS = ("orig_elements", "image_base64")
+
+_MAGIC = b"MOOCES01"
+# Magic, then offset and length of the JSON index
+_HEADER = struct.Struct("<8sQQ")
+
+
+def write_element_store(elements: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Write elements to an indexed element store file.
+
+    The file holds three sections after a fixed-size header: element text,
+    element metadata (compact JSON without blob fields) and blobs (the
+    base64 fields of `BLOB_FIELDS`, stored decoded). A JSON index at the
+    end records the offset and length of every piece. Elements are
+    consumed one at a time, so they can be streamed from `iter_json_array`.
+
+    Args:
+        elements (Iterable[Dict[str, Any]]): Elements to store
+        path (str): Path of the store file to write
+
+    Returns:
+        int: Number of elements written
+    """
+    index = []
+    with open(path, 'wb') as out, tempfile.TemporaryFile() as metadata_section, \
+            tempfile.TemporaryFile() as blob_section:
+        out.write(_HEADER.pack(_MAGIC, 0, 0))
+        text_offset = 0
+        for element in elements:
+            metadata = dict(element.get("metadata", {}))
+            blobs = {}
+            for field in BLOB_FIELDS:
+                if isinstance(metadata.get(field), str):
+                    payload = base64.b64decode(metadata.pop(field))
+                    blobs[field] = [blob_section.tell(), len(payload)]
+                    blob_section.write(payload)
+
+            text = (element.get("text") or "").encode("utf-8")
+            metadata_bytes = json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index.append({
+                "element_id": element.get("element_id"),
+                "type": element.get("type"),
+                "text": [text_offset, len(text)],
+                "metadata": [metadata_section.tell(), len(metadata_bytes)],
+                "blobs": blobs
+            })
+            out.write(text)
+            text_offset += len(text)
+            metadata_section.write(metadata_bytes)
+
+        sections = {"text": [_HEADER.size, text_offset]}
+        for name, section in (("metadata", metadata_section), ("blobs", blob_section)):
+            offset = out.tell()
+            section.seek(0)
+            shutil.copyfileobj(section, out)
+            sections[name] = [offset, out.tell() - offset]
+
+        index_bytes = json.dumps({"sections": sections, "elements": index}, separators=(",", ":")).encode("utf-8")
+        index_offset = out.tell()
+        out.write(index_bytes)
+        out.seek(0)
+        out.write(_HEADER.pack(_MAGIC, index_offset, len(index_bytes)))
+    return len(index)
+
+
+class ElementStore:
+    """
+    Random-access reader for element store files, backed by mmap.
+
+    Opening a store only reads its index. Text, metadata and blobs of an
+    element are sliced out of the memory map on request, so a consumer can
+    look up one element, or stream element texts, without parsing the rest
+    of the document. `orig_elements` is only decompressed when asked for.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an element store.
+
+        Args:
+            path (str): Path of the store file
+
+        Raises:
+            ValueError: If the file is not an element store
+        """
+        self.path = Path(path)
+        self.file = open(self.path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = _HEADER.unpack_from(self.map, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an element store")
+        index = json.loads(self.map[index_offset:index_offset + index_length])
+        self.sections = index["sections"]
+        self.entries = index["elements"]
+        self.positions = {entry["element_id"]: i for i, entry in enumerate(self.entries)}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _slice(self, section: str, span: List[int]) -> bytes:
+        start = self.sections[section][0] + span[0]
+        return self.map[start:start + span[1]]
+
+    def position(self, element_id: str) -> int:
+        """Return the position of an element in the document."""
+        return self.positions[element_id]
+
+    def element_id(self, i: int) -> str:
+        """Return the element_id of the element at position i."""
+        return self.entries[i]["element_id"]
+
+    def text(self, i: int) -> str:
+        """Return the text of the element at position i."""
+        return self._slice("text", self.entries[i]["text"]).decode("utf-8")
+
+    def metadata(self, i: int) -> Dict[str, Any]:
+        """Return the metadata of the element at position i, without blob fields."""
+        return json.loads(self._slice("metadata", self.entries[i]["metadata"]))
+
+    def blob(self, i: int, field: str) -> Optional[bytes]:
+        """
+        Return the decoded bytes of a blob field, or None if the element has none.
+
+        Args:
+            i (int): Element position
+            field (str): One of `BLOB_FIELDS`
+
+        Returns:
+            Optional[bytes]: Raw blob bytes
+        """
+        span = self.entries[i]["blobs"].get(field)
+        return None if span is None else self._slice("blobs", span)
+
+    def orig_elements(self, i: int) -> Optional[List[Dict[str, Any]]]:
+        """Decode and return the original elements of a chunk, or None if absent."""
+        payload = self.blob(i, "orig_elements")
+        return None if payload is None else json.loads(zlib.decompress(payload))
+
+    def element(self, i: int, include_blobs: bool = False) -> Dict[str, Any]:
+        """
+        Rebuild the element at position i as it appeared in the source JSON.
+
+        Args:
+            i (int): Element position
+            include_blobs (bool): Re-encode blob fields as base64 into the metadata
+
+        Returns:
+            Dict[str, Any]: The element
+        """
+        entry = self.entries[i]
+        metadata = self.metadata(i)
+        if include_blobs:
+            for field in entry["blobs"]:
+                metadata[field] = base64.b64encode(self.blob(i, field)).decode("ascii")
+        return {
+            "type": entry["type"],
+            "element_id": entry["element_id"],
+            "text": self.text(i),
+            "metadata": metadata
+        }
+
+    def get(self, element_id: str, include_blobs: bool = False) -> Dict[str, Any]:
+        """Return the element with the given element_id."""
+        return self.element(self.position(element_id), include_blobs)
+
+    def iter_texts(self) -> Iterator[Tuple[str, str]]:
+        """Yield (element_id, text) for every element, in document order."""
+        for i, entry in enumerate(self.entries):
+            yield entry["element_id"], self.text(i)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self.entries)):
+            yield self.element(i)
+
+    def close(self) -> None:
+        """Release the memory map and the file."""
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "ElementStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
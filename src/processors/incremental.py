@@ -0,0 +1,126 @@
+import copy
+import difflib
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def manifest_path(output_path: str) -> Path:
+    """Return the page manifest path stored next to a processed output file."""
+    path = Path(output_path)
+    return path.with_name(path.stem + MANIFEST_SUFFIX)
+
+
+def load_manifest(output_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the page manifest of a processed output file.
+
+    Args:
+        output_path (str): Path of the processed JSON file
+
+    Returns:
+        Optional[Dict[str, Any]]: Manifest, or None if there is none
+    """
+    path = manifest_path(output_path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(output_path: str, pdf_path: str, hashes: List[str], request: Dict[str, Any]) -> Path:
+    """
+    Save the page hashes of the PDF a processed output file was made from.
+
+    Args:
+        output_path (str): Path of the processed JSON file
+        pdf_path (str): Path of the source PDF
+        hashes (List[str]): Content hash of each page, see `page_hashes`
+        request (Dict[str, Any]): Partition parameters the output was made with
+
+    Returns:
+        Path: Path of the manifest
+    """
+    path = manifest_path(output_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"pdf": Path(pdf_path).name, "request": request, "page_hashes": hashes}, f, indent=2)
+    return path
+
+
+def unchanged_pages(previous: List[str], current: List[str]) -> Dict[int, int]:
+    """
+    Match the pages of a revision with identical pages of the previous version.
+
+    Pages are aligned in order, so inserted or removed pages shift the
+    page numbers of the following ones without marking them as changed.
+
+    Args:
+        previous (List[str]): Page hashes of the previous version
+        current (List[str]): Page hashes of the revision
+
+    Returns:
+        Dict[int, int]: Previous page number of each unchanged page of the revision (1-based)
+    """
+    matcher = difflib.SequenceMatcher(None, previous, current, autojunk=False)
+    mapping = {}
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            mapping[block.b + offset + 1] = block.a + offset + 1
+    return mapping
+
+
+def splice_partition(
+    previous: List[Dict[str, Any]],
+    fresh: List[Dict[str, Any]],
+    page_map: Dict[int, int],
+    page_count: int
+) -> List[Dict[str, Any]]:
+    """
+    Build the partition of a revision from reused and freshly partitioned pages.
+
+    Unchanged pages take their elements from the previous partition, with
+    page numbers updated; the other pages take the elements partitioned
+    for them. Element ids that collide are rehashed with the page number,
+    and `parent_id` references to elements that no longer exist are dropped.
+
+    Args:
+        previous (List[Dict[str, Any]]): Partition of the previous version
+        fresh (List[Dict[str, Any]]): Elements of the changed pages, with document page numbers
+        page_map (Dict[int, int]): Previous page number of each unchanged page
+        page_count (int): Number of pages of the revision
+
+    Returns:
+        List[Dict[str, Any]]: Partition of the revision, in page order
+    """
+    def by_page(elements: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        pages = {}
+        for element in elements:
+            pages.setdefault(element.get("metadata", {}).get("page_number", 1), []).append(element)
+        return pages
+
+    previous_pages = by_page(previous)
+    fresh_pages = by_page(fresh)
+
+    spliced = []
+    seen_ids = set()
+    for page in range(1, page_count + 1):
+        if page in page_map:
+            elements = copy.deepcopy(previous_pages.get(page_map[page], []))
+        else:
+            elements = fresh_pages.get(page, [])
+        for element in elements:
+            metadata = element.setdefault("metadata", {})
+            metadata["page_number"] = page
+            if element.get("element_id") in seen_ids:
+                element["element_id"] = hashlib.sha256(f"{page}:{element['element_id']}".encode("utf-8")).hexdigest()[:32]
+            seen_ids.add(element.get("element_id"))
+            spliced.append(element)
+
+    for element in spliced:
+        metadata = element["metadata"]
+        if "parent_id" in metadata and metadata["parent_id"] not in seen_ids:
+            del metadata["parent_id"]
+    return spliced
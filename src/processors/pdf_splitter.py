@@ -0,0 +1,141 @@
+import hashlib
+import io
+from typing import Any, Dict, List, Optional, Tuple
+from pypdf import PdfReader, PdfWriter
+
+
+def split_pdf(pdf_path: str, pages_per_range: int) -> List[Tuple[int, bytes]]:
+    """
+    Split a PDF into consecutive page ranges.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        pages_per_range (int): Maximum number of pages in each range
+
+    Returns:
+        List[Tuple[int, bytes]]: First page number (1-based) and PDF bytes of each range
+    """
+    page_count = len(PdfReader(pdf_path).pages)
+    return extract_pages(pdf_path, list(range(1, page_count + 1)), pages_per_range)
+
+
+def extract_pages(pdf_path: str, pages: List[int], pages_per_range: Optional[int] = None) -> List[Tuple[int, bytes]]:
+    """
+    Copy selected pages of a PDF into one PDF per run of consecutive pages.
+
+    Each range holds consecutive pages only, so `merge_ranges` can shift
+    its page numbers by the range's first page.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        pages (List[int]): Page numbers (1-based) to extract
+        pages_per_range (Optional[int]): Maximum number of pages in each range, unlimited if None
+
+    Returns:
+        List[Tuple[int, bytes]]: First page number (1-based) and PDF bytes of each range
+    """
+    reader = PdfReader(pdf_path)
+    runs: List[List[int]] = []
+    for page in sorted(set(pages)):
+        if runs and page == runs[-1][-1] + 1 and (not pages_per_range or len(runs[-1]) < pages_per_range):
+            runs[-1].append(page)
+        else:
+            runs.append([page])
+
+    ranges = []
+    for run in runs:
+        writer = PdfWriter()
+        for page in run:
+            writer.add_page(reader.pages[page - 1])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        ranges.append((run[0], buffer.getvalue()))
+    return ranges
+
+
+def page_hashes(pdf_path: str) -> List[str]:
+    """
+    Hash the content of every page of a PDF.
+
+    A page hash covers its size, its content stream and the data of the
+    images and forms it draws, so it changes when the page looks different
+    but not when unrelated parts of the file (metadata, other pages) do.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Returns:
+        List[str]: SHA-256 hex digest of each page, in page order
+    """
+    hashes = []
+    for page in PdfReader(pdf_path).pages:
+        digest = hashlib.sha256(repr([float(value) for value in page.mediabox]).encode("ascii"))
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        _hash_resources(page.get("/Resources"), digest)
+        hashes.append(digest.hexdigest())
+    return hashes
+
+
+def _hash_resources(resources: Any, digest: "hashlib._Hash", depth: int = 0) -> None:
+    """Add the fonts and the images and forms (recursively) of a resource dictionary to a digest."""
+    resources = resources.get_object() if resources is not None else None
+    if not resources or depth > 8:
+        return
+    fonts = resources.get("/Font")
+    if fonts is not None:
+        fonts = fonts.get_object()
+        for name in sorted(fonts):
+            digest.update(f"{name}={fonts[name].get_object().get('/BaseFont')}".encode("utf-8"))
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            xobject = xobjects[name].get_object()
+            digest.update(name.encode("utf-8"))
+            # The encoded bytes identify an image as well; decoding large images is slow
+            digest.update(xobject._data)
+            if xobject.get("/Subtype") == "/Form":
+                _hash_resources(xobject.get("/Resources"), digest, depth + 1)
+
+
+def merge_ranges(results: List[Tuple[int, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Merge the elements returned for each page range into one partition.
+
+    Page numbers are shifted from range-relative to document-relative.
+    Element ids are derived from page-relative content, so identical
+    elements in different ranges can share an id; such ids are rehashed
+    with the range's first page and `parent_id` references inside the
+    range are updated to match.
+
+    Args:
+        results (List[Tuple[int, List[Dict[str, Any]]]]): First page number and
+            returned elements of each range, in document order
+
+    Returns:
+        List[Dict[str, Any]]: Elements of the whole document, in order
+    """
+    merged = []
+    seen_ids = set()
+    for first_page, elements in results:
+        renamed = {}
+        for element in elements:
+            element_id = element.get("element_id")
+            if element_id in seen_ids:
+                new_id = hashlib.sha256(f"{first_page}:{element_id}".encode("utf-8")).hexdigest()[:32]
+                renamed[element_id] = new_id
+                element["element_id"] = new_id
+            seen_ids.add(element["element_id"])
+
+            metadata = element.get("metadata", {})
+            if isinstance(metadata.get("page_number"), int):
+                metadata["page_number"] += first_page - 1
+
+        for element in elements:
+            metadata = element.get("metadata", {})
+            if metadata.get("parent_id") in renamed:
+                metadata["parent_id"] = renamed[metadata["parent_id"]]
+        merged.extend(elements)
+    return merged
@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, List, Optional
+
+TEXT_SEPARATOR = "\n\n"
+
+# Elements that mark layout only and never contribute to a chunk
+SKIPPED_TYPES = ("PageBreak",)
+
+
+def encode_orig_elements(elements: List[Dict[str, Any]]) -> str:
+    """
+    Encode elements the way the Unstructured API stores `orig_elements`.
+
+    Args:
+        elements (List[Dict[str, Any]]): Original elements of a chunk
+
+    Returns:
+        str: Base64 of the zlib-compressed JSON list
+    """
+    payload = json.dumps(elements, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(payload)).decode("ascii")
+
+
+def decode_orig_elements(payload: str) -> List[Dict[str, Any]]:
+    """
+    Decode an `orig_elements` value produced by the Unstructured API.
+
+    Args:
+        payload (str): Base64 of the zlib-compressed JSON list
+
+    Returns:
+        List[Dict[str, Any]]: Original elements of the chunk
+    """
+    return json.loads(zlib.decompress(base64.b64decode(payload)))
+
+
+def _text_length(elements: List[Dict[str, Any]]) -> int:
+    texts = [element["text"] for element in elements if element.get("text")]
+    return sum(len(text) for text in texts) + len(TEXT_SEPARATOR) * max(len(texts) - 1, 0)
+
+
+def _split_text(text: str, max_characters: int) -> List[str]:
+    """Split text into pieces of at most max_characters, preferring whitespace boundaries."""
+    pieces = []
+    while len(text) > max_characters:
+        cut = text.rfind(" ", 0, max_characters + 1)
+        if cut <= 0:
+            cut = max_characters
+        pieces.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _pre_chunks(elements: List[Dict[str, Any]], max_characters: int, new_after_n_chars: int) -> List[List[Dict[str, Any]]]:
+    """Group elements into sections that start at titles and respect the size limits."""
+    pre_chunks = []
+    current = []
+    current_length = 0
+    for element in elements:
+        if element.get("type") in SKIPPED_TYPES:
+            continue
+        length = len(element.get("text") or "")
+        separator = len(TEXT_SEPARATOR) if current_length and length else 0
+        starts_section = (
+            element.get("type") == "Title"
+            or current_length >= new_after_n_chars
+            or current_length + separator + length > max_characters
+        )
+        if current and starts_section:
+            pre_chunks.append(current)
+            current, current_length, separator = [], 0, 0
+        current.append(element)
+        current_length += separator + length
+    if current:
+        pre_chunks.append(current)
+    return pre_chunks
+
+
+def _combine(pre_chunks: List[List[Dict[str, Any]]], max_characters: int, combine_text_under_n_chars: int) -> List[List[Dict[str, Any]]]:
+    """Merge consecutive small sections while the result stays within max_characters."""
+    combined = []
+    current = []
+    current_length = 0
+    for pre_chunk in pre_chunks:
+        length = _text_length(pre_chunk)
+        separator = len(TEXT_SEPARATOR) if current_length and length else 0
+        if current and current_length < combine_text_under_n_chars and current_length + separator + length <= max_characters:
+            current.extend(pre_chunk)
+            current_length += separator + length
+            continue
+        if current:
+            combined.append(current)
+        current, current_length = list(pre_chunk), length
+    if current:
+        combined.append(current)
+    return combined
+
+
+def _chunk_id(filename: Optional[str], index: int, text: str) -> str:
+    return hashlib.sha256(f"{filename}:{index}:{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def _build_chunks(
+    elements: List[Dict[str, Any]],
+    max_characters: int,
+    include_orig_elements: bool,
+    start_index: int
+) -> List[Dict[str, Any]]:
+    """Build one CompositeElement, or several when its text exceeds max_characters."""
+    first_metadata = elements[0].get("metadata", {})
+    text = TEXT_SEPARATOR.join(element["text"] for element in elements if element.get("text"))
+
+    languages = []
+    for element in elements:
+        for language in element.get("metadata", {}).get("languages", []):
+            if language not in languages:
+                languages.append(language)
+
+    metadata = {
+        "filetype": first_metadata.get("filetype"),
+        "languages": languages,
+        "page_number": first_metadata.get("page_number"),
+    }
+    tables_html = [
+        element["metadata"]["text_as_html"]
+        for element in elements
+        if element.get("metadata", {}).get("text_as_html")
+    ]
+    if tables_html:
+        metadata["text_as_html"] = " ".join(tables_html)
+    if include_orig_elements:
+        metadata["orig_elements"] = encode_orig_elements(elements)
+    filename = next((e["metadata"]["filename"] for e in elements if e.get("metadata", {}).get("filename")), None)
+    if filename:
+        metadata["filename"] = filename
+
+    chunks = []
+    for offset, piece in enumerate(_split_text(text, max_characters) or [""]):
+        chunks.append({
+            "type": "CompositeElement",
+            "element_id": _chunk_id(filename, start_index + offset, piece),
+            "text": piece,
+            "metadata": dict(metadata)
+        })
+    return chunks
+
+
+def chunk_by_title(
+    elements: List[Dict[str, Any]],
+    max_characters: int = 500,
+    new_after_n_chars: Optional[int] = None,
+    combine_text_under_n_chars: Optional[int] = None,
+    include_orig_elements: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Chunk partitioned elements by title, like the API's `by_title` strategy.
+
+    Elements are grouped into sections that start at each Title. A section
+    is also closed once it reaches `new_after_n_chars` (soft limit) or when
+    the next element would push it past `max_characters` (hard limit).
+    Consecutive sections are then combined while the running chunk is
+    shorter than `combine_text_under_n_chars`. A single element longer
+    than `max_characters` is split into several chunks.
+
+    The output has the same shape as the API's chunked output: one
+    CompositeElement per chunk with the joined text, consolidated metadata
+    and, optionally, the original elements encoded in `orig_elements`.
+
+    Args:
+        elements (List[Dict[str, Any]]): Elements from a no-chunking partition
+        max_characters (int): Hard maximum chunk size
+        new_after_n_chars (Optional[int]): Soft maximum chunk size, defaults to max_characters
+        combine_text_under_n_chars (Optional[int]): Combine sections shorter than this,
+            defaults to max_characters
+        include_orig_elements (bool): Store the original elements in each chunk's metadata
+
+    Returns:
+        List[Dict[str, Any]]: Chunk elements
+    """
+    new_after_n_chars = min(new_after_n_chars or max_characters, max_characters)
+    if combine_text_under_n_chars is None:
+        combine_text_under_n_chars = max_characters
+
+    pre_chunks = _pre_chunks(elements, max_characters, new_after_n_chars)
+    chunks = []
+    for group in _combine(pre_chunks, max_characters, combine_text_under_n_chars):
+        chunks.extend(_build_chunks(group, max_characters, include_orig_elements, len(chunks)))
+    return chunks
@@ -1,26 +1,197 @@
-import requests
 import os
 import json
 import base64
-from typing import List, Dict, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from unstructured_ingest.v2.interfaces import ProcessorConfig
+from functools import partial
+from .asset_store import extract_assets
+from .element_store import write_element_store
+from .incremental import load_manifest, splice_partition, unchanged_pages, write_manifest
+from .pdf_splitter import extract_pages, merge_ranges, page_hashes, split_pdf
+from .title_chunker import chunk_by_title
+from ..utils.cache import CacheMissError, ResponseCache
+from ..utils.json_stream import iter_json_array, rewrite_json_array, strip_field, transform_json_array
+from ..utils.metrics import MetricsRegistry
+from ..utils.transport import HttpTransport
+
+# Partition request of `process_pdf_no_chunking`, recorded in its page manifest
+NO_CHUNKING_REQUEST = {
+    "strategy": "hi_res",  # Use hi_res for tables and images
+    "output_format": "application/json",
+    "extract_image_block_types": '["Image", "Table"]', # Extract image and table
+    "pdf_infer_table_structure": "true",  # For HTML table output
+}
+
+# Chunking parameters shared by the API request and the local chunker
+CHUNKING_PARAMS = {
+    "max_characters": 120000,  # Very large chunk size
+    "new_after_n_chars": 100000,  # Slightly less, soft limit
+    "combine_under_n_chars": 10000, # Combine small titles/paragraphs
+}
 
 class UnstructuredProcessor:
-    """A class to handle PDF processing using the Unstructured API."""
+    """
+    A class to handle PDF processing using the Unstructured API.
+    
+    Requests go through a shared `HttpTransport`, which keeps connections
+    alive, applies timeouts and retries transient failures (429, 5xx,
+    connection errors) with backoff. Errors that persist are raised as
+    `TransportError` instead of being swallowed.
+    
+    When `pages_per_range` is set, PDFs are split locally into page ranges
+    that are partitioned concurrently and merged back in order. Each range
+    is retried on its own if it fails.
+    
+    With a `cache`, partitions are stored under the PDF's SHA-256 and the
+    request parameters, so re-running on an unchanged PDF skips the API.
+    In `offline` mode a cache miss raises `CacheMissError` instead.
+    """
     
-    def __init__(self, api_key: str, api_url: str):
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str,
+        pages_per_range: Optional[int] = None,
+        max_workers: int = 4,
+        transport: Optional[HttpTransport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        cache: Optional[ResponseCache] = None,
+        offline: bool = False
+    ):
         """
         Initialize the UnstructuredProcessor.
         
         Args:
             api_key (str): The API key for Unstructured API
             api_url (str): The URL endpoint for Unstructured API
+            pages_per_range (Optional[int]): Pages per concurrent upload, None to upload whole PDFs
+            max_workers (int): Number of page ranges uploaded in parallel
+            transport (Optional[HttpTransport]): HTTP transport, a pooled one sized
+                for `max_workers` if None
+            metrics (Optional[MetricsRegistry]): Registry for stage timings and upload
+                counters, shared with the default transport
+            cache (Optional[ResponseCache]): Cache of partition responses, best opened
+                with `compress=True`; disabled if None
+            offline (bool): Never call the API; fail on partitions that are not cached
         """
         self.api_key = api_key
         self.api_url = api_url
         self.headers = {
             "unstructured-api-key": api_key,
         }
+        self.pages_per_range = pages_per_range
+        self.max_workers = max_workers
+        self.metrics = metrics or MetricsRegistry()
+        self.cache = cache
+        self.offline = offline
+        self.transport = transport or HttpTransport(pool_size=max_workers, metrics=self.metrics)
+
+    def _post_pdf(self, filename: str, content: bytes, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Send one PDF (or page range) to the API and return its elements.
+        
+        Args:
+            filename (str): File name reported to the API
+            content (bytes): PDF bytes
+            data (Dict[str, Any]): Form parameters of the request
+            
+        Returns:
+            List[Dict[str, Any]]: Elements returned by the API
+            
+        Raises:
+            TransportError: If the request fails after retries
+        """
+        self.metrics.inc("unstructured_bytes_uploaded_total", len(content))
+        with self.metrics.span("unstructured_request"):
+            response = self.transport.post(
+                self.api_url,
+                headers=self.headers,
+                data=data,
+                files={"files": (filename, content, "application/pdf")},
+            )
+        elements = response.json()
+        self.metrics.inc("unstructured_elements_total", len(elements))
+        return elements
+
+    def partition_pdf(self, pdf_path: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Partition a PDF with the API, splitting it into page ranges if configured.
+        
+        Split results have document-relative page numbers and unique element
+        ids. Chunking is applied per range by the API, so when splitting it
+        is better to partition without chunking and use `chunk_elements`.
+        
+        Responses are served from and stored in the cache when there is one.
+        
+        Args:
+            pdf_path (str): Path to the input PDF file
+            data (Dict[str, Any]): Form parameters of the request
+            
+        Returns:
+            List[Dict[str, Any]]: Elements of the whole document
+            
+        Raises:
+            TransportError: If the PDF, or one of its page ranges, fails after retries
+            CacheMissError: If the processor is offline and the partition is not cached
+        """
+        cache_key = self._cache_key(pdf_path, data)
+        if cache_key is not None:
+            cached = self.cache.get_json(cache_key)
+            if cached is not None:
+                self.metrics.inc("unstructured_cache_hits_total")
+                print(f"Partition of {os.path.basename(pdf_path)} served from cache")
+                return cached
+        if self.offline:
+            raise CacheMissError(f"Partition of {pdf_path} is not cached and the processor is offline")
+
+        elements = self._partition(pdf_path, data)
+        if cache_key is not None:
+            self.cache.set_json(cache_key, elements)
+        return elements
+
+    def _cache_key(self, pdf_path: str, data: Dict[str, Any]) -> Optional[str]:
+        """Return the cache key of a partition request, or None when caching is disabled."""
+        if self.cache is None:
+            return None
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        # Page ranges are partitioned independently, so the split changes the result
+        return ResponseCache.make_key("unstructured", digest.hexdigest(), data, self.pages_per_range)
+
+    def _partition(self, pdf_path: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Partition a PDF with the API, see `partition_pdf`."""
+        filename = os.path.basename(pdf_path)
+        with self.metrics.span("partition"):
+            if not self.pages_per_range:
+                with open(pdf_path, "rb") as f:
+                    return self._post_pdf(filename, f.read(), data)
+
+            return self._partition_ranges(filename, split_pdf(pdf_path, self.pages_per_range), data)
+
+    def _partition_ranges(self, filename: str, ranges: List[Tuple[int, bytes]], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Upload page ranges concurrently and merge their elements in order.
+        
+        Args:
+            filename (str): File name reported to the API
+            ranges (List[Tuple[int, bytes]]): First page number and PDF bytes of each range
+            data (Dict[str, Any]): Form parameters of the requests
+            
+        Returns:
+            List[Dict[str, Any]]: Elements of all ranges with document page numbers
+        """
+        print(f"Uploading {len(ranges)} page ranges of {filename} with {self.max_workers} workers...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._post_pdf, filename, content, data)
+                for _, content in ranges
+            ]
+            results = [(first_page, future.result()) for (first_page, _), future in zip(ranges, futures)]
+        return merge_ranges(results)
 
     def process_pdf_no_chunking(self, pdf_path: str, output_path: str) -> None:
         """
@@ -29,34 +200,70 @@ class UnstructuredProcessor:
         Args:
             pdf_path (str): Path to the input PDF file
             output_path (str): Path where the output JSON will be saved
+            
+        Raises:
+            TransportError: If the API request fails after retries
         """
-        data = {
-            "strategy": "hi_res",  # Use hi_res for tables and images
-            "output_format": "application/json",
-            "extract_image_block_types": '["Image", "Table"]', # Extract image and table
-            "pdf_infer_table_structure": "true",  # For HTML table output
-        }
+        json_data = self.partition_pdf(pdf_path, NO_CHUNKING_REQUEST)
 
-        with open(pdf_path, "rb") as f:
-            files = {"files": (os.path.basename(pdf_path), f, "application/pdf")}
+        with open(output_path, 'w', encoding='utf-8') as json_file:
+            json.dump(json_data, json_file, ensure_ascii=False, indent=4)
+        write_manifest(output_path, pdf_path, page_hashes(pdf_path), NO_CHUNKING_REQUEST)
 
-            try:
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    data=data,
-                    files=files,
-                )
-                response.raise_for_status()
-                json_data = response.json()
+        print(f"No-chunking processing successful. Output saved to: {output_path}")
 
-                with open(output_path, 'w', encoding='utf-8') as json_file:
-                    json.dump(json_data, json_file, ensure_ascii=False, indent=4)
+    def process_pdf_incremental(self, pdf_path: str, output_path: str) -> Dict[str, int]:
+        """
+        Re-process a revised PDF, partitioning only the pages that changed.
+        
+        `process_pdf_no_chunking` stores a manifest of page content hashes
+        next to its output. Here the revision's pages are hashed and aligned
+        with the manifest: unchanged pages reuse their elements from the
+        previous output, changed and inserted pages are uploaded (as runs of
+        consecutive pages), and the two are spliced into a new partition
+        with the revision's page numbers. Without a usable manifest the whole
+        PDF is processed.
+        
+        Args:
+            pdf_path (str): Path to the revised PDF file
+            output_path (str): Path of the previous no-chunking output, overwritten with the new one
+            
+        Returns:
+            Dict[str, int]: Number of pages, pages partitioned and pages reused
+            
+        Raises:
+            TransportError: If the API request fails after retries
+            CacheMissError: If the processor is offline and pages changed
+        """
+        hashes = page_hashes(pdf_path)
+        manifest = load_manifest(output_path)
+        if manifest is None or manifest.get("request") != NO_CHUNKING_REQUEST or not os.path.exists(output_path):
+            self.process_pdf_no_chunking(pdf_path, output_path)
+            return {"pages": len(hashes), "partitioned": len(hashes), "reused": 0}
 
-                print(f"No-chunking processing successful. Output saved to: {output_path}")
+        page_map = unchanged_pages(manifest["page_hashes"], hashes)
+        changed = [page for page in range(1, len(hashes) + 1) if page not in page_map]
+        if changed and self.offline:
+            raise CacheMissError(f"{len(changed)} changed pages of {pdf_path} need the API and the processor is offline")
+        with self.metrics.span("partition"):
+            fresh = self._partition_ranges(
+                os.path.basename(pdf_path),
+                extract_pages(pdf_path, changed, self.pages_per_range),
+                NO_CHUNKING_REQUEST
+            ) if changed else []
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error processing PDF: {e}")
+        with open(output_path, 'r', encoding='utf-8') as json_file:
+            previous = json.load(json_file)
+        json_data = splice_partition(previous, fresh, page_map, len(hashes))
+
+        with open(output_path, 'w', encoding='utf-8') as json_file:
+            json.dump(json_data, json_file, ensure_ascii=False, indent=4)
+        write_manifest(output_path, pdf_path, hashes, NO_CHUNKING_REQUEST)
+
+        counts = {"pages": len(hashes), "partitioned": len(changed), "reused": len(page_map)}
+        print(f"Incremental processing: {counts['partitioned']} of {counts['pages']} pages partitioned, "
+              f"{counts['reused']} reused. Output saved to: {output_path}")
+        return counts
 
     def process_pdf_with_chunking(self, pdf_path: str, output_path: str) -> None:
         """
@@ -65,81 +272,183 @@ class UnstructuredProcessor:
         Args:
             pdf_path (str): Path to the input PDF file
             output_path (str): Path where the output JSON will be saved
+            
+        Raises:
+            TransportError: If the API request fails after retries
         """
         data = {
             "strategy": "hi_res",
             "output_format": "application/json",
             "chunking_strategy": "by_title",
-            "max_characters": 120000,  # Very large chunk size
-            "new_after_n_chars": 100000,  # Slightly less, soft limit
-            "combine_under_n_chars": 10000, # Combine small titles/paragraphs
+            **CHUNKING_PARAMS,
             "extract_image_block_types": '["Image", "Table"]',
             "pdf_infer_table_structure": "true",
         }
 
-        with open(pdf_path, "rb") as f:
-            files = {"files": (os.path.basename(pdf_path), f, "application/pdf")}
+        json_data = self.partition_pdf(pdf_path, data)
+
+        with open(output_path, 'w', encoding='utf-8') as json_file:
+            json.dump(json_data, json_file, ensure_ascii=False, indent=4)
+        print(f"Chunking processing successful. Output saved to: {output_path}")
+
+    def chunk_elements(
+        self,
+        input_path: str,
+        output_path: str,
+        max_characters: int = CHUNKING_PARAMS["max_characters"],
+        new_after_n_chars: int = CHUNKING_PARAMS["new_after_n_chars"],
+        combine_text_under_n_chars: int = CHUNKING_PARAMS["combine_under_n_chars"],
+        include_orig_elements: bool = True
+    ) -> None:
+        """
+        Chunks a no-chunking partition by title locally and saves the JSON.
+        
+        Produces the same output as `process_pdf_with_chunking` from the
+        output of `process_pdf_no_chunking`, so a document only needs one
+        hi_res API call.
+        
+        Args:
+            input_path (str): Path to the no-chunking JSON file
+            output_path (str): Path where the chunked JSON will be saved
+            max_characters (int): Hard maximum chunk size
+            new_after_n_chars (int): Soft maximum chunk size
+            combine_text_under_n_chars (int): Combine sections shorter than this
+            include_orig_elements (bool): Keep the original elements in each chunk's metadata
+            
+        Raises:
+            FileNotFoundError: If the input file does not exist
+            json.JSONDecodeError: If the input file is not valid JSON
+        """
+        with open(input_path, 'r', encoding='utf-8') as infile:
+            elements = json.load(infile)
 
-            try:
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    data=data,
-                    files=files,
-                )
-                response.raise_for_status()
-                json_data = response.json()
+        with self.metrics.span("chunking"):
+            chunks = chunk_by_title(
+                elements,
+                max_characters=max_characters,
+                new_after_n_chars=new_after_n_chars,
+                combine_text_under_n_chars=combine_text_under_n_chars,
+                include_orig_elements=include_orig_elements
+            )
 
-                with open(output_path, 'w', encoding='utf-8') as json_file:
-                    json.dump(json_data, json_file, ensure_ascii=False, indent=4)
-                print(f"Chunking processing successful. Output saved to: {output_path}")
+        with open(output_path, 'w', encoding='utf-8') as outfile:
+            json.dump(chunks, outfile, ensure_ascii=False, indent=4)
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error processing PDF: {e}")
+        print(f"Local chunking successful ({len(chunks)} chunks). Output saved to: {output_path}")
 
-    def clean_orig_elements(self, input_path: str, output_path: str) -> None:
+    def build_element_store(self, input_path: str, output_path: str) -> int:
         """
-        Loads a JSON file, removes the 'orig_elements' field from metadata,
-        and saves the cleaned JSON to a new file.
+        Converts a processed JSON file into an indexed element store.
+        
+        The JSON is streamed element by element. The resulting store gives
+        random access to each element's text and metadata through mmap, and
+        keeps large base64 payloads (orig_elements, images) in a separate
+        blob section that is only decoded on request.
         
         Args:
-            input_path (str): Path to the input JSON file
-            output_path (str): Path where the cleaned JSON will be saved
+            input_path (str): Path to the processed JSON file
+            output_path (str): Path where the element store will be saved
+            
+        Returns:
+            int: Number of elements stored
         """
-        try:
-            with open(input_path, 'r', encoding='utf-8') as infile:
-                data = json.load(infile)
+        with self.metrics.span("element_store"), open(input_path, 'r', encoding='utf-8') as infile:
+            count = write_element_store(iter_json_array(infile), output_path)
+        print(f"Element store with {count} elements saved to: {output_path}")
+        return count
 
-            for element in data:
-                if "metadata" in element and "orig_elements" in element["metadata"]:
-                    del element["metadata"]["orig_elements"]
+    def extract_assets(
+        self,
+        input_path: str,
+        output_path: str,
+        asset_dir: str,
+        max_workers: Optional[int] = None,
+        compact: bool = False
+    ) -> Dict[str, int]:
+        """
+        Moves base64 images out of a JSON file into a content-addressed asset store.
+        
+        Unlike `remove_base64_images`, the images are kept: each one is
+        decoded in a process pool, written once to `asset_dir` under the
+        sha256 of its content and replaced in the metadata by its file name
+        (`image_asset`). Images inside `orig_elements` are extracted too.
+        Repeated images, within or across documents, share one file.
+        
+        Args:
+            input_path (str): Path to the input JSON file
+            output_path (str): Path where the JSON with asset references will be saved
+            asset_dir (str): Directory of the asset store
+            max_workers (Optional[int]): Worker processes, the CPU count if None
+            compact (bool): Write compact JSON instead of indenting it
+            
+        Returns:
+            Dict[str, int]: Number of elements, assets newly written and assets reused
+        """
+        counts = {}
+        with self.metrics.span("extract_assets"):
+            counts["elements"] = rewrite_json_array(
+                input_path,
+                output_path,
+                partial(extract_assets, asset_dir=asset_dir, max_workers=max_workers, counts=counts),
+                indent=None if compact else 4
+            )
+        print(
+            f"Extracted {counts['written']} new and {counts['reused']} existing assets to {asset_dir}. "
+            f"Output saved to: {output_path}"
+        )
+        return counts
 
-            with open(output_path, 'w', encoding='utf-8') as outfile:
-                json.dump(data, outfile, ensure_ascii=False, indent=4)
+    def strip_fields(self, input_path: str, output_path: str, fields: List[str], compact: bool = False) -> int:
+        """
+        Streams a JSON file element by element, removing the given fields in one pass.
+        
+        Memory use stays constant regardless of the file size, since only
+        one element is held at a time.
+        
+        Args:
+            input_path (str): Path to the input JSON file
+            output_path (str): Path where the cleaned JSON will be saved
+            fields (List[str]): Dotted field paths to remove, e.g. "metadata.orig_elements"
+            compact (bool): Write compact JSON instead of indenting it
+            
+        Returns:
+            int: Number of elements written
+        """
+        return transform_json_array(
+            input_path,
+            output_path,
+            [strip_field(field) for field in fields],
+            indent=None if compact else 4
+        )
 
+    def clean_orig_elements(self, input_path: str, output_path: str, compact: bool = False) -> None:
+        """
+        Removes the 'orig_elements' field from metadata and saves the
+        cleaned JSON to a new file.
+        
+        Args:
+            input_path (str): Path to the input JSON file
+            output_path (str): Path where the cleaned JSON will be saved
+            compact (bool): Write compact JSON instead of indenting it
+        """
+        try:
+            self.strip_fields(input_path, output_path, ["metadata.orig_elements"], compact=compact)
             print(f"Cleaned JSON saved to: {output_path}")
 
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error processing JSON: {e}")
 
-    def remove_base64_images(self, input_path: str, output_path: str) -> None:
+    def remove_base64_images(self, input_path: str, output_path: str, compact: bool = False) -> None:
         """
-        Loads JSON, removes 'image_base64' from 'metadata', saves cleaned JSON.
+        Removes 'image_base64' from 'metadata' and saves the cleaned JSON.
         
         Args:
             input_path (str): Path to the input JSON file
             output_path (str): Path where the cleaned JSON will be saved
+            compact (bool): Write compact JSON instead of indenting it
         """
         try:
-            with open(input_path, 'r', encoding='utf-8') as infile:
-                data = json.load(infile)
-
-            for element in data:
-                if "metadata" in element and "image_base64" in element["metadata"]:
-                    del element["metadata"]["image_base64"]
-
-            with open(output_path, 'w', encoding='utf-8') as outfile:
-                json.dump(data, outfile, ensure_ascii=False, indent=4)
+            self.strip_fields(input_path, output_path, ["metadata.image_base64"], compact=compact)
             print(f"JSON with base64 images removed saved to: {output_path}")
 
         except (FileNotFoundError, json.JSONDecodeError) as e:
@@ -0,0 +1,21 @@
+"""
+Prompt layout shared by slide generation and validation.
+
+OpenAI caches prompt prefixes: when a request starts with the same tokens
+(at least 1024) as a recent one, that prefix is billed at a discount and
+processed faster. Generation and validation are therefore laid out as one
+conversation:
+
+1. System prompt: the generation guidelines, identical for every request
+2. User: the generation prompt with the source content
+3. Assistant: the generated slide (validation only)
+4. User: the validation guidelines and request (validation only)
+
+Each validation request repeats the messages of the generation request as
+its prefix. The validation guidelines only appear in the validation turn,
+so generation requests carry nothing but generation instructions, and each
+turn has its own structured output format.
+"""
+from .gen_prompts import STORYBOARD_SYSTEM_PROMPT
+
+SYSTEM_PROMPT = STORYBOARD_SYSTEM_PROMPT
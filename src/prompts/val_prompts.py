@@ -1,4 +1,4 @@
-VALIDATION_SYSTEM_PROMPT = """You are an expert content validator specialized in analyzing the groundedness of educational materials. Your task is to evaluate how well a generated slide (including title and content) and its instructor dialogue align with the source content. Follow these evaluation criteria:
+VALIDATION_GUIDELINES = """Now act as an expert content validator specialized in analyzing the groundedness of educational materials. Your task is to evaluate how well the slide you just generated (including title and content) and its instructor dialogue align with the SOURCE CONTENT above. Follow these evaluation criteria:
 
 1. TITLE ACCURACY:
    - Title should accurately reflect the main topic
@@ -31,18 +31,8 @@ VALIDATION_SYSTEM_PROMPT = """You are an expert content validator specialized in
 
 Provide detailed feedback explaining your score and any identified issues."""
 
-VALIDATION_USER_PROMPT_TEMPLATE = """Evaluate the groundedness of the following slide and instructor dialogue against the source content:
+# Sent as a follow-up turn of the generation conversation, after the slide.
+# The source content is already in the conversation, so it is not repeated.
+VALIDATION_FOLLOW_UP_PROMPT = f"""{VALIDATION_GUIDELINES}
 
-SOURCE CONTENT:
-{text}
-
-SLIDE TITLE:
-{slide_title}
-
-SLIDE CONTENT:
-{slide_content}
-
-INSTRUCTOR DIALOGUE:
-{slide_dialogue}
-
-Analyze the groundedness and provide a score and detailed feedback."""
\ No newline at end of file
+Analyze the groundedness and provide a score and detailed feedback."""
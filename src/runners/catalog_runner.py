@@ -0,0 +1,224 @@
+import json
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from ..formatters.mooc_formatter import MOOCFormatter
+from ..generators.presentation_generator import PresentationGenerator
+from ..processors.element_store import ELEMENT_STORE_SUFFIX
+from ..processors.unstructured_processor import UnstructuredProcessor
+from ..utils.metrics import MetricsRegistry
+
+# Manifest files list one PDF path per line, or hold a JSON list of paths
+MANIFEST_SUFFIXES = (".txt", ".json")
+
+
+class DocumentResult(BaseModel):
+    """Outcome of one document of a catalog run."""
+    pdf_path: str
+    status: str = "pending"
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
+    results_path: Optional[str] = None
+    pdf_output: Optional[str] = None
+    stage_seconds: Dict[str, float] = Field(default_factory=dict)
+
+
+def load_catalog(source: str) -> List[Path]:
+    """
+    List the PDFs of a catalog.
+
+    Args:
+        source (str): Directory searched recursively for PDFs, or a manifest
+            file (.txt with one path per line, or .json with a list of paths).
+            Relative manifest paths are resolved against the manifest's directory.
+
+    Returns:
+        List[Path]: PDF paths, in a stable order
+
+    Raises:
+        ValueError: If the source is neither a directory nor a manifest
+    """
+    path = Path(source)
+    if path.is_dir():
+        return sorted(path.rglob("*.pdf"))
+    if path.suffix not in MANIFEST_SUFFIXES:
+        raise ValueError(f"{source} is not a directory or a .txt/.json manifest")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == ".json":
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    return [path.parent / entry for entry in entries]
+
+
+class CatalogRunner:
+    """
+    Runs processing, chunking, generation and formatting over a catalog of PDFs.
+
+    Each document goes through its stages in order on its own thread, and up
+    to `max_documents` documents are in flight, so one document can be
+    partitioned while another generates slides and a third is rendered.
+    Each external service has its own global limit shared by all documents:
+
+    - Unstructured: at most `unstructured_concurrency` documents are uploaded
+      at a time (each may upload several page ranges, see `UnstructuredProcessor`)
+    - OpenAI: the shared generator's rate limits and `max_inflight_requests`
+    - Rendering: CPU-bound, done in a pool of `render_workers` processes
+
+    A document that fails is recorded with the stage and error and does not
+    stop the others.
+    """
+
+    def __init__(
+        self,
+        processor: UnstructuredProcessor,
+        generator: PresentationGenerator,
+        formatter: MOOCFormatter,
+        processed_dir: str = "data/processed_input",
+        max_documents: int = 8,
+        unstructured_concurrency: int = 2,
+        render_workers: int = 2,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize the CatalogRunner.
+
+        Args:
+            processor (UnstructuredProcessor): Processor shared by all documents
+            generator (PresentationGenerator): Generator shared by all documents,
+                so its rate limits apply to the whole catalog
+            formatter (MOOCFormatter): Formatter used in the render processes
+            processed_dir (str): Directory for the processed JSON and element stores
+            max_documents (int): Documents in flight at the same time
+            unstructured_concurrency (int): Documents uploaded to Unstructured at the same time
+            render_workers (int): Processes rendering PDFs
+            metrics (Optional[MetricsRegistry]): Registry for per-document stage timings,
+                the generator's if None
+        """
+        self.processor = processor
+        self.generator = generator
+        self.formatter = formatter
+        self.processed_dir = Path(processed_dir)
+        self.processed_dir.mkdir(parents=True, exist_ok=True)
+        self.max_documents = max_documents
+        self.render_workers = render_workers
+        self.unstructured_slots = threading.BoundedSemaphore(unstructured_concurrency)
+        self.render_pool = None
+        self.metrics = metrics or generator.metrics
+
+    def document_names(self, pdf_paths: List[Path]) -> List[str]:
+        """Return a unique output name per PDF, based on its file name."""
+        names = []
+        seen = {}
+        for pdf_path in pdf_paths:
+            name = pdf_path.stem
+            count = seen.get(name, 0)
+            seen[name] = count + 1
+            names.append(name if count == 0 else f"{name}_{count + 1}")
+        return names
+
+    def process_document(self, pdf_path: Path, name: str, resume: bool = False) -> DocumentResult:
+        """
+        Run all stages for one document, recording failures instead of raising.
+
+        Args:
+            pdf_path (Path): PDF to process
+            name (str): Unique name used for the document's output files
+            resume (bool): Reuse an existing element store and results checkpoint
+
+        Returns:
+            DocumentResult: Outcome, output paths and seconds spent per stage
+        """
+        result = DocumentResult(pdf_path=str(pdf_path))
+        no_chunking_output = self.processed_dir / f"{name}_no_chunking.json"
+        chunking_output = self.processed_dir / f"{name}.json"
+        element_store = self.processed_dir / f"{name}{ELEMENT_STORE_SUFFIX}"
+
+        processed = resume and element_store.exists()
+
+        stage = "processing"
+        try:
+            started = time.monotonic()
+            if not processed:
+                with self.unstructured_slots:
+                    self.processor.process_pdf_no_chunking(str(pdf_path), str(no_chunking_output))
+            result.stage_seconds[stage] = time.monotonic() - started
+
+            stage = "chunking"
+            started = time.monotonic()
+            if not processed:
+                self.processor.chunk_elements(str(no_chunking_output), str(chunking_output))
+                self.processor.build_element_store(str(chunking_output), str(element_store))
+            result.stage_seconds[stage] = time.monotonic() - started
+
+            stage = "generation"
+            started = time.monotonic()
+            result.results_path = self.generator.run(str(element_store), resume=resume)
+            result.stage_seconds[stage] = time.monotonic() - started
+
+            stage = "formatting"
+            started = time.monotonic()
+            result.pdf_output = self.render_pool.submit(self.formatter.format_results, result.results_path).result()
+            result.stage_seconds[stage] = time.monotonic() - started
+            result.status = "completed"
+            self.metrics.inc("documents_total", status="completed")
+        except Exception as e:
+            result.status = "failed"
+            result.failed_stage = stage
+            result.error = f"{type(e).__name__}: {e}"
+            self.metrics.inc("documents_total", status="failed", stage=stage)
+            print(f"{pdf_path} failed during {stage}:\n{traceback.format_exc()}")
+        # Rendering happens in another process, so its time is only recorded here
+        for stage_name, seconds in result.stage_seconds.items():
+            self.metrics.observe("document_stage_seconds", seconds, stage=stage_name)
+        return result
+
+    def run(self, source: str, resume: bool = False, report_path: Optional[str] = None) -> List[DocumentResult]:
+        """
+        Process every PDF of a catalog.
+
+        Args:
+            source (str): Catalog directory or manifest, see `load_catalog`
+            resume (bool): Continue an interrupted catalog run
+            report_path (Optional[str]): Where to save the JSON report of the
+                run, `catalog_report.json` in the generator's output directory if None
+
+        Returns:
+            List[DocumentResult]: One result per PDF, in catalog order
+        """
+        pdf_paths = load_catalog(source)
+        names = self.document_names(pdf_paths)
+        print(f"Processing {len(pdf_paths)} documents, up to {self.max_documents} at a time...")
+
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=self.render_workers) as render_pool, \
+                ThreadPoolExecutor(max_workers=self.max_documents) as executor:
+            self.render_pool = render_pool
+            futures = [
+                executor.submit(self.process_document, pdf_path, name, resume)
+                for pdf_path, name in zip(pdf_paths, names)
+            ]
+            results = [future.result() for future in futures]
+        self.render_pool = None
+        elapsed = time.monotonic() - started
+
+        completed = sum(1 for result in results if result.status == "completed")
+        report = {
+            "documents": len(results),
+            "completed": completed,
+            "failed": len(results) - completed,
+            "elapsed_seconds": elapsed,
+            "results": [result.model_dump() for result in results]
+        }
+        report_path = Path(report_path) if report_path else self.generator.output_dir / "catalog_report.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print(f"Catalog finished in {elapsed:.1f}s: {completed} completed, {len(results) - completed} failed. "
+              f"Report saved to: {report_path}")
+        return results
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a response is not in the cache."""
+
+
+class ResponseCache:
+    """
+    Persistent content-addressed cache backed by a single SQLite file.
+
+    Entries are keyed by a hash of everything that determines a response, so
+    a key never needs invalidating: when an input changes, the key changes.
+    Old entries are evicted least-recently-used first once the cache grows
+    past `max_entries` or `max_bytes`, and entries older than
+    `max_age_seconds` are treated as misses.
+
+    With `compress`, values are stored zlib-compressed and the size limit
+    applies to the compressed size. A cache file should always be opened
+    with the same setting.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        compress: bool = False
+    ):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            path (str): Path of the SQLite database file
+            max_entries (Optional[int]): Maximum number of entries, unlimited if None
+            max_bytes (Optional[int]): Maximum total size of stored values, unlimited if None
+            max_age_seconds (Optional[float]): Maximum entry age, unlimited if None
+            compress (bool): Store values zlib-compressed
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, "
+            "value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a cache key from JSON-serializable parts.
+
+        Args:
+            *parts (Any): Values that together determine the cached response
+
+        Returns:
+            str: SHA-256 hex digest of the canonical JSON encoding of the parts
+        """
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[bytes]: Stored value, or None on a miss
+        """
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.max_age_seconds is not None and now - row[1] > self.max_age_seconds:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.connection.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+        value = bytes(row[0])
+        return zlib.decompress(value) if self.compress else value
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store a value and evict old entries if the cache is over its limits.
+
+        Args:
+            key (str): Cache key
+            value (bytes): Value to store
+        """
+        if self.compress:
+            value = zlib.compress(value)
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now)
+            )
+            self._evict()
+            self.connection.commit()
+
+    def get_json(self, key: str) -> Optional[Any]:
+        """Look up a JSON value. Returns None on a miss."""
+        value = self.get(key)
+        return None if value is None else json.loads(value.decode("utf-8"))
+
+    def set_json(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value."""
+        self.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def _evict(self) -> None:
+        """Delete expired entries, then least recently used ones until within limits."""
+        if self.max_age_seconds is not None:
+            cursor = self.connection.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            )
+            self.evictions += cursor.rowcount
+
+        if self.max_entries is not None:
+            cursor = self.connection.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.evictions += cursor.rowcount
+
+        if self.max_bytes is not None:
+            total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self.connection.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall()
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    total -= size
+                    self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self.lock:
+            self.connection.execute("DELETE FROM entries")
+            self.connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss statistics and the current cache size.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate, evictions, entries and bytes
+        """
+        with self.lock:
+            entries, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self.lock:
+            self.connection.close()
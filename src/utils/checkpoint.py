@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Set
+
+
+class CheckpointWriter:
+    """
+    Append-only JSONL writer for results that must survive a crash.
+
+    Every record is flushed as soon as it is written; `os.fsync` is only
+    called every `fsync_every` records so durability does not cost one disk
+    sync per result. A partial trailing line left by an interrupted run is
+    truncated when the file is reopened.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 10, append: bool = True):
+        """
+        Initialize the CheckpointWriter.
+
+        Args:
+            path (str): Path of the JSONL checkpoint file
+            fsync_every (int): Number of records between fsync calls
+            append (bool): Keep existing records instead of starting a new file
+        """
+        self.path = Path(path)
+        self.fsync_every = max(1, fsync_every)
+        self.pending = 0
+        self.lock = threading.Lock()
+        if append:
+            _truncate_partial_line(self.path)
+        self.file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Append one record to the checkpoint.
+
+        Args:
+            record (Dict[str, Any]): JSON-serializable record
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= self.fsync_every:
+                os.fsync(self.file.fileno())
+                self.pending = 0
+
+    def close(self) -> None:
+        """Flush and sync outstanding records and close the file."""
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+    def __enter__(self) -> "CheckpointWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _truncate_partial_line(path: Path) -> None:
+    """Drop an incomplete last line, e.g. one cut short by a crash."""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last complete line
+        position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def iter_checkpoint(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the valid records of a JSONL checkpoint file.
+
+    Args:
+        path (str): Path of the JSONL checkpoint file
+
+    Yields:
+        Dict[str, Any]: Each complete record, in file order
+    """
+    if not Path(path).exists():
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def load_completed_ids(path: str) -> Set[str]:
+    """
+    Collect the element_ids already present in a checkpoint file.
+
+    Records of failed elements (with an `error` instead of a result) do not
+    count, so a resumed run tries those elements again.
+
+    Args:
+        path (str): Path of the JSONL checkpoint file
+
+    Returns:
+        Set[str]: element_ids with a stored result
+    """
+    return {record["element_id"] for record in iter_checkpoint(path) if "error" not in record}
+
+
+def compact_checkpoint(checkpoint_path: str, element_ids: Iterable[str], output_path: str) -> int:
+    """
+    Write the records of a checkpoint as an ordered JSON array.
+
+    Only byte offsets are kept in memory: records are read back one at a
+    time in the requested order and streamed to the output, which has the
+    same layout as `json.dump(results, f, indent=2)`.
+
+    Args:
+        checkpoint_path (str): Path of the JSONL checkpoint file
+        element_ids (Iterable[str]): element_ids in the desired output order
+        output_path (str): Path of the JSON file to write
+
+    Returns:
+        int: Number of records written
+    """
+    offsets = {}
+    with open(checkpoint_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            try:
+                offsets[json.loads(line)["element_id"]] = offset
+            except json.JSONDecodeError:
+                pass
+            offset += len(line)
+
+    written = 0
+    with open(checkpoint_path, 'rb') as source, open(output_path, 'w', encoding='utf-8') as out:
+        out.write("[")
+        for element_id in element_ids:
+            if element_id not in offsets:
+                continue
+            source.seek(offsets[element_id])
+            record = json.loads(source.readline())
+            body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            out.write(("," if written else "") + "\n  " + body)
+            written += 1
+        out.write("\n]" if written else "]")
+    return written
@@ -0,0 +1,18 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class StageConfig(BaseModel):
+    """Concurrency and rate limits of one pipeline stage."""
+    workers: int = Field(default=1, ge=1)
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class ModelRoute(BaseModel):
+    """Model serving the requests of some stages up to a prompt size, with its own rate limits."""
+    model: str
+    stages: Optional[List[str]] = None
+    max_prompt_tokens: Optional[int] = None
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Mersenne prime of the universal hash family; coefficients stay below 2**32
+# so that a * x + b never overflows 64 bits
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class DuplicateMatch(BaseModel):
+    """Closest indexed chunk found for a query."""
+    key: str
+    similarity: float
+    result: Dict[str, Any]
+
+
+def shingles(text: str, size: int = 5) -> List[str]:
+    """
+    Split text into overlapping word n-grams.
+
+    Words are lowercased and punctuation is dropped, so formatting
+    differences do not affect the shingles.
+
+    Args:
+        text (str): Text to shingle
+        size (int): Words per shingle
+
+    Returns:
+        List[str]: Shingles, or the whole text as one shingle if it is shorter than `size` words
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class DuplicateIndex:
+    """
+    Persistent MinHash/LSH index of chunk texts and the slides made from them.
+
+    Each text gets a MinHash signature of its word shingles: `num_perm`
+    minimum hash values whose agreement rate between two texts estimates
+    their Jaccard similarity. Signatures are split into `bands`; texts that
+    share a whole band land in the same bucket, so candidates are found
+    with one indexed lookup per band instead of a scan. Candidates are then
+    kept only if their estimated similarity reaches `threshold`.
+
+    With the default 16 bands of 8 rows, pairs above about 0.7 similarity
+    are very likely to share a bucket. The index is stored in SQLite and
+    shared across documents and runs.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """
+        Initialize the DuplicateIndex.
+
+        Args:
+            path (Optional[str]): Path of the SQLite database file, in memory if None
+            threshold (float): Minimum estimated Jaccard similarity of a duplicate
+            num_perm (int): Hash functions per signature
+            bands (int): LSH bands, must divide `num_perm`
+            shingle_size (int): Words per shingle
+            seed (int): Seed of the hash functions
+
+        Raises:
+            ValueError: If `bands` does not divide `num_perm`, or if an existing
+                index was built with different parameters
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY, "
+            "key TEXT UNIQUE NOT NULL, "
+            "signature BLOB NOT NULL, "
+            "result TEXT NOT NULL)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS buckets (band INTEGER, hash INTEGER, entry_id INTEGER)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS buckets_band_hash ON buckets (band, hash)")
+        self._check_settings()
+        self.connection.commit()
+
+    def _check_settings(self) -> None:
+        """Store the hashing parameters, or check them against those of an existing index."""
+        settings = {"num_perm": self.num_perm, "bands": self.bands, "shingle_size": self.shingle_size, "seed": self.seed}
+        stored = dict(self.connection.execute("SELECT name, value FROM settings").fetchall())
+        if not stored:
+            self.connection.executemany(
+                "INSERT INTO settings (name, value) VALUES (?, ?)",
+                [(name, str(value)) for name, value in settings.items()]
+            )
+            return
+        mismatched = [name for name, value in settings.items() if stored.get(name) != str(value)]
+        if mismatched:
+            raise ValueError(f"{self.path} was built with different {', '.join(mismatched)}")
+
+    def scratch(self) -> "DuplicateIndex":
+        """Return an empty in-memory index with the same parameters."""
+        return DuplicateIndex(None, self.threshold, self.num_perm, self.bands, self.shingle_size, self.seed)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text (str): Text to sign
+
+        Returns:
+            np.ndarray: `num_perm` uint32 values
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64
+        )
+        permuted = (np.outer(hashes, self.a) + self.b) % _PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_hashes(self, signature: np.ndarray) -> List[int]:
+        rows = signature.reshape(self.bands, -1)
+        # 7 bytes keep the value within SQLite's signed 64-bit integers
+        return [int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=7).digest(), "big") for row in rows]
+
+    def query(self, signature: np.ndarray, exclude: Optional[str] = None) -> Optional[DuplicateMatch]:
+        """
+        Find the most similar indexed text above the threshold.
+
+        Args:
+            signature (np.ndarray): Signature of the query text
+            exclude (Optional[str]): Key to ignore, e.g. the query's own entry
+
+        Returns:
+            Optional[DuplicateMatch]: Best match, or None if no text is similar enough
+        """
+        band_hashes = self._band_hashes(signature)
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT e.key, e.signature, e.result FROM buckets b JOIN entries e ON e.id = b.entry_id "
+                "WHERE " + " OR ".join("(b.band = ? AND b.hash = ?)" for _ in band_hashes),
+                [value for band, band_hash in enumerate(band_hashes) for value in (band, band_hash)]
+            ).fetchall()
+
+            best = None
+            for key, stored, result in rows:
+                if key == exclude:
+                    continue
+                similarity = float(np.mean(np.frombuffer(stored, dtype=np.uint32) == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity, result)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return DuplicateMatch(key=best[0], similarity=best[1], result=json.loads(best[2]))
+
+    def add(self, key: str, signature: np.ndarray, result: Dict[str, Any]) -> None:
+        """
+        Index a text's signature with the result made from it, replacing any entry with the same key.
+
+        Args:
+            key (str): Unique key of the text, e.g. "document#element_id"
+            signature (np.ndarray): Signature of the text
+            result (Dict[str, Any]): JSON-serializable result to reuse for duplicates
+        """
+        band_hashes = self._band_hashes(signature)
+        with self.lock:
+            row = self.connection.execute("SELECT id FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.connection.execute("DELETE FROM buckets WHERE entry_id = ?", (row[0],))
+                self.connection.execute("DELETE FROM entries WHERE id = ?", (row[0],))
+            cursor = self.connection.execute(
+                "INSERT INTO entries (key, signature, result) VALUES (?, ?, ?)",
+                (key, signature.astype(np.uint32).tobytes(), json.dumps(result, ensure_ascii=False))
+            )
+            self.connection.executemany(
+                "INSERT INTO buckets (band, hash, entry_id) VALUES (?, ?, ?)",
+                [(band, band_hash, cursor.lastrowid) for band, band_hash in enumerate(band_hashes)]
+            )
+            self.connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return lookup statistics and the index size.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate and indexed entries
+        """
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,391 @@
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+# An operation takes an element and returns it (possibly modified), or None to drop it
+ElementOperation = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Stream the items of a top-level JSON array without loading the whole file.
+
+    Only the item being decoded is held in memory. When an item is larger
+    than the buffer, reads grow geometrically so large items are still
+    decoded in linear time.
+
+    Args:
+        fp (TextIO): File opened in text mode, positioned at the array
+        chunk_size (int): Initial number of characters to read at a time
+
+    Yields:
+        Any: Each decoded item, in order
+
+    Raises:
+        json.JSONDecodeError: If the file is not a well-formed JSON array
+    """
+    buffer = ""
+    position = 0
+    eof = False
+    read_size = chunk_size
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof, read_size
+        data = fp.read(read_size)
+        if not data:
+            eof = True
+            return False
+        buffer = buffer[position:] + data
+        position = 0
+        return True
+
+    def skip_whitespace() -> None:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if position >= len(buffer) or buffer[position] != "[":
+        raise json.JSONDecodeError("Expected a JSON array", buffer, position)
+    position += 1
+
+    expect_item = True
+    after_comma = False
+    while True:
+        skip_whitespace()
+        if position >= len(buffer):
+            raise json.JSONDecodeError("Unterminated JSON array", buffer, position)
+        char = buffer[position]
+        if char == "]":
+            if expect_item and after_comma:
+                raise json.JSONDecodeError("Trailing ',' in array", buffer, position)
+            return
+        if char == ",":
+            if expect_item:
+                raise json.JSONDecodeError("Unexpected ','", buffer, position)
+            position += 1
+            expect_item = True
+            after_comma = True
+            continue
+        if not expect_item:
+            raise json.JSONDecodeError("Expected ',' or ']'", buffer, position)
+
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_size *= 2
+                fill()
+                continue
+            # A number is only complete once a delimiter follows it
+            delimited = end < len(buffer) and (buffer[end] in _WHITESPACE or buffer[end] in ",]")
+            if isinstance(item, (int, float)) and not delimited and not eof and fill():
+                continue
+            break
+        read_size = chunk_size
+        position = end
+        expect_item = False
+        after_comma = False
+        yield item
+
+
+def write_json_array(items: Iterable[Any], fp: TextIO, indent: Optional[int] = 4) -> int:
+    """
+    Write items as a JSON array one at a time.
+
+    With an indent the output matches `json.dump(list(items), fp, indent=indent)`;
+    with `indent=None` it is written compactly without extra whitespace.
+
+    Args:
+        items (Iterable[Any]): JSON-serializable items
+        fp (TextIO): File opened in text mode
+        indent (Optional[int]): Indentation level, or None for compact output
+
+    Returns:
+        int: Number of items written
+    """
+    count = 0
+    if indent is None:
+        fp.write("[")
+        for item in items:
+            fp.write(("," if count else "") + json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+            count += 1
+        fp.write("]")
+        return count
+
+    prefix = "\n" + " " * indent
+    fp.write("[")
+    for item in items:
+        body = json.dumps(item, ensure_ascii=False, indent=indent).replace("\n", prefix)
+        fp.write(("," if count else "") + prefix + body)
+        count += 1
+    fp.write("\n]" if count else "]")
+    return count
+
+
+def strip_field(path: str) -> ElementOperation:
+    """
+    Build an operation that removes a (dotted) field from each element.
+
+    Args:
+        path (str): Field path, e.g. "metadata.orig_elements"
+
+    Returns:
+        ElementOperation: Operation deleting the field where present
+    """
+    *parents, name = path.split(".")
+
+    def operation(element: Dict[str, Any]) -> Dict[str, Any]:
+        target = element
+        for parent in parents:
+            target = target.get(parent) if isinstance(target, dict) else None
+            if target is None:
+                return element
+        if isinstance(target, dict):
+            target.pop(name, None)
+        return element
+
+    return operation
+
+
+def rewrite_json_array(
+    input_path: str,
+    output_path: str,
+    transform: Callable[[Iterator[Any]], Iterable[Any]],
+    indent: Optional[int] = 4
+) -> int:
+    """
+    Stream a JSON array file through a generator and write the result.
+
+    The input items are streamed into `transform` and its output is
+    streamed to the output file, so memory use only depends on what the
+    transform holds. The output is written to a temporary file and moved
+    into place, so `input_path` and `output_path` may be the same file.
+
+    Args:
+        input_path (str): Path of the JSON array file to read
+        output_path (str): Path of the JSON file to write
+        transform (Callable[[Iterator[Any]], Iterable[Any]]): Maps the input
+            items to the output items
+        indent (Optional[int]): Output indentation, or None for compact output
+
+    Returns:
+        int: Number of items written
+    """
+    output_dir = Path(output_path).resolve().parent
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    try:
+        with open(input_path, 'r', encoding='utf-8') as infile, \
+                os.fdopen(fd, 'w', encoding='utf-8') as outfile:
+            count = write_json_array(transform(iter_json_array(infile)), outfile, indent=indent)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
+
+
+def transform_json_array(
+    input_path: str,
+    output_path: str,
+    operations: List[ElementOperation],
+    indent: Optional[int] = 4
+) -> int:
+    """
+    Apply operations to every element of a JSON array file in a single pass.
+
+    Elements are streamed from the input, passed through each operation in
+    turn and streamed to the output with `rewrite_json_array`, so memory
+    use does not depend on the file size.
+
+    Args:
+        input_path (str): Path of the JSON array file to read
+        output_path (str): Path of the JSON file to write
+        operations (List[ElementOperation]): Operations applied in order
+        indent (Optional[int]): Output indentation, or None for compact output
+
+    Returns:
+        int: Number of elements written
+    """
+    def transformed(elements: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for element in elements:
+            for operation in operations:
+                element = operation(element)
+                if element is None:
+                    break
+            else:
+                yield element
+
+    return rewrite_json_array(input_path, output_path, transformed, indent=indent)
+
+
+class FieldBudgetExceeded(Exception):
+    """Raised by `JsonFieldStream` when a string field grows past its length budget."""
+
+    def __init__(self, field: str, length: int, budget: int):
+        super().__init__(f"Field '{field}' exceeded its budget of {budget} characters")
+        self.field = field
+        self.length = length
+        self.budget = budget
+
+
+class JsonFieldStream:
+    """
+    Incremental JSON parser reporting object fields as soon as they close.
+
+    Text is fed in arbitrary pieces, e.g. the deltas of a streamed chat
+    completion. Whenever a scalar member of an object is complete,
+    `on_field(key, value)` is called with its name in the innermost object.
+    While a string member is being received, its decoded length so far is
+    checked against `budgets`, so a response can be abandoned as soon as
+    one of its fields grows too long.
+
+    Only well-formed JSON is supported and nothing is validated; the
+    complete text should still be decoded with `json.loads`.
+    """
+
+    def __init__(
+        self,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        budgets: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize the JsonFieldStream.
+
+        Args:
+            on_field (Optional[Callable[[str, Any], None]]): Called with the name
+                and value of every member once it is complete
+            budgets (Optional[Dict[str, int]]): Maximum characters per string member
+        """
+        self.on_field = on_field
+        self.budgets = budgets or {}
+        self.fields: Dict[str, Any] = {}
+        # One [kind, current key, expecting a key] entry per open container
+        self.stack: List[List[Any]] = []
+        self.pieces: List[str] = []
+        self.in_string = False
+        self.is_key = False
+        self.escaped = False
+        self.unicode_left = 0
+        self.in_scalar = False
+        self.length = 0
+
+    @property
+    def current_field(self) -> Optional[str]:
+        """Name of the string member being received, if any."""
+        if self.in_string and not self.is_key and self.stack and self.stack[-1][0] == "object":
+            return self.stack[-1][1]
+        return None
+
+    def feed(self, text: str) -> None:
+        """
+        Parse the next piece of the document.
+
+        Args:
+            text (str): Any number of characters following the previous piece
+
+        Raises:
+            FieldBudgetExceeded: If a string member is longer than its budget
+        """
+        position = 0
+        while position < len(text):
+            if self.in_string:
+                position = self._feed_string(text, position)
+                continue
+            char = text[position]
+            if self.in_scalar:
+                if char not in _WHITESPACE and char not in ",}]":
+                    self.pieces.append(char)
+                    position += 1
+                    continue
+                self._close_value(json.loads("".join(self.pieces)))
+            position += 1
+            if char in _WHITESPACE:
+                continue
+            if char == "{":
+                self.stack.append(["object", None, True])
+            elif char == "[":
+                self.stack.append(["array", None, False])
+            elif char in "}]":
+                self.stack.pop()
+            elif char == ":":
+                self.stack[-1][2] = False
+            elif char == ",":
+                if self.stack[-1][0] == "object":
+                    self.stack[-1][1:] = [None, True]
+            elif char == '"':
+                self.in_string = True
+                self.is_key = bool(self.stack) and self.stack[-1][2]
+                self.pieces = []
+                self.length = 0
+            else:
+                self.in_scalar = True
+                self.pieces = [char]
+
+    def _feed_string(self, text: str, position: int) -> int:
+        """Consume string characters up to the closing quote, returning the new position."""
+        while position < len(text):
+            if self.unicode_left:
+                taken = text[position:position + self.unicode_left]
+                self.pieces.append(taken)
+                self.unicode_left -= len(taken)
+                position += len(taken)
+                continue
+            if self.escaped:
+                char = text[position]
+                self.pieces.append(char)
+                self.escaped = False
+                self.unicode_left = 4 if char == "u" else 0
+                self.length += 1
+                position += 1
+                continue
+
+            match = _STRING_SPECIAL.search(text, position)
+            stop = match.start() if match else len(text)
+            self.pieces.append(text[position:stop])
+            self.length += stop - position
+            self._check_budget()
+            if match is None:
+                return stop
+            if text[stop] == "\\":
+                self.pieces.append("\\")
+                self.escaped = True
+                position = stop + 1
+            else:
+                self.in_string = False
+                value = json.loads('"' + "".join(self.pieces) + '"')
+                if self.is_key:
+                    self.stack[-1][1] = value
+                else:
+                    self._close_value(value)
+                return stop + 1
+        self._check_budget()
+        return position
+
+    def _check_budget(self) -> None:
+        field = self.current_field
+        budget = self.budgets.get(field)
+        if budget is not None and self.length > budget:
+            raise FieldBudgetExceeded(field, self.length, budget)
+
+    def _close_value(self, value: Any) -> None:
+        self.in_scalar = False
+        self.pieces = []
+        if self.stack and self.stack[-1][0] == "object":
+            key = self.stack[-1][1]
+            self.fields[key] = value
+            if self.on_field is not None:
+                self.on_field(key, value)
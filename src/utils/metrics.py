@@ -0,0 +1,295 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# USD per million tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+PROMETHEUS_PREFIX = "mooc_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _series_name(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estimate the cost of token usage in USD.
+
+    Args:
+        model (str): Model name; dated snapshots use the price of their base model
+        prompt_tokens (int): Prompt tokens, including cached ones
+        cached_tokens (int): Prompt tokens served from the prompt cache
+        completion_tokens (int): Completion tokens
+
+    Returns:
+        Optional[float]: Cost in USD, or None for models without a known price
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        base = max((known for known in MODEL_PRICES if model.startswith(known + "-")), key=len, default=None)
+        prices = MODEL_PRICES.get(base)
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1e6
+
+
+class Histogram:
+    """Bucketed distribution of observed values, with count, sum, min and max."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize the Histogram.
+
+        Args:
+            buckets (Tuple[float, ...]): Sorted upper bounds of the buckets
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation inside its bucket.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value, clamped to the observed min and max
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else self.min
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize the distribution."""
+        if not self.count:
+            return {"count": 0, "sum": 0.0}
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of counters, histograms and timing spans for a run.
+
+    Components record into a registry passed to their constructor; a run
+    shares one registry between the processor, the generator and the
+    formatter, then writes it as a JSON report and optionally in the
+    Prometheus text format. Series are identified by a name and labels,
+    e.g. `llm_request_seconds{stage="generation"}`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; a copy sent to another process gets its own
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add `value` to a counter."""
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record a value in a histogram."""
+        key = (name, _labels(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+        Time a block of code into the `span_seconds` histogram.
+
+        Failed blocks are timed too and counted in `span_errors_total`.
+
+        Args:
+            name (str): Span name, e.g. "partition"
+            **labels: Extra labels of the span
+        """
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.inc("span_errors_total", span=name, **labels)
+            raise
+        finally:
+            self.observe("span_seconds", time.monotonic() - started, span=name, **labels)
+
+    def record_usage(self, usage: Any, model: str, **labels: Any) -> None:
+        """
+        Count the tokens of an OpenAI `response.usage` object.
+
+        Args:
+            usage (Any): Usage of a chat completion, may be None
+            model (str): Model that served the request
+            **labels: Extra labels, e.g. stage
+        """
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        self.inc("llm_prompt_tokens_total", usage.prompt_tokens or 0, model=model, **labels)
+        self.inc("llm_cached_tokens_total", cached, model=model, **labels)
+        self.inc("llm_completion_tokens_total", usage.completion_tokens or 0, model=model, **labels)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        """Sum a counter over all series matching the given labels."""
+        wanted = set(_labels(labels))
+        with self.lock:
+            return sum(
+                value for (series, series_labels), value in self.counters.items()
+                if series == name and wanted <= set(series_labels)
+            )
+
+    def usage_report(self) -> Dict[str, Dict[str, Any]]:
+        """Token totals and estimated cost per model."""
+        with self.lock:
+            models = {
+                dict(labels)["model"] for (name, labels) in self.counters
+                if name == "llm_prompt_tokens_total"
+            }
+        report = {}
+        for model in sorted(models):
+            prompt = int(self.counter_value("llm_prompt_tokens_total", model=model))
+            cached = int(self.counter_value("llm_cached_tokens_total", model=model))
+            completion = int(self.counter_value("llm_completion_tokens_total", model=model))
+            report[model] = {
+                "prompt_tokens": prompt,
+                "cached_tokens": cached,
+                "completion_tokens": completion,
+                "cached_ratio": cached / prompt if prompt else 0.0,
+                "estimated_cost_usd": estimate_cost(model, prompt, cached, completion)
+            }
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the JSON report of the run.
+
+        Returns:
+            Dict[str, Any]: Elapsed time, counters, histogram summaries and
+                token usage with estimated cost per model
+        """
+        with self.lock:
+            counters = {_series_name(name, labels): value for (name, labels), value in sorted(self.counters.items())}
+            histograms = {
+                _series_name(name, labels): histogram.snapshot()
+                for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0])
+            }
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": time.time() - self.started_at,
+            "counters": counters,
+            "histograms": histograms,
+            "usage": self.usage_report()
+        }
+
+    def write_report(self, path: str) -> str:
+        """Write the JSON report and return its path."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def prometheus_text(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{_series_name(metric, labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{_series_name(metric + '_bucket', labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{_series_name(metric + '_sum', labels)} {histogram.sum}")
+            lines.append(f"{_series_name(metric + '_count', labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> str:
+        """Write the Prometheus text file (e.g. for the node exporter textfile collector)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        return path
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a piece of text.
+
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for budgeting requests against a tokens-per-minute quota.
+
+    Args:
+        text (str): Text to estimate
+
+    Returns:
+        int: Estimated token count
+    """
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """A thread-safe token bucket that refills continuously over time."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            capacity (float): Maximum number of tokens the bucket can hold
+            refill_per_second (float): Tokens added to the bucket every second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def available(self) -> float:
+        """Return the fraction of the capacity currently available, without taking any."""
+        with self.lock:
+            self._refill()
+            return self.tokens / self.capacity
+
+    def acquire(self, amount: float = 1) -> None:
+        """
+        Block until `amount` tokens are available, then take them.
+
+        Requests larger than the bucket capacity are clamped to the capacity
+        so that they can still go through once the bucket is full.
+
+        Args:
+            amount (float): Number of tokens to take
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.refill_per_second
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Rate limiter for API calls with separate request and token budgets.
+
+    Both limits are expressed per minute, matching how OpenAI reports quotas.
+    A limit set to None is not enforced.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the RateLimiter.
+
+        Args:
+            requests_per_minute (Optional[float]): Maximum requests per minute
+            tokens_per_minute (Optional[float]): Maximum tokens per minute
+        """
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Block until one request carrying `tokens` tokens is allowed.
+
+        Args:
+            tokens (int): Estimated number of tokens used by the request
+        """
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            self.tokens.acquire(tokens)
+
+    def headroom(self) -> float:
+        """
+        Return the share of the quota currently unused.
+
+        Returns:
+            float: Fraction between 0 and 1 of the tighter of the two budgets, 1.0 when unlimited
+        """
+        buckets = [bucket for bucket in (self.requests, self.tokens) if bucket is not None]
+        return min((bucket.available() for bucket in buckets), default=1.0)
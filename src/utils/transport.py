@@ -0,0 +1,155 @@
+import gzip
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import MetricsRegistry
+
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class TransportError(Exception):
+    """Raised when an HTTP request fails for good, after any retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, body: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class HttpTransport:
+    """
+    Pooled, retrying HTTP transport shared by API clients.
+
+    Connections are kept alive in a pooled `requests.Session`. Connection
+    errors, timeouts and retryable status codes (429 and 5xx) are retried
+    with exponential backoff and full jitter, honouring the server's
+    `Retry-After` header when present. Other errors, and failures that
+    persist after the last retry, raise `TransportError`.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 600.0,
+        compress_requests: bool = False,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize the HttpTransport.
+
+        Args:
+            pool_size (int): Maximum number of kept-alive connections per host
+            max_retries (int): Retries after the first attempt
+            backoff_base (float): Backoff of the first retry in seconds, doubled each retry
+            backoff_max (float): Upper bound of a single backoff in seconds
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait for the response
+            compress_requests (bool): Gzip request bodies (the server must accept Content-Encoding: gzip)
+            metrics (Optional[MetricsRegistry]): Registry for request latency, retries and bytes sent
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = (connect_timeout, read_timeout)
+        self.compress_requests = compress_requests
+        self.retries = 0
+        self.metrics = metrics or MetricsRegistry()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Seconds to wait before retry number `attempt`, preferring Retry-After."""
+        if response is not None and response.headers.get("Retry-After"):
+            retry_after = response.headers["Retry-After"]
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delay, 0.0), self.backoff_max)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _prepare(self, method: str, url: str, **kwargs: Any) -> requests.PreparedRequest:
+        request = self.session.prepare_request(requests.Request(method, url, **kwargs))
+        if self.compress_requests and request.body:
+            body = request.body if isinstance(request.body, bytes) else request.body.encode("utf-8")
+            request.body = gzip.compress(body)
+            request.headers["Content-Encoding"] = "gzip"
+            request.headers["Content-Length"] = str(len(request.body))
+        return request
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Tuple]] = None,
+        json: Optional[Any] = None
+    ) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            headers (Optional[Dict[str, str]]): Request headers
+            data (Optional[Dict[str, Any]]): Form fields
+            files (Optional[Dict[str, Tuple]]): Multipart files; contents must be
+                bytes (not file objects) so the body can be re-sent on retry
+            json (Optional[Any]): JSON body
+
+        Returns:
+            requests.Response: Successful response
+
+        Raises:
+            TransportError: If the request fails with a non-retryable status or
+                still fails after the last retry
+        """
+        host = urlparse(url).netloc
+        for attempt in range(self.max_retries + 1):
+            response = None
+            started = time.monotonic()
+            try:
+                prepared = self._prepare(method, url, headers=headers, data=data, files=files, json=json)
+                self.metrics.inc("http_bytes_sent_total", len(prepared.body or b""), host=host)
+                response = self.session.send(prepared, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = TransportError(f"{method} {url} failed: {e}")
+                self.metrics.inc("http_requests_total", host=host, status="error")
+            else:
+                self.metrics.observe("http_request_seconds", time.monotonic() - started, host=host)
+                self.metrics.inc("http_requests_total", host=host, status=response.status_code)
+                if response.ok:
+                    return response
+                error = TransportError(
+                    f"{method} {url} returned {response.status_code}: {response.text[:500]}",
+                    status_code=response.status_code,
+                    body=response.text
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+
+            if attempt == self.max_retries:
+                raise error
+            delay = self._backoff(attempt, response)
+            self.retries += 1
+            self.metrics.inc("http_retries_total", host=host)
+            print(f"{error} - retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request. See `request` for the arguments."""
+        return self.request("POST", url, **kwargs)
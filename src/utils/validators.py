@@ -0,0 +1,207 @@
+import re
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+
+# Function words carry no evidence of groundedness and would inflate overlap
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+him his how i if in into is it its itself just let lets me more most my no nor not now of off on once only or
+other our ours out over own same she should so some such than that the their theirs them then there these they
+this those through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves we'll you'll it's that's let's here's there's
+""".split())
+
+# Suffixes stripped so that "formats", "formatted" and "formatting" match
+SUFFIXES = ("ingly", "edly", "ings", "ing", "ed", "es", "s", "ly")
+
+# Relative weight of each slide field; dialogue is paraphrased by design
+FIELD_WEIGHTS = {"title": 0.2, "content": 0.5, "dialogue": 0.3}
+
+
+def stem(token: str) -> str:
+    """Strip a common English suffix, keeping at least three characters."""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase, stemmed content words.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: Tokens with stopwords removed
+    """
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class GroundednessScorer:
+    """
+    Cheap local estimate of how well slides are grounded in their sources.
+
+    A slide is compared with its source text by term overlap (the share of
+    slide words found in the source), phrase overlap (the share of slide
+    word n-grams found in the source) and, conversely, the share of slide
+    words the source does not support. All slides of a document are scored
+    in one vectorized pass: every (document, term) pair is encoded as a
+    single integer so that membership in the sources is one `np.isin` call.
+
+    Each field is scored separately and the fields are combined with
+    `FIELD_WEIGHTS`. The combined overlap is mapped linearly from
+    [`floor`, `ceiling`] onto the 0-10 scale used by the LLM validator:
+    instructor dialogue is paraphrased by design, so even well grounded
+    slides rarely reuse more than about half of their words verbatim.
+    Slides scoring inside the uncertain band [`lower`, `upper`) should still
+    be sent to the LLM; scores outside it are confident enough to keep.
+    A slide with an empty field, or with an empty source, scores no overlap
+    for it and is always uncertain.
+    """
+
+    def __init__(
+        self,
+        ngram_size: int = 2,
+        lower: float = 5.0,
+        upper: float = 8.0,
+        phrase_weight: float = 0.4,
+        floor: float = 0.15,
+        ceiling: float = 0.5
+    ):
+        """
+        Initialize the GroundednessScorer.
+
+        Args:
+            ngram_size (int): Length of the word n-grams used for phrase overlap
+            lower (float): Scores below this are confidently ungrounded
+            upper (float): Scores at or above this are confidently grounded
+            phrase_weight (float): Weight of phrase overlap versus term overlap
+            floor (float): Combined overlap mapped to a score of 0
+            ceiling (float): Combined overlap mapped to a score of 10
+        """
+        self.ngram_size = ngram_size
+        self.lower = lower
+        self.upper = upper
+        self.phrase_weight = phrase_weight
+        self.floor = floor
+        self.ceiling = ceiling
+
+    def is_uncertain(self, score: float) -> bool:
+        """Return whether a local score should be confirmed by the LLM validator."""
+        return self.lower <= score < self.upper
+
+    def _ngrams(self, tokens: List[str]) -> List[Tuple[str, ...]]:
+        n = self.ngram_size
+        return [tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+    @staticmethod
+    def _overlap(slide_units: List[List[Any]], source_units: List[List[Any]]) -> np.ndarray:
+        """
+        Fraction of each slide's distinct units that occur in its own source.
+
+        Args:
+            slide_units (List[List[Any]]): Hashable units (terms or n-grams) per slide
+            source_units (List[List[Any]]): Hashable units per source
+
+        Returns:
+            np.ndarray: Overlap ratio per slide, NaN for slides without units
+        """
+        vocabulary: Dict[Any, int] = {}
+
+        def encode(units_per_doc: List[List[Any]]) -> Tuple[np.ndarray, np.ndarray]:
+            ids = [np.fromiter((vocabulary.setdefault(u, len(vocabulary)) for u in units), dtype=np.int64)
+                   for units in units_per_doc]
+            docs = np.repeat(np.arange(len(ids), dtype=np.int64), [len(doc) for doc in ids])
+            return docs, (np.concatenate(ids) if ids else np.empty(0, dtype=np.int64))
+
+        slide_docs, slide_ids = encode(slide_units)
+        source_docs, source_ids = encode(source_units)
+        size = max(len(vocabulary), 1)
+
+        # Distinct (document, unit) keys of the slides, checked against the sources
+        slide_keys = np.unique(slide_docs * size + slide_ids)
+        source_keys = np.unique(source_docs * size + source_ids)
+        found = np.isin(slide_keys, source_keys, assume_unique=True)
+
+        docs = slide_keys // size
+        totals = np.bincount(docs, minlength=len(slide_units))
+        hits = np.bincount(docs, weights=found, minlength=len(slide_units))
+        return np.divide(hits, totals, out=np.full(len(slide_units), np.nan), where=totals > 0)
+
+    def score(self, sources: List[str], slides: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Score every slide of a document against its source text.
+
+        Args:
+            sources (List[str]): Source text of each slide
+            slides (List[Dict[str, str]]): Slides with title, content and dialogue
+
+        Returns:
+            List[Dict[str, Any]]: Per slide, the local score (0-10), whether it
+            falls in the uncertain band, overlap ratios and feedback text
+        """
+        fields = list(FIELD_WEIGHTS)
+        source_tokens = [tokenize(source) for source in sources]
+
+        # One document per (slide, field), each compared with the slide's source
+        field_tokens = [tokenize(slide[field]) for slide in slides for field in fields]
+        field_sources = [tokens for tokens in source_tokens for _ in fields]
+
+        term_overlap = self._overlap(field_tokens, field_sources).reshape(len(slides), len(fields))
+        phrase_overlap = self._overlap(
+            [self._ngrams(tokens) for tokens in field_tokens],
+            [self._ngrams(tokens) for tokens in field_sources]
+        ).reshape(len(slides), len(fields))
+
+        # Fields too short for n-grams fall back to term overlap; an empty field has no overlap
+        phrase_overlap = np.where(np.isnan(phrase_overlap), term_overlap, phrase_overlap)
+        # Slides with an empty field or source cannot be judged locally
+        empty = np.isnan(term_overlap).any(axis=1) | np.array([not tokens for tokens in source_tokens], dtype=bool)
+        term_overlap = np.nan_to_num(term_overlap, nan=0.0)
+        phrase_overlap = np.nan_to_num(phrase_overlap, nan=0.0)
+
+        weights = np.array([FIELD_WEIGHTS[field] for field in fields])
+        term_overlap = term_overlap @ weights
+        phrase_overlap = phrase_overlap @ weights
+        combined = (1 - self.phrase_weight) * term_overlap + self.phrase_weight * phrase_overlap
+        scores = np.round(10 * np.clip((combined - self.floor) / (self.ceiling - self.floor), 0, 1), 1)
+        uncertain = ((scores >= self.lower) & (scores < self.upper)) | empty
+
+        results = []
+        for i, score in enumerate(scores):
+            source_vocabulary = set(source_tokens[i])
+            slide_text = " ".join(slides[i][field] for field in fields).lower()
+            unsupported = sorted({
+                word for word in TOKEN_PATTERN.findall(slide_text)
+                if word not in STOPWORDS and stem(word) not in source_vocabulary
+            })
+            results.append({
+                "score": float(score),
+                "uncertain": bool(uncertain[i]),
+                "term_overlap": float(term_overlap[i]),
+                "phrase_overlap": float(phrase_overlap[i]),
+                "unsupported_ratio": float(1 - term_overlap[i]),
+                "feedback": self._feedback(score, term_overlap[i], phrase_overlap[i], unsupported)
+            })
+        return results
+
+    def _feedback(self, score: float, term_overlap: float, phrase_overlap: float, unsupported: List[str]) -> str:
+        if score >= self.upper:
+            verdict = "grounded"
+        elif score < self.lower:
+            verdict = "poorly grounded"
+        else:
+            verdict = "uncertain"
+        feedback = (
+            f"Local groundedness check: slide judged {verdict}. "
+            f"{term_overlap:.0%} of slide terms and {phrase_overlap:.0%} of "
+            f"{self.ngram_size}-word phrases appear in the source."
+        )
+        if unsupported:
+            feedback += f" Terms not found in the source: {', '.join(unsupported[:15])}."
+        return feedback
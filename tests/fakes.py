@@ -0,0 +1,101 @@
+"""
+In-memory stand-ins for the OpenAI client shared by the tests.
+"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+from openai import RateLimitError
+
+
+def fake_completion(body):
+    """Answer a chat completion body: a slide for generation, a score for validation."""
+    messages = body["messages"]
+    if len(messages) > 2:
+        slide = json.loads(messages[2]["content"])
+        content = {"score": 8, "feedback": f"Grounded: {slide['title']}"}
+    else:
+        source = messages[-1]["content"].split("SOURCE CONTENT:\n", 1)[-1].split("\n", 1)[0]
+        content = {"title": f"Title of {source}", "content": f"* {source}", "dialogue": f"Let's talk about {source}"}
+    return json.dumps(content)
+
+
+def fake_usage(prompt_tokens, completion_tokens, cached_tokens=0):
+    """Build the usage of a chat completion."""
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)
+    )
+
+
+def rate_limit_error():
+    """Build the error the OpenAI client raises on a 429."""
+    response = SimpleNamespace(status_code=429, request=None, headers={})
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class FakeChatClient:
+    """
+    OpenAI client stand-in exposing `chat.completions`.
+
+    Requests are answered with `answer(body)`, `fake_completion` by default,
+    after `delay` seconds. Models in `rate_limited` answer with a 429.
+    Streamed requests get the answer in chunks of `chunk_size` characters.
+    Every response reports `usage`, e.g. from `fake_usage`, or none by default.
+    Every request is recorded as its model and messages, and `max_active`
+    is the highest number of requests answered at the same time.
+    """
+
+    def __init__(self, answer=fake_completion, rate_limited=(), delay=0.0, chunk_size=16, usage=None):
+        self.answer = answer
+        self.rate_limited = set(rate_limited)
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.usage = usage
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+
+    def with_options(self, **options):
+        return self
+
+    def _create_completion(self, model, messages, response_format, stream=False, **kwargs):
+        with self.lock:
+            self.requests.append((model, messages))
+        if model in self.rate_limited:
+            raise rate_limit_error()
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            content = self.answer({"model": model, "messages": messages})
+        finally:
+            with self.lock:
+                self.active -= 1
+        if not stream:
+            message = SimpleNamespace(content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=self.usage)
+        return FakeStream(content, self.chunk_size, self.usage)
+
+
+class FakeStream:
+    """Streamed response yielding the content in chunks, then a usage-only chunk."""
+
+    def __init__(self, content, chunk_size, usage=None):
+        self.content = content
+        self.chunk_size = chunk_size
+        self.usage = usage
+        self.closed = False
+
+    def __iter__(self):
+        for start in range(0, len(self.content), self.chunk_size):
+            delta = SimpleNamespace(content=self.content[start:start + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=self.usage)
+
+    def close(self):
+        self.closed = True
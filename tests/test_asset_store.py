@@ -0,0 +1,54 @@
+"""
+Extraction of inline images to the content-addressed asset store.
+"""
+import base64
+import json
+from src.processors.asset_store import ASSET_FIELD, asset_path, extract_assets, write_asset
+from src.processors.title_chunker import decode_orig_elements
+
+EXAMPLE_DIR = "example_data/processed_input"
+
+
+def load(name):
+    with open(f"{EXAMPLE_DIR}/{name}", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_images_are_moved_to_the_store_in_order(tmp_path):
+    elements = load("no_chunking.json")
+    images = {e["element_id"]: base64.b64decode(e["metadata"]["image_base64"]) for e in elements if "image_base64" in e["metadata"]}
+    counts = {}
+
+    extracted = list(extract_assets(json.loads(json.dumps(elements)), str(tmp_path / "assets"), max_workers=2, counts=counts))
+
+    assert [e["element_id"] for e in extracted] == [e["element_id"] for e in elements]
+    assert all("image_base64" not in e["metadata"] for e in extracted)
+    for element in extracted:
+        path = asset_path(str(tmp_path / "assets"), element["metadata"])
+        if element["element_id"] in images:
+            assert path.suffix == ".jpg"
+            assert path.read_bytes() == images[element["element_id"]]
+        else:
+            assert path is None
+    assert counts == {"written": len(set(images.values())), "reused": len(images) - len(set(images.values()))}
+
+
+def test_images_inside_orig_elements_are_extracted(tmp_path):
+    chunks = load("chunking_big.json")
+
+    extracted = list(extract_assets(chunks, str(tmp_path / "assets"), max_workers=2))
+
+    originals = [o for chunk in extracted for o in decode_orig_elements(chunk["metadata"]["orig_elements"])]
+    with_assets = [o for o in originals if ASSET_FIELD in o["metadata"]]
+    assert with_assets and all("image_base64" not in o["metadata"] for o in originals)
+    assert all(asset_path(str(tmp_path / "assets"), o["metadata"]).exists() for o in with_assets)
+
+
+def test_identical_assets_are_stored_once(tmp_path):
+    first = write_asset(str(tmp_path), b"\x89PNG", "image/png")
+    second = write_asset(str(tmp_path), b"\x89PNG", "image/png")
+    unknown_type = write_asset(str(tmp_path), b"data")
+
+    assert first[1] and not second[1] and first[0] == second[0]
+    assert first[0].endswith(".png") and unknown_type[0].endswith(".bin")
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([first[0], unknown_type[0]])
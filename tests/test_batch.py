@@ -0,0 +1,196 @@
+"""
+Batch mode against an in-memory stand-in for the OpenAI files and batches endpoints.
+"""
+import json
+from types import SimpleNamespace
+import pytest
+from fakes import fake_completion
+from src.generators.batch import BatchJobError, OpenAIBatchRunner
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.cache import ResponseCache
+
+
+class FakeBatchClient:
+    """
+    OpenAI client stand-in exposing `files`, `batches` and `chat.completions`.
+
+    Batches are answered when created but only reach `status` after
+    `polls` status checks. Requests whose custom_id is in `fail_ids` fail
+    inside the batch and those in `missing_ids` are left out of its output.
+    Without `output_file`, batches end with no output file at all.
+    """
+
+    def __init__(self, fail_ids=(), polls=2, status="completed", missing_ids=(), output_file=True):
+        self.stored = {}
+        self.batches_created = []
+        self.sync_requests = []
+        self.fail_ids = set(fail_ids)
+        self.polls = polls
+        self.status = status
+        self.missing_ids = set(missing_ids)
+        self.output_file = output_file
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.stored)}"
+        self.stored[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self.stored[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        requests = [json.loads(line) for line in self.stored[input_file_id].splitlines()]
+        lines = []
+        for request in requests:
+            if request["custom_id"] in self.missing_ids:
+                continue
+            if request["custom_id"] in self.fail_ids:
+                lines.append({"custom_id": request["custom_id"], "response": None, "error": {"message": "failed"}})
+                continue
+            body = {"choices": [{"message": {"content": fake_completion(request["body"])}}]}
+            lines.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None})
+        output_id = f"file-output-{len(self.batches_created)}"
+        self.stored[output_id] = "\n".join(json.dumps(line) for line in lines)
+        batch = SimpleNamespace(
+            id=f"batch-{len(self.batches_created)}",
+            status="validating",
+            output_file_id=None,
+            requests=requests,
+            output=output_id,
+            polls=0
+        )
+        self.batches_created.append(batch)
+        return batch
+
+    def _retrieve_batch(self, batch_id):
+        batch = next(batch for batch in self.batches_created if batch.id == batch_id)
+        batch.polls += 1
+        if batch.polls >= self.polls:
+            batch.status = self.status
+            batch.output_file_id = batch.output if self.output_file else None
+        else:
+            batch.status = "in_progress"
+        return batch
+
+    def _create_completion(self, model, messages, response_format, **kwargs):
+        self.sync_requests.append(messages)
+        content = fake_completion({"messages": messages})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(3)]
+    path.write_text(json.dumps(elements), encoding="utf-8")
+    return str(path)
+
+
+def make_generator(tmp_path, monkeypatch, client, cache=None):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"), cache=cache)
+    generator.client = client
+    return generator
+
+
+def test_runner_submits_polls_and_collects(tmp_path):
+    client = FakeBatchClient(polls=3)
+    runner = OpenAIBatchRunner(client, poll_interval=0)
+    body = {"model": "gpt-4o", "messages": [{"role": "user", "content": "SOURCE CONTENT:\ntopic"}]}
+
+    responses = runner.run([("a", body), ("b", body)], tmp_path / "batch.jsonl")
+
+    assert set(responses) == {"a", "b"}
+    assert responses["a"]["title"] == "Title of topic"
+    batch = client.batches_created[0]
+    assert batch.polls == 3
+    assert [request["custom_id"] for request in batch.requests] == ["a", "b"]
+    assert batch.requests[0]["body"] == body
+
+
+def test_runner_raises_without_output(tmp_path):
+    client = FakeBatchClient()
+    runner = OpenAIBatchRunner(client, poll_interval=0)
+    batch = SimpleNamespace(id="batch-x", status="expired", output_file_id=None)
+
+    with pytest.raises(BatchJobError):
+        runner.collect(batch)
+
+
+def test_run_batch_validates_generated_slides_in_a_second_batch(tmp_path, monkeypatch, input_file):
+    client = FakeBatchClient()
+    generator = make_generator(tmp_path, monkeypatch, client)
+
+    with open(generator.run_batch(input_file, poll_interval=0), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert len(client.batches_created) == 2
+    generation, validation = client.batches_created
+    assert all(len(request["body"]["messages"]) == 2 for request in generation.requests)
+    # Each validation request continues its generation conversation with the generated slide
+    for request in validation.requests:
+        messages = request["body"]["messages"]
+        assert messages[:2] == generator.generation_messages(f"topic {request['custom_id'][1:]}")
+        assert json.loads(messages[2]["content"])["title"] == f"Title of topic {request['custom_id'][1:]}"
+    assert [entry["element_id"] for entry in results] == ["e0", "e1", "e2"]
+    assert all(entry["result"]["groundedness_score"] == 8 for entry in results)
+    assert client.sync_requests == []
+
+
+def test_failed_batch_requests_are_retried_synchronously(tmp_path, monkeypatch, input_file):
+    client = FakeBatchClient(fail_ids={"e1"})
+    generator = make_generator(tmp_path, monkeypatch, client)
+
+    with open(generator.run_batch(input_file, poll_interval=0), encoding="utf-8") as f:
+        results = json.load(f)
+
+    # e1 fails in both batches and is completed outside of them each time
+    assert len(client.sync_requests) == 2
+    assert results[1]["result"]["title"] == "Title of topic 1"
+    assert results[1]["result"]["groundedness_score"] == 8
+
+
+def test_batches_without_output_are_sent_synchronously(tmp_path, monkeypatch, input_file):
+    client = FakeBatchClient(status="expired", output_file=False)
+    generator = make_generator(tmp_path, monkeypatch, client)
+
+    with open(generator.run_batch(input_file, poll_interval=0), encoding="utf-8") as f:
+        results = json.load(f)
+
+    # Both batches expire, so every generation and validation request is sent on its own
+    assert len(client.batches_created) == 2
+    assert len(client.sync_requests) == 6
+    assert [entry["result"]["title"] for entry in results] == ["Title of topic 0", "Title of topic 1", "Title of topic 2"]
+    assert all(entry["result"]["groundedness_score"] == 8 for entry in results)
+    assert generator.metrics.counter_value("batch_jobs_failed_total") == 2
+
+
+def test_requests_missing_from_a_partial_output_are_sent_synchronously(tmp_path, monkeypatch, input_file):
+    client = FakeBatchClient(status="expired", missing_ids={"e0", "e2"})
+    generator = make_generator(tmp_path, monkeypatch, client)
+
+    with open(generator.run_batch(input_file, poll_interval=0), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert len(client.sync_requests) == 4
+    assert all("topic 1" not in messages[1]["content"] for messages in client.sync_requests)
+    assert [entry["element_id"] for entry in results] == ["e0", "e1", "e2"]
+
+
+def test_cached_requests_are_not_resubmitted(tmp_path, monkeypatch, input_file):
+    client = FakeBatchClient()
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    generator = make_generator(tmp_path, monkeypatch, client, cache=cache)
+    generator.run_batch(input_file, poll_interval=0)
+    submitted = len(client.batches_created)
+
+    with open(generator.run_batch(input_file, poll_interval=0), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert submitted == 2
+    assert len(client.batches_created) == submitted
+    assert client.sync_requests == []
+    assert len(results) == 3
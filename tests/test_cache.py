@@ -0,0 +1,97 @@
+"""
+Persistent response cache and its use by the generator, against a fake client.
+"""
+import json
+import pytest
+from fakes import FakeChatClient
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils import cache as cache_module
+from src.utils.cache import ResponseCache
+
+
+class Clock:
+    """Stand-in for the time module whose clock advances one second per call."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_limit_evicts_until_the_values_fit(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=35)
+    for key in "abc":
+        cache.set(key, key.encode() * 10)
+    cache.get("a")
+
+    cache.set("d", b"d" * 10)
+
+    assert [key for key in "abcd" if cache.get(key) is not None] == ["a", "c", "d"]
+    assert cache.stats()["bytes"] == 30
+
+
+def test_expired_entries_are_misses(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_age_seconds=5)
+    cache.set("a", b"1")
+    clock.now += 10
+
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "hit_rate": 0.0, "evictions": 1, "entries": 0, "bytes": 0}
+
+
+def test_compressed_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    value = {"text": "repeated " * 100}
+    cache = ResponseCache(path, compress=True)
+    cache.set_json("key", value)
+    cache.close()
+
+    cache = ResponseCache(path, compress=True)
+
+    assert cache.get_json("key") == value
+    assert cache.stats()["bytes"] < len(json.dumps(value))
+
+
+def test_generator_reruns_are_served_from_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    input_file = tmp_path / "document.json"
+    input_file.write_text(json.dumps([{"element_id": "e0", "text": "topic 0"}]), encoding="utf-8")
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+
+    def run(**options):
+        generator = PresentationGenerator(output_dir=str(tmp_path / "output"), cache=cache, **options)
+        generator.client = FakeChatClient()
+        with open(generator.run(str(input_file)), encoding="utf-8") as f:
+            return generator, json.load(f)
+
+    first, results = run()
+    second, cached_results = run()
+    bypassed, _ = run(bypass_cache=True)
+
+    assert len(first.client.requests) == 2
+    assert second.client.requests == []
+    assert cached_results == results
+    assert second.metrics.counter_value("llm_cache_hits_total", stage="generation") == 1
+    assert len(bypassed.client.requests) == 2
@@ -0,0 +1,73 @@
+"""
+Catalog runs with per-document failures, against fake Unstructured and OpenAI clients.
+"""
+import json
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from fakes import FakeChatClient
+from src.formatters.mooc_formatter import MOOCFormatter
+from src.generators.presentation_generator import PresentationGenerator
+
+pytest.importorskip("unstructured_ingest")
+from src.processors.unstructured_processor import UnstructuredProcessor  # noqa: E402
+from src.runners.catalog_runner import CatalogRunner  # noqa: E402
+
+
+class FakeTransport:
+    """Answers every upload with a title and a paragraph named after the file."""
+
+    def post(self, url, headers, data, files):
+        filename = files["files"][0]
+        elements = [
+            {"type": "Title", "element_id": f"{filename}-1", "text": f"About {filename}", "metadata": {"page_number": 1}},
+            {"type": "NarrativeText", "element_id": f"{filename}-2", "text": f"Body of {filename}", "metadata": {"page_number": 1}}
+        ]
+        return SimpleNamespace(json=lambda: elements)
+
+
+class TruncatingProcessor(UnstructuredProcessor):
+    """Writes a truncated partition for PDFs named "broken", as an interrupted write would."""
+
+    def process_pdf_no_chunking(self, pdf_path, output_path):
+        super().process_pdf_no_chunking(pdf_path, output_path)
+        if Path(pdf_path).stem == "broken":
+            text = Path(output_path).read_text(encoding="utf-8")
+            Path(output_path).write_text(text[:len(text) // 2], encoding="utf-8")
+
+
+def make_pdf(path):
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    pdf.drawString(72, 720, path.stem)
+    pdf.showPage()
+    pdf.save()
+
+
+def test_failed_chunking_is_recorded_and_other_documents_complete(tmp_path, monkeypatch):
+    catalog = tmp_path / "catalog"
+    catalog.mkdir()
+    for name in ("broken", "course"):
+        make_pdf(catalog / f"{name}.pdf")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"))
+    generator.client = FakeChatClient()
+    runner = CatalogRunner(
+        TruncatingProcessor("key", "https://api.example.com/general/v0/general", transport=FakeTransport()),
+        generator,
+        MOOCFormatter(output_dir=str(tmp_path / "pdf")),
+        processed_dir=str(tmp_path / "processed"),
+        render_workers=1
+    )
+
+    broken, course = runner.run(str(catalog))
+
+    assert (broken.status, broken.failed_stage) == ("failed", "chunking")
+    assert broken.error.startswith("JSONDecodeError")
+    assert not (tmp_path / "processed" / "broken.elements").exists()
+    assert course.status == "completed"
+    assert set(course.stage_seconds) == {"processing", "chunking", "generation", "formatting"}
+    assert Path(course.pdf_output).exists()
+    report = json.loads((tmp_path / "output" / "catalog_report.json").read_text(encoding="utf-8"))
+    assert (report["completed"], report["failed"]) == (1, 1)
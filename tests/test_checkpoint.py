@@ -0,0 +1,82 @@
+"""
+JSONL checkpointing of results and resumed runs, against a fake client.
+"""
+import json
+import re
+import pytest
+from fakes import FakeChatClient, fake_completion
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.checkpoint import CheckpointWriter, compact_checkpoint, iter_checkpoint, load_completed_ids
+
+
+def failing_on_topic_2(body):
+    if "topic 2\n" in body["messages"][-1]["content"]:
+        raise RuntimeError("connection reset")
+    return fake_completion(body)
+
+
+def requested_topics(client):
+    return {re.search(r"topic (\d+)", messages[1]["content"]).group(0) for _, messages in client.requests}
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(5)]
+    path.write_text(json.dumps(elements), encoding="utf-8")
+    return str(path)
+
+
+def make_generator(tmp_path, monkeypatch, client):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"))
+    generator.client = client
+    return generator
+
+
+def test_resumed_run_only_processes_missing_elements(tmp_path, monkeypatch, input_file):
+    generator = make_generator(tmp_path, monkeypatch, FakeChatClient(answer=failing_on_topic_2))
+    with pytest.raises(RuntimeError):
+        generator.run(input_file)
+    checkpoint = str(generator.checkpoint_path(input_file))
+    completed = load_completed_ids(checkpoint)
+    first_results = {record["element_id"]: record for record in iter_checkpoint(checkpoint)}
+    assert "e0" in completed and "e2" not in completed
+    assert not generator.results_path(input_file).exists()
+
+    client = FakeChatClient()
+    generator = make_generator(tmp_path, monkeypatch, client)
+    with open(generator.run(input_file, resume=True), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert requested_topics(client) == {f"topic {i}" for i in range(5) if f"e{i}" not in completed}
+    assert [entry["element_id"] for entry in results] == ["e0", "e1", "e2", "e3", "e4"]
+    assert all(entry == first_results[entry["element_id"]] for entry in results if entry["element_id"] in completed)
+
+
+def test_partial_last_line_is_dropped_on_reopen(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"element_id": "e0"}\n{"element_id": "e1", "res', encoding="utf-8")
+
+    with CheckpointWriter(str(path)) as writer:
+        writer.write({"element_id": "e2"})
+
+    assert [record["element_id"] for record in iter_checkpoint(str(path))] == ["e0", "e2"]
+
+
+def test_compaction_orders_records_and_keeps_the_latest(tmp_path):
+    checkpoint = tmp_path / "results.jsonl"
+    with CheckpointWriter(str(checkpoint), append=False) as writer:
+        writer.write({"element_id": "e1", "error": "field_budget"})
+        writer.write({"element_id": "e0", "result": {"title": "zero"}})
+        writer.write({"element_id": "e1", "result": {"title": "one"}})
+    output = tmp_path / "results.json"
+
+    written = compact_checkpoint(str(checkpoint), ["e0", "e1", "e2"], str(output))
+
+    assert written == 2
+    assert json.loads(output.read_text(encoding="utf-8")) == [
+        {"element_id": "e0", "result": {"title": "zero"}},
+        {"element_id": "e1", "result": {"title": "one"}}
+    ]
+    assert load_completed_ids(str(checkpoint)) == {"e0", "e1"}
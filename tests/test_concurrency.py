@@ -0,0 +1,77 @@
+"""
+Bounded concurrent slide generation and rate limiting, against a fake client.
+"""
+import json
+import re
+import time
+import pytest
+from fakes import FakeChatClient, fake_completion
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.rate_limiter import RateLimiter, TokenBucket
+
+
+def later_elements_answer_first(body):
+    """Answer the requests of element eN after a delay decreasing with N."""
+    number = int(re.search(r"topic (\d+)", body["messages"][1]["content"]).group(1))
+    time.sleep(0.01 * (8 - number))
+    return fake_completion(body)
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(8)]
+    path.write_text(json.dumps(elements), encoding="utf-8")
+    return str(path)
+
+
+def make_generator(tmp_path, monkeypatch, client, **options):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"), **options)
+    generator.client = client
+    return generator
+
+
+def test_results_keep_the_input_order(tmp_path, monkeypatch, input_file):
+    client = FakeChatClient(answer=later_elements_answer_first)
+    generator = make_generator(tmp_path, monkeypatch, client, max_concurrency=4)
+
+    with open(generator.run(input_file), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert [entry["element_id"] for entry in results] == [f"e{i}" for i in range(8)]
+    assert [entry["result"]["title"] for entry in results] == [f"Title of topic {i}" for i in range(8)]
+    assert len(client.requests) == 16
+    assert 1 < client.max_active <= 4
+
+
+def test_inflight_requests_are_capped(tmp_path, monkeypatch, input_file):
+    client = FakeChatClient(delay=0.02)
+    generator = make_generator(tmp_path, monkeypatch, client, max_concurrency=4, max_inflight_requests=2)
+
+    generator.run(input_file)
+
+    assert client.max_active == 2
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(capacity=2, refill_per_second=20)
+    bucket.acquire()
+    bucket.acquire()
+
+    start = time.monotonic()
+    bucket.acquire()
+
+    assert time.monotonic() - start >= 0.04
+    # Requests larger than the bucket wait for a full bucket instead of forever
+    bucket.acquire(10)
+    assert bucket.available() < 0.1
+
+
+def test_rate_limiter_headroom_follows_the_tighter_budget():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=60)
+
+    limiter.acquire(tokens=30)
+
+    assert RateLimiter().headroom() == 1.0
+    assert limiter.headroom() == pytest.approx(0.5, abs=0.05)
@@ -0,0 +1,102 @@
+"""
+MinHash/LSH index of chunk texts and slide reuse for near-duplicate chunks.
+"""
+import json
+import random
+import numpy as np
+import pytest
+from fakes import FakeChatClient
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.dedup import DuplicateIndex
+
+WORDS = [f"word{i}" for i in range(500)]
+
+
+def chunk(seed, length=200):
+    generator = random.Random(seed)
+    return " ".join(generator.choice(WORDS) for _ in range(length))
+
+
+def edit(text, changes, seed):
+    """Replace `changes` words of a text with words it cannot contain."""
+    words = text.split()
+    for position in random.Random(seed).sample(range(len(words)), changes):
+        words[position] = f"edited{position}"
+    return " ".join(words)
+
+
+def test_signatures_are_stable_across_instances_and_formatting():
+    text = chunk(0)
+    index = DuplicateIndex()
+
+    signature = index.signature(text)
+
+    assert signature.dtype == np.uint32 and signature.shape == (128,)
+    assert np.array_equal(DuplicateIndex().signature(text), signature)
+    assert np.array_equal(index.signature(text.upper().replace(" ", ",  ")), signature)
+    assert not np.array_equal(DuplicateIndex(seed=2).signature(text), signature)
+
+
+def test_every_pair_estimated_above_the_threshold_is_found():
+    index = DuplicateIndex(threshold=0.8)
+    originals = [chunk(seed) for seed in range(40)]
+    for number, text in enumerate(originals):
+        index.add(f"doc#{number}", index.signature(text), {"number": number})
+
+    eligible = found = 0
+    for number, text in enumerate(originals):
+        for changes in (1, 2, 4, 6):
+            signature = index.signature(edit(text, changes, seed=number))
+            estimate = float(np.mean(signature == index.signature(text)))
+            if estimate < index.threshold:
+                continue
+            eligible += 1
+            match = index.query(signature)
+            if match is not None and match.key == f"doc#{number}":
+                found += 1
+                assert match.similarity >= estimate
+
+    assert eligible > 100
+    assert found == eligible
+    assert index.query(index.signature(chunk(1000))) is None
+
+
+def test_index_persists_across_runs(tmp_path):
+    path = str(tmp_path / "dedup.db")
+    text = chunk(0)
+    index = DuplicateIndex(path)
+    index.add("doc#e0", index.signature(text), {"title": "First"})
+    index.close()
+
+    index = DuplicateIndex(path)
+    match = index.query(index.signature(edit(text, 1, seed=0)))
+
+    assert match.key == "doc#e0" and match.result == {"title": "First"}
+    assert index.stats()["entries"] == 1
+    with pytest.raises(ValueError):
+        DuplicateIndex(path, bands=32)
+
+
+def test_copies_within_a_document_record_their_estimated_similarity(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    original = chunk(0)
+    copy = edit(original, 1, seed=0)
+    path = tmp_path / "document.json"
+    path.write_text(json.dumps([
+        {"element_id": "e0", "text": original},
+        {"element_id": "e1", "text": copy}
+    ]), encoding="utf-8")
+    index = DuplicateIndex(threshold=0.8)
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"), dedup_index=index)
+    client = FakeChatClient()
+    generator.client = client
+
+    with open(generator.run(str(path)), encoding="utf-8") as f:
+        results = json.load(f)
+
+    estimate = float(np.mean(index.signature(copy) == index.signature(original)))
+    assert 0.8 <= estimate < 1.0
+    assert results[1]["result"]["duplicate_of"] == "document#e0"
+    assert results[1]["result"]["duplicate_similarity"] == estimate
+    assert results[1]["result"]["title"] == results[0]["result"]["title"]
+    assert len(client.requests) == 2
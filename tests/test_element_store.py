@@ -0,0 +1,56 @@
+"""
+Element store round trips over the example chunks.
+"""
+import json
+import pytest
+from src.generators.presentation_generator import PresentationGenerator
+from src.processors.element_store import ElementStore, write_element_store
+from src.processors.title_chunker import decode_orig_elements
+
+EXAMPLE_CHUNKS = "example_data/processed_input/chunking_big.json"
+
+
+@pytest.fixture
+def chunks():
+    with open(EXAMPLE_CHUNKS, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def store_path(tmp_path, chunks):
+    path = str(tmp_path / "chunking_big.elements")
+    assert write_element_store(iter(chunks), path) == len(chunks)
+    return path
+
+
+def test_elements_round_trip(store_path, chunks):
+    with ElementStore(store_path) as store:
+        assert len(store) == len(chunks)
+        assert [store.element(i, include_blobs=True) for i in range(len(store))] == chunks
+        assert list(store.iter_texts()) == [(chunk["element_id"], chunk["text"]) for chunk in chunks]
+
+
+def test_lookups_leave_blobs_out_unless_asked(store_path, chunks):
+    last = chunks[-1]
+
+    with ElementStore(store_path) as store:
+        element = store.get(last["element_id"])
+        orig_elements = store.orig_elements(store.position(last["element_id"]))
+
+    assert "orig_elements" not in element["metadata"]
+    assert element["text"] == last["text"]
+    assert orig_elements == decode_orig_elements(last["metadata"]["orig_elements"])
+
+
+def test_other_files_are_rejected():
+    with pytest.raises(ValueError):
+        ElementStore(EXAMPLE_CHUNKS)
+
+
+def test_generator_reads_texts_from_a_store(tmp_path, monkeypatch, store_path, chunks):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"))
+
+    elements = generator.load_elements(store_path)
+
+    assert [(e["element_id"], e["text"]) for e in elements] == [(c["element_id"], c["text"]) for c in chunks]
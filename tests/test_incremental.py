@@ -0,0 +1,100 @@
+"""
+Incremental re-processing of revised PDFs from page hashes, and incremental slide generation.
+"""
+import io
+import json
+import re
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from fakes import FakeChatClient
+from src.generators.presentation_generator import PresentationGenerator
+from src.processors.incremental import load_manifest, splice_partition, unchanged_pages, write_manifest
+from src.processors.pdf_splitter import extract_pages, page_hashes
+
+
+def make_pdf(path, page_texts):
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    for text in page_texts:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def element(element_id, page, text, parent_id=None):
+    metadata = {"page_number": page}
+    if parent_id:
+        metadata["parent_id"] = parent_id
+    return {"element_id": element_id, "text": text, "metadata": metadata}
+
+
+def test_revision_pages_are_aligned_with_the_previous_version(tmp_path):
+    previous = page_hashes(make_pdf(tmp_path / "v1.pdf", ["one", "two", "three", "four"]))
+    current = page_hashes(make_pdf(tmp_path / "v2.pdf", ["one", "new", "two", "THREE", "four"]))
+
+    assert len(set(previous)) == 4
+    # Page 2 was inserted and page 4 (previously 3) was edited
+    assert unchanged_pages(previous, current) == {1: 1, 3: 2, 5: 4}
+
+
+def test_changed_pages_are_extracted_as_runs(tmp_path):
+    pdf_path = make_pdf(tmp_path / "doc.pdf", [f"page {page}" for page in range(1, 8)])
+
+    ranges = extract_pages(pdf_path, [6, 2, 3, 4, 7], pages_per_range=2)
+
+    assert [first for first, _ in ranges] == [2, 4, 6]
+    assert [len(PdfReader(io.BytesIO(data)).pages) for _, data in ranges] == [2, 1, 2]
+
+
+def test_partition_is_spliced_from_reused_and_fresh_pages():
+    previous = [
+        element("a", 1, "Intro"),
+        element("b", 1, "Body", parent_id="a"),
+        element("c", 2, "Old page"),
+        element("d", 3, "Outro", parent_id="c")
+    ]
+    fresh = [element("a", 2, "Inserted"), element("e", 3, "Rewritten")]
+
+    spliced = splice_partition(previous, fresh, {1: 1, 4: 3}, page_count=4)
+
+    assert [(e["text"], e["metadata"]["page_number"]) for e in spliced] == [
+        ("Intro", 1), ("Body", 1), ("Inserted", 2), ("Rewritten", 3), ("Outro", 4)
+    ]
+    assert len({e["element_id"] for e in spliced}) == 5
+    assert spliced[1]["metadata"]["parent_id"] == "a"
+    assert "parent_id" not in spliced[4]["metadata"]
+    # The previous partition is left untouched
+    assert previous[3]["metadata"] == {"page_number": 3, "parent_id": "c"}
+
+
+def test_manifest_is_stored_next_to_the_output(tmp_path):
+    output_path = str(tmp_path / "no_chunking.json")
+    assert load_manifest(output_path) is None
+
+    path = write_manifest(output_path, "/docs/course.pdf", ["h1", "h2"], {"strategy": "hi_res"})
+
+    assert path.name == "no_chunking.manifest.json"
+    assert load_manifest(output_path) == {"pdf": "course.pdf", "request": {"strategy": "hi_res"}, "page_hashes": ["h1", "h2"]}
+
+
+def test_incremental_generation_only_regenerates_changed_elements(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    input_file = tmp_path / "document.json"
+    input_file.write_text(json.dumps([{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(4)]), encoding="utf-8")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"))
+    generator.client = FakeChatClient()
+    generator.run(str(input_file))
+
+    # The revision edits one element and renumbers the others
+    revised = [{"element_id": f"r{i}", "text": f"topic {i}"} for i in (0, 1, 3)] + [{"element_id": "r9", "text": "topic 9"}]
+    input_file.write_text(json.dumps(revised), encoding="utf-8")
+    generator.client = FakeChatClient()
+    with open(generator.run(str(input_file), incremental=True), encoding="utf-8") as f:
+        results = json.load(f)
+
+    topics = {re.search(r"topic (\d+)", messages[1]["content"]).group(0) for _, messages in generator.client.requests}
+    assert topics == {"topic 9"}
+    assert [entry["element_id"] for entry in results] == ["r0", "r1", "r3", "r9"]
+    assert results[2]["result"]["title"] == "Title of topic 3"
+    assert generator.metrics.counter_value("incremental_reused_total") == 3
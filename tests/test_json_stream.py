@@ -0,0 +1,72 @@
+"""
+Streaming element rewrites, compared with the example files cleaned in memory.
+"""
+import io
+import json
+import pytest
+from src.utils.json_stream import iter_json_array, rewrite_json_array, strip_field, transform_json_array, write_json_array
+
+EXAMPLE_DIR = "example_data/processed_input"
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("source, field, expected", [
+    ("chunking_big.json", "metadata.orig_elements", "chunking_big_cleaned.json"),
+    ("no_chunking.json", "metadata.image_base64", "no_chunking_no_base64.json")
+])
+def test_stripping_a_field_matches_the_example_output(tmp_path, source, field, expected):
+    output = tmp_path / expected
+
+    count = transform_json_array(f"{EXAMPLE_DIR}/{source}", str(output), [strip_field(field)])
+
+    assert load(output) == load(f"{EXAMPLE_DIR}/{expected}")
+    assert count == len(load(output))
+
+
+def test_items_larger_than_the_buffer_are_decoded():
+    items = [{"text": "x" * 500, "n": 12345}, 67890, "tail", [1.5, None, True]]
+
+    assert list(iter_json_array(io.StringIO(json.dumps(items)), chunk_size=7)) == items
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+
+@pytest.mark.parametrize("text", ["{}", "[1,]", "[1 2]", "[1, 2"])
+def test_malformed_arrays_are_rejected(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text), chunk_size=2))
+
+
+@pytest.mark.parametrize("indent", [4, None])
+def test_written_arrays_match_json_dump(indent):
+    items = [{"text": "é", "metadata": {"page_number": 1}}, [], "plain"]
+    streamed = io.StringIO()
+
+    write_json_array(iter(items), streamed, indent=indent)
+
+    separators = (",", ":") if indent is None else None
+    assert streamed.getvalue() == json.dumps(items, ensure_ascii=False, indent=indent, separators=separators)
+
+
+def test_rewrite_in_place_drops_elements_and_keeps_the_file_on_error(tmp_path):
+    path = tmp_path / "elements.json"
+    path.write_text(json.dumps([{"type": "Title"}, {"type": "Image"}, {"type": "Text"}]), encoding="utf-8")
+
+    def drop_images(element):
+        return None if element["type"] == "Image" else element
+
+    assert transform_json_array(str(path), str(path), [drop_images]) == 2
+    assert load(path) == [{"type": "Title"}, {"type": "Text"}]
+
+    def failing(elements):
+        for element in elements:
+            yield element
+            raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        rewrite_json_array(str(path), str(path), failing)
+    assert load(path) == [{"type": "Title"}, {"type": "Text"}]
+    assert list(tmp_path.iterdir()) == [path]
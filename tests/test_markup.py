@@ -0,0 +1,50 @@
+"""
+Markdown to ReportLab markup conversion on cells ReportLab used to reject.
+"""
+import json
+import pytest
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+from src.formatters.markup import markdown_to_markup
+
+with open("tests/data/markup_edge_cases.json", encoding="utf-8") as f:
+    EDGE_CASES = json.load(f)
+
+
+@pytest.mark.parametrize("text, expected", EDGE_CASES.items())
+def test_edge_cases_convert_to_valid_markup(text, expected):
+    markup = markdown_to_markup(text)
+
+    assert markup == expected
+    # ReportLab raises ValueError on markup it cannot parse
+    Paragraph(markup, getSampleStyleSheet()["Normal"])
+
+
+def test_tags_are_balanced_per_line():
+    markup = markdown_to_markup("<b>first line\nsecond</b> line")
+
+    assert markup == "&lt;b&gt;first line<br/>second&lt;/b&gt; line"
+
+
+def test_blocks_keep_their_structure():
+    text = (
+        "## Lists ##\r\n"
+        "\n\n"
+        "- **bold** item\n"
+        "  * nested *item*\n"
+        "1. back out\n"
+        "```\n"
+        "  **not bold** & <b>\n"
+        "```\n"
+        "done_here_ \n"
+    )
+
+    assert markdown_to_markup(text).split("<br/>") == [
+        "<b>Lists</b>",
+        "",
+        "• <b>bold</b> item",
+        "&nbsp;&nbsp;&nbsp;&nbsp;• nested <i>item</i>",
+        "1. back out",
+        '<font face="Courier">&nbsp;&nbsp;**not&nbsp;bold**&nbsp;&amp;&nbsp;&lt;b&gt;</font>',
+        "done_here_",
+    ]
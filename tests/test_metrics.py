@@ -0,0 +1,84 @@
+"""
+Metrics registry: spans, token usage and cost, recorded by a generator run on a fake client.
+"""
+import json
+import pickle
+import pytest
+from fakes import FakeChatClient, fake_usage
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.metrics import Histogram, MetricsRegistry, estimate_cost
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(3)]
+    path.write_text(json.dumps(elements), encoding="utf-8")
+    return str(path)
+
+
+def test_generator_records_requests_usage_and_cost(tmp_path, monkeypatch, input_file):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"))
+    generator.client = FakeChatClient(usage=fake_usage(2000, 100, cached_tokens=1024))
+
+    generator.run(input_file)
+
+    metrics = generator.metrics
+    assert metrics.counter_value("llm_requests_total", stage="generation") == 3
+    assert metrics.counter_value("llm_requests_total", stage="validation") == 3
+    assert metrics.report()["histograms"]['span_seconds{span="generation"}']["count"] == 1
+    assert metrics.report()["histograms"]['span_seconds{span="llm_request",stage="validation"}']["count"] == 3
+
+    usage = metrics.usage_report()["gpt-4o"]
+    assert (usage["prompt_tokens"], usage["cached_tokens"], usage["completion_tokens"]) == (12000, 6144, 600)
+    assert usage["estimated_cost_usd"] == pytest.approx((5856 * 2.50 + 6144 * 1.25 + 600 * 10.00) / 1e6)
+    assert generator.prompt_cache_stats() == {"generation": 0.512, "validation": 0.512, "overall": 0.512}
+
+    report = json.loads(open(metrics.write_report(str(tmp_path / "metrics.json")), encoding="utf-8").read())
+    assert report["counters"]['llm_prompt_tokens_total{model="gpt-4o",stage="generation"}'] == 6000
+    text = metrics.prometheus_text()
+    assert "# TYPE mooc_llm_requests_total counter" in text
+    assert 'mooc_span_seconds_count{span="generation"} 1' in text
+
+
+def test_failed_spans_are_timed_and_counted():
+    metrics = MetricsRegistry()
+
+    with pytest.raises(ValueError):
+        with metrics.span("partition", document="a.pdf"):
+            raise ValueError("bad pdf")
+
+    assert metrics.counter_value("span_errors_total", span="partition") == 1
+    assert metrics.report()["histograms"]['span_seconds{document="a.pdf",span="partition"}']["count"] == 1
+
+
+def test_histogram_quantiles_stay_within_the_observed_range():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in [0.5] * 50 + [3.0] * 45 + [10.0] * 5:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["count"] == 100 and snapshot["min"] == 0.5 and snapshot["max"] == 10.0
+    assert 0.5 <= snapshot["p50"] <= 1.0
+    assert 2.0 <= snapshot["p95"] <= 4.0
+    assert 4.0 <= snapshot["p99"] <= 10.0
+    assert Histogram().snapshot() == {"count": 0, "sum": 0.0}
+
+
+def test_cost_uses_the_price_of_the_base_model():
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0, 0) == pytest.approx(0.15)
+    assert estimate_cost("gpt-4o-2024-08-06", 0, 0, 1_000_000) == pytest.approx(10.00)
+    assert estimate_cost("unknown-model", 1000, 0, 1000) is None
+
+
+def test_registry_survives_pickling():
+    metrics = MetricsRegistry()
+    metrics.inc("pages_rendered_total", 3)
+
+    copy = pickle.loads(pickle.dumps(metrics))
+    copy.inc("pages_rendered_total")
+
+    assert copy.counter_value("pages_rendered_total") == 4
+    assert metrics.counter_value("pages_rendered_total") == 3
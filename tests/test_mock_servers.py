@@ -0,0 +1,89 @@
+"""
+The benchmark's mock Unstructured and OpenAI servers, driven by the real clients.
+"""
+import json
+import pytest
+import requests
+from benchmarks.mock_servers import DEFAULT_RESULTS, MockOpenAIServer, MockUnstructuredServer, ServerBehavior
+from benchmarks.pipeline_benchmark import make_pdf
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.transport import HttpTransport
+
+
+@pytest.fixture
+def openai_server():
+    with MockOpenAIServer() as server:
+        yield server
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i} " * 50} for i in range(4)]
+    path.write_text(json.dumps(elements), encoding="utf-8")
+    return str(path)
+
+
+def recorded_titles():
+    with open(DEFAULT_RESULTS, encoding="utf-8") as f:
+        return {item["result"]["title"] for item in json.load(f)}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_generator_runs_against_the_openai_server(tmp_path, monkeypatch, openai_server, input_file, stream):
+    monkeypatch.setenv("OPENAI_BASE_URL", openai_server.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "mock")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"), stream_generation=stream)
+
+    with open(generator.run(input_file), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert [entry["element_id"] for entry in results] == ["e0", "e1", "e2", "e3"]
+    assert {entry["result"]["title"] for entry in results} <= recorded_titles()
+    assert all(entry["result"]["groundedness_score"] >= 1 for entry in results)
+    usage = generator.metrics.usage_report()[generator.model]
+    assert usage["prompt_tokens"] > 0 and usage["completion_tokens"] > 0
+    assert openai_server.behavior.snapshot()["requests"] >= 8
+
+
+def test_repeated_prompt_prefixes_are_reported_as_cached(openai_server):
+    messages = [{"role": "system", "content": "x" * 8000}, {"role": "user", "content": "topic"}]
+    body = {"model": "gpt-4o", "messages": messages, "response_format": {"type": "json_object"}}
+
+    first = requests.post(f"{openai_server.url}/chat/completions", json=body, timeout=10).json()
+    second = requests.post(f"{openai_server.url}/chat/completions", json=body, timeout=10).json()
+
+    assert first["usage"]["prompt_tokens_details"]["cached_tokens"] == 0
+    cached = second["usage"]["prompt_tokens_details"]["cached_tokens"]
+    assert cached >= 1024 and cached % 128 == 0
+
+
+def test_partition_server_answers_every_page(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    make_pdf(str(pdf_path), 3)
+
+    with MockUnstructuredServer() as server:
+        response = HttpTransport().post(
+            server.url,
+            data={"strategy": "hi_res"},
+            files={"files": ("doc.pdf", pdf_path.read_bytes())}
+        )
+
+    elements = response.json()
+    assert sorted({element["metadata"]["page_number"] for element in elements}) == [1, 2, 3]
+    assert len({element["element_id"] for element in elements}) == len(elements)
+
+
+def test_requests_over_the_rate_limit_get_a_429():
+    behavior = ServerBehavior(requests_per_second=2)
+    body = {"model": "gpt-4o", "messages": [{"role": "user", "content": "topic"}]}
+
+    with MockOpenAIServer(behavior=behavior) as server:
+        statuses = []
+        for _ in range(3):
+            response = requests.post(f"{server.base_url}/v1/chat/completions", json=body, timeout=10)
+            statuses.append(response.status_code)
+
+    assert statuses[2] == 429
+    assert response.headers["Retry-After"] == "1"
+    assert behavior.snapshot()["rate_limited"] == 1
@@ -0,0 +1,70 @@
+"""
+PDF layout of the storyboard formatter.
+"""
+import json
+import re
+from pypdf import PdfReader
+from src.formatters.mooc_formatter import MOOCFormatter
+
+EXAMPLE_RESULTS = "example_data/output/chunking_big_cleaned_results.json"
+
+
+def page_texts(path):
+    return [page.extract_text() for page in PdfReader(path).pages]
+
+
+def test_empty_stream_renders_the_header_page(tmp_path):
+    formatter = MOOCFormatter(str(tmp_path))
+
+    streamed = page_texts(formatter.format_stream(iter([]), "streamed"))
+
+    assert streamed == page_texts(formatter.create_pdf([], "single"))
+    assert len(streamed) == 1 and "Slide Content" in streamed[0]
+
+
+def slide_numbers(pages):
+    return [[int(number) for number in re.findall(r"Slide (\d+):", page)] for page in pages]
+
+
+def test_every_layout_paginates_like_the_single_table(tmp_path):
+    with open(EXAMPLE_RESULTS, encoding="utf-8") as f:
+        results = json.load(f) * 3
+
+    single = page_texts(MOOCFormatter(str(tmp_path)).create_pdf(results, "single"))
+    chunked = page_texts(MOOCFormatter(str(tmp_path), rows_per_table=4).create_pdf(results, "chunked"))
+    streamed = page_texts(MOOCFormatter(str(tmp_path)).format_stream(iter(results), "streamed"))
+
+    assert chunked == single
+    assert streamed == single
+    assert [number for page in slide_numbers(single) for number in page] == list(range(1, len(results) + 1))
+    assert all(page.count("Slide Content") == 1 for page in single)
+
+
+def test_sections_keep_the_row_order_and_start_on_new_pages(tmp_path):
+    with open(EXAMPLE_RESULTS, encoding="utf-8") as f:
+        results = json.load(f) * 3
+    formatter = MOOCFormatter(str(tmp_path), slides_per_section=7, max_workers=2)
+
+    sections = slide_numbers(page_texts(formatter.create_pdf(results, "sections")))
+    expected = []
+    for start in range(0, len(results), 7):
+        expected += slide_numbers(page_texts(
+            MOOCFormatter(str(tmp_path)).create_pdf(results[start:start + 7], f"section_{start}")
+        ))
+
+    # Slide numbers restart in each standalone section, not in the sectioned PDF
+    assert [len(page) for page in sections] == [len(page) for page in expected]
+    assert [number for page in sections for number in page] == list(range(1, len(results) + 1))
+
+
+def test_failed_entries_are_skipped(tmp_path):
+    with open(EXAMPLE_RESULTS, encoding="utf-8") as f:
+        results = json.load(f)[:2]
+    failed = {"element_id": "x", "error": "field_budget", "detail": "too long"}
+    formatter = MOOCFormatter(str(tmp_path))
+
+    expected = page_texts(formatter.create_pdf(results, "expected"))
+
+    assert page_texts(formatter.create_pdf([failed] + results, "single")) == expected
+    assert page_texts(formatter.format_stream(iter([results[0], failed, results[1]]), "streamed")) == \
+        page_texts(formatter.format_stream(iter(results), "streamed_expected"))
@@ -0,0 +1,94 @@
+"""
+Cached and offline partitions of `UnstructuredProcessor`, against a fake transport.
+"""
+import io
+import json
+import threading
+from types import SimpleNamespace
+import pytest
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from src.utils.cache import CacheMissError, ResponseCache
+
+pytest.importorskip("unstructured_ingest")
+from src.processors.unstructured_processor import UnstructuredProcessor  # noqa: E402
+
+
+class FakeTransport:
+    """Answers every upload with one element per page of the uploaded range."""
+
+    def __init__(self):
+        self.uploads = []
+        self.lock = threading.Lock()
+
+    def post(self, url, headers, data, files):
+        filename, content, _ = files["files"]
+        with self.lock:
+            self.uploads.append((filename, data))
+        pages = len(PdfReader(io.BytesIO(content)).pages)
+        elements = [
+            {"element_id": f"{filename}-{page}", "text": f"page {page}", "metadata": {"page_number": page}}
+            for page in range(1, pages + 1)
+        ]
+        return SimpleNamespace(json=lambda: elements)
+
+
+def make_pdf(path, pages=2, text="page"):
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    for page in range(1, pages + 1):
+        pdf.drawString(72, 720, f"{text} {page}")
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def make_processor(tmp_path, offline=False, pages_per_range=None):
+    cache = ResponseCache(str(tmp_path / "cache" / "unstructured.db"), compress=True)
+    return UnstructuredProcessor(
+        "key",
+        "https://api.example.com/general/v0/general",
+        pages_per_range=pages_per_range,
+        transport=FakeTransport(),
+        cache=cache,
+        offline=offline
+    )
+
+
+def test_repeated_partitions_are_served_from_the_cache(tmp_path):
+    pdf_path = make_pdf(tmp_path / "doc.pdf")
+    processor = make_processor(tmp_path)
+
+    first = processor.partition_pdf(pdf_path, {"strategy": "hi_res"})
+    second = processor.partition_pdf(pdf_path, {"strategy": "hi_res"})
+
+    assert second == first
+    assert len(processor.transport.uploads) == 1
+    assert processor.metrics.counter_value("unstructured_cache_hits_total") == 1
+
+
+def test_changed_inputs_miss_the_cache(tmp_path):
+    pdf_path = make_pdf(tmp_path / "doc.pdf")
+    processor = make_processor(tmp_path)
+    processor.partition_pdf(pdf_path, {"strategy": "hi_res"})
+
+    processor.partition_pdf(pdf_path, {"strategy": "fast"})
+    processor.partition_pdf(make_pdf(tmp_path / "doc.pdf", text="revised"), {"strategy": "hi_res"})
+
+    assert len(processor.transport.uploads) == 3
+    split = make_processor(tmp_path, pages_per_range=1)
+    split.partition_pdf(pdf_path, {"strategy": "hi_res"})
+    assert len(split.transport.uploads) == 2
+
+
+def test_offline_processor_only_reads_the_cache(tmp_path):
+    pdf_path = make_pdf(tmp_path / "doc.pdf")
+    make_processor(tmp_path).process_pdf_no_chunking(pdf_path, str(tmp_path / "online.json"))
+    offline = make_processor(tmp_path, offline=True)
+
+    offline.process_pdf_no_chunking(pdf_path, str(tmp_path / "offline.json"))
+    with pytest.raises(CacheMissError):
+        offline.partition_pdf(pdf_path, {"strategy": "fast"})
+
+    assert offline.transport.uploads == []
+    assert json.loads((tmp_path / "offline.json").read_text()) == json.loads((tmp_path / "online.json").read_text())
@@ -0,0 +1,88 @@
+"""
+Generation and validation on separate worker pools, against a fake client.
+"""
+import json
+import threading
+import time
+import pytest
+from fakes import FakeChatClient, fake_completion
+from src.generators.pipeline import SlidePipeline
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.config import StageConfig
+
+
+class StageTracker:
+    """Answer requests slowly while recording how many of each stage run at once."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = {"generation": 0, "validation": 0}
+        self.max_active = dict(self.active)
+        self.overlapped = False
+        self.lock = threading.Lock()
+
+    def __call__(self, body):
+        stage = "validation" if len(body["messages"]) > 2 else "generation"
+        with self.lock:
+            self.active[stage] += 1
+            self.max_active[stage] = max(self.max_active[stage], self.active[stage])
+            self.overlapped = self.overlapped or all(self.active.values())
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[stage] -= 1
+        return fake_completion(body)
+
+
+def test_stages_run_on_their_own_pools(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    input_file = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(9)]
+    input_file.write_text(json.dumps(elements), encoding="utf-8")
+    tracker = StageTracker(delay=0.02)
+    generator = PresentationGenerator(
+        output_dir=str(tmp_path / "output"),
+        generation_stage=StageConfig(workers=3),
+        validation_stage=StageConfig(workers=2)
+    )
+    generator.client = FakeChatClient(answer=tracker)
+
+    with open(generator.run(str(input_file)), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert [entry["element_id"] for entry in results] == [f"e{i}" for i in range(9)]
+    assert all(entry["result"]["groundedness_score"] == 8 for entry in results)
+    assert tracker.max_active == {"generation": 3, "validation": 2}
+    assert tracker.overlapped
+    assert generator.pipeline_stats["generation"]["completed"] == 9
+    assert generator.pipeline_stats["validation"]["completed"] == 9
+
+
+def test_failure_stops_new_work():
+    def generate(element):
+        if element["id"] == 3:
+            raise RuntimeError("generation failed")
+        return element["id"]
+
+    def validate(element, slide):
+        time.sleep(0.01)
+        return {"id": slide}
+
+    pipeline = SlidePipeline(generate, validate, generation_workers=1, validation_workers=1, queue_size=1)
+    results = []
+
+    with pytest.raises(RuntimeError):
+        pipeline.run([{"id": i} for i in range(20)], results.append)
+
+    # Slides validated before the failure are delivered, nothing after it is
+    assert 1 <= len(results) <= 3
+    assert results == [{"id": i} for i in range(len(results))]
+    assert pipeline.stats()["generation"]["completed"] == 3
+
+
+def test_bottleneck_is_the_busiest_stage():
+    pipeline = SlidePipeline(lambda element: element, lambda element, slide: time.sleep(0.01) or slide)
+
+    pipeline.run([{"id": i} for i in range(5)], lambda result: None)
+
+    assert pipeline.bottleneck() == "validation"
+    assert pipeline.stats()["validation"]["utilization"] > pipeline.stats()["generation"]["utilization"]
@@ -0,0 +1,68 @@
+"""
+Model routing and 429 fallback with a fake chat client.
+"""
+from fakes import FakeChatClient
+from src.generators.presentation_generator import SLIDE_CONTENT_FORMAT, PresentationGenerator
+from src.generators.routing import ModelRouter
+from src.utils.cache import ResponseCache
+from src.utils.config import ModelRoute
+
+
+def make_generator(tmp_path, monkeypatch, client, router, cache=None):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"), cache=cache, router=router)
+    generator.client = client
+    return generator
+
+
+def test_router_prefers_matching_routes_then_falls_back():
+    router = ModelRouter(
+        [ModelRoute(model="gpt-4o-mini", stages=["validation"])],
+        default_model="gpt-4o",
+        fallback_models=["gpt-4o-mini"]
+    )
+
+    assert router.choose("validation", 100) == ["gpt-4o-mini", "gpt-4o"]
+    assert router.choose("generation", 100) == ["gpt-4o", "gpt-4o-mini"]
+
+    router.record_rate_limited("gpt-4o", "generation", "gpt-4o-mini")
+
+    # A model cooling down after a 429 is tried last
+    assert router.choose("generation", 100) == ["gpt-4o-mini", "gpt-4o"]
+    assert router.stats()["gpt-4o"]["rate_limited"] == 1
+
+
+def test_fallback_answer_is_cached_under_the_model_that_answered(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    client = FakeChatClient(rate_limited={"gpt-4o"})
+    router = ModelRouter([], default_model="gpt-4o", fallback_models=["gpt-4o-mini"])
+    generator = make_generator(tmp_path, monkeypatch, client, router, cache)
+
+    slide = generator.generate_slide("topic")
+
+    assert slide["model"] == "gpt-4o-mini"
+    assert [model for model, _ in client.requests] == ["gpt-4o", "gpt-4o-mini"]
+    assert router.stats()["gpt-4o"]["fallbacks"] == 1
+
+    # A rerun is served from the cache and still reports the fallback model
+    rerun_client = FakeChatClient()
+    rerun_router = ModelRouter([], default_model="gpt-4o", fallback_models=["gpt-4o-mini"])
+    rerun = make_generator(tmp_path, monkeypatch, rerun_client, rerun_router, cache)
+
+    assert rerun.generate_slide("topic") == slide
+    assert rerun_client.requests == []
+
+    # Nothing was stored under the preferred model, which did not answer
+    messages = generator.generation_messages("topic")
+    assert generator._cache_lookup(generator._cache_key(messages, SLIDE_CONTENT_FORMAT, None, "gpt-4o")) is None
+
+
+def test_results_record_the_generating_model(tmp_path, monkeypatch):
+    client = FakeChatClient(rate_limited={"gpt-4o"})
+    router = ModelRouter([], default_model="gpt-4o", fallback_models=["gpt-4o-mini"])
+    generator = make_generator(tmp_path, monkeypatch, client, router)
+
+    result = generator.process_element({"element_id": "e0", "text": "topic"})
+
+    assert result["result"]["model"] == "gpt-4o-mini"
+    assert router.stats()["gpt-4o-mini"]["scores"]["count"] == 1
@@ -0,0 +1,64 @@
+"""
+Streamed generation with field budgets, against a fake streaming client.
+"""
+import json
+import pytest
+from fakes import FakeChatClient, fake_completion
+from src.generators.presentation_generator import PresentationGenerator
+
+
+def long_dialogue_for_topic_1(body):
+    content = json.loads(fake_completion(body))
+    if "dialogue" in content and "topic 1\n" in body["messages"][-1]["content"]:
+        content["dialogue"] = "Let's talk at length " * 20
+    return json.dumps(content)
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "document.json"
+    elements = [{"element_id": f"e{i}", "text": f"topic {i}"} for i in range(3)]
+    path.write_text(json.dumps(elements), encoding="utf-8")
+    return str(path)
+
+
+def make_generator(tmp_path, monkeypatch, client, **options):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(
+        output_dir=str(tmp_path / "output"),
+        stream_generation=True,
+        field_budgets={"dialogue": 100},
+        **options
+    )
+    generator.client = client
+    return generator
+
+
+@pytest.mark.parametrize("options", [{"max_concurrency": 2}, {"prescorer": None, "candidates": 2}])
+def test_element_over_budget_does_not_stop_the_others(tmp_path, monkeypatch, input_file, options):
+    client = FakeChatClient(answer=long_dialogue_for_topic_1)
+    generator = make_generator(tmp_path, monkeypatch, client, **options)
+
+    with open(generator.run(input_file), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert [entry["element_id"] for entry in results] == ["e0", "e1", "e2"]
+    assert results[1]["error"] == "field_budget"
+    assert "result" not in results[1]
+    assert results[0]["result"]["title"] == "Title of topic 0"
+    assert results[2]["result"]["groundedness_score"] == 8
+    assert generator.metrics.counter_value("elements_failed_total", error="field_budget") == 1
+
+
+def test_resumed_run_retries_failed_elements(tmp_path, monkeypatch, input_file):
+    generator = make_generator(tmp_path, monkeypatch, FakeChatClient(answer=long_dialogue_for_topic_1))
+    generator.run(input_file)
+
+    client = FakeChatClient()
+    generator = make_generator(tmp_path, monkeypatch, client)
+    streamed = list(generator.stream_run(input_file, resume=True))
+
+    # Only the failed element is generated and validated again
+    assert len(client.requests) == 2
+    assert [entry["element_id"] for entry in streamed] == ["e0", "e1", "e2"]
+    assert all("result" in entry for entry in streamed)
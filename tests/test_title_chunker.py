@@ -0,0 +1,61 @@
+"""
+Local chunking by title, compared with the chunks the Unstructured API returns.
+"""
+import json
+from src.processors.title_chunker import chunk_by_title, decode_orig_elements
+
+NO_CHUNKING = "example_data/processed_input/no_chunking.json"
+API_CHUNKING = "example_data/processed_input/chunking_big.json"
+
+
+def element(kind, text, page=1):
+    return {"type": kind, "element_id": text, "text": text, "metadata": {"page_number": page, "filename": "doc.pdf"}}
+
+
+def test_example_partition_chunks_like_the_api():
+    with open(NO_CHUNKING, encoding="utf-8") as f:
+        elements = json.load(f)
+    with open(API_CHUNKING, encoding="utf-8") as f:
+        expected = json.load(f)
+
+    # The parameters run.py sends to the API for chunking_big.json
+    chunks = chunk_by_title(elements, max_characters=120000, new_after_n_chars=100000, combine_text_under_n_chars=10000)
+
+    assert [chunk["text"] for chunk in chunks] == [chunk["text"] for chunk in expected]
+    for chunk, api_chunk in zip(chunks, expected):
+        assert chunk["metadata"]["page_number"] == api_chunk["metadata"]["page_number"]
+        assert len(decode_orig_elements(chunk["metadata"]["orig_elements"])) == \
+            len(decode_orig_elements(api_chunk["metadata"]["orig_elements"]))
+
+
+def test_sections_start_at_titles_and_small_ones_are_combined():
+    elements = [
+        element("Title", "Intro"),
+        element("NarrativeText", "a" * 30),
+        element("PageBreak", ""),
+        element("Title", "Next", page=2),
+        element("NarrativeText", "b" * 30, page=2),
+        element("Title", "Last", page=3),
+        element("NarrativeText", "c" * 60, page=3),
+    ]
+
+    chunks = chunk_by_title(elements, max_characters=100, combine_text_under_n_chars=50)
+
+    assert [chunk["text"] for chunk in chunks] == [
+        "Intro\n\n" + "a" * 30 + "\n\nNext\n\n" + "b" * 30,
+        "Last\n\n" + "c" * 60
+    ]
+    assert [chunk["metadata"]["page_number"] for chunk in chunks] == [1, 3]
+    assert [e["text"] for e in decode_orig_elements(chunks[0]["metadata"]["orig_elements"])] == \
+        ["Intro", "a" * 30, "Next", "b" * 30]
+
+
+def test_long_element_is_split_at_whitespace():
+    text = " ".join(["word"] * 50)
+
+    chunks = chunk_by_title([element("NarrativeText", text)], max_characters=42, include_orig_elements=False)
+
+    assert all(len(chunk["text"]) <= 42 for chunk in chunks)
+    assert " ".join(chunk["text"] for chunk in chunks) == text
+    assert len({chunk["element_id"] for chunk in chunks}) == len(chunks)
+    assert "orig_elements" not in chunks[0]["metadata"]
@@ -0,0 +1,109 @@
+"""
+Retries of the HTTP transport, against a scripted stand-in for the session.
+"""
+import gzip
+import pytest
+import requests
+from src.utils import transport as transport_module
+from src.utils.transport import HttpTransport, TransportError
+
+URL = "https://api.example.com/general/v0/general"
+
+
+def response(status, headers=None, body=b"{}"):
+    result = requests.Response()
+    result.status_code = status
+    result.headers.update(headers or {})
+    result._content = body
+    return result
+
+
+class ScriptedSession:
+    """Answers sent requests with the next scripted response, or raises it if it is an exception."""
+
+    def __init__(self, session, outcomes):
+        self.outcomes = list(outcomes)
+        self.sent = []
+        self.prepare_request = session.prepare_request
+
+    def send(self, prepared, timeout):
+        self.sent.append(prepared)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(transport_module.time, "sleep", recorded.append)
+    return recorded
+
+
+def make_transport(outcomes, **options):
+    transport = HttpTransport(**options)
+    transport.session = ScriptedSession(transport.session, outcomes)
+    return transport
+
+
+def test_retry_after_is_honoured(sleeps):
+    transport = make_transport([
+        response(429, {"Retry-After": "3"}),
+        response(503, {"Retry-After": "120"}),
+        response(200, body=b'{"ok": true}')
+    ], backoff_max=60.0)
+
+    result = transport.post(URL, data={"strategy": "fast"}, files={"files": ("doc.pdf", b"%PDF")})
+
+    assert result.json() == {"ok": True}
+    assert sleeps == [3.0, 60.0]
+    assert transport.retries == 2
+    assert len(transport.session.sent) == 3
+    assert transport.metrics.counter_value("http_retries_total", host="api.example.com") == 2
+    assert transport.metrics.counter_value("http_requests_total", host="api.example.com", status=200) == 1
+
+
+def test_connection_errors_back_off_with_jitter(sleeps):
+    transport = make_transport([
+        requests.exceptions.ConnectionError("reset"),
+        requests.exceptions.Timeout("slow"),
+        response(200)
+    ], backoff_base=1.0)
+
+    transport.post(URL, json={"a": 1})
+
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0
+
+
+def test_client_errors_are_not_retried(sleeps):
+    transport = make_transport([response(400, body=b"bad request")])
+
+    with pytest.raises(TransportError) as error:
+        transport.post(URL, data={})
+
+    assert error.value.status_code == 400
+    assert error.value.body == "bad request"
+    assert sleeps == []
+
+
+def test_persistent_failures_raise_after_the_last_retry(sleeps):
+    transport = make_transport([response(500)] * 3, max_retries=2, backoff_max=0.5)
+
+    with pytest.raises(TransportError) as error:
+        transport.post(URL, data={})
+
+    assert error.value.status_code == 500
+    assert len(sleeps) == 2
+    assert len(transport.session.sent) == 3
+
+
+def test_compressed_bodies_are_resent_on_retry(sleeps):
+    transport = make_transport([response(502), response(200)], compress_requests=True)
+
+    transport.post(URL, json={"text": "x" * 100})
+
+    first, second = transport.session.sent
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(second.body) == gzip.decompress(first.body) == b'{"text": "' + b"x" * 100 + b'"}'
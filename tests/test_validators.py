@@ -0,0 +1,54 @@
+"""
+Local groundedness pre-scoring.
+"""
+import json
+from fakes import FakeChatClient, fake_completion
+from src.generators.presentation_generator import PresentationGenerator
+from src.utils.validators import GroundednessScorer
+
+SOURCE = "Markdown is a lightweight markup language for creating formatted text using a plain-text editor."
+GROUNDED = {
+    "title": "Markdown",
+    "content": "* A lightweight markup language for formatted text",
+    "dialogue": "Markdown is a lightweight markup language for creating formatted text using a plain-text editor."
+}
+
+
+def test_grounded_and_ungrounded_slides_are_confident():
+    unrelated = {"title": "Cooking", "content": "* Boil pasta in salted water", "dialogue": "Drain it and serve warm."}
+
+    grounded, ungrounded = GroundednessScorer().score([SOURCE, SOURCE], [GROUNDED, unrelated])
+
+    assert grounded["score"] >= 8 and not grounded["uncertain"]
+    assert ungrounded["score"] < 5 and not ungrounded["uncertain"]
+
+
+def test_empty_fields_and_sources_are_uncertain():
+    empty_content = {**GROUNDED, "content": ""}
+    empty_slide = {"title": "", "content": "", "dialogue": ""}
+
+    scores = GroundednessScorer().score([SOURCE, SOURCE, ""], [empty_content, empty_slide, GROUNDED])
+
+    assert all(score["uncertain"] for score in scores)
+    assert scores[1]["score"] == 0
+    assert scores[2]["score"] == 0
+
+
+def test_slide_with_empty_content_goes_to_the_llm_validator(tmp_path, monkeypatch):
+    def empty_content(body):
+        content = json.loads(fake_completion(body))
+        if "content" in content:
+            content = {**GROUNDED, "content": ""}
+        return json.dumps(content)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    generator = PresentationGenerator(output_dir=str(tmp_path / "output"), prescorer=GroundednessScorer())
+    generator.client = FakeChatClient(answer=empty_content)
+    input_file = tmp_path / "document.json"
+    input_file.write_text(json.dumps([{"element_id": "e0", "text": SOURCE}]), encoding="utf-8")
+
+    with open(generator.run(str(input_file)), encoding="utf-8") as f:
+        results = json.load(f)
+
+    assert results[0]["result"]["validated_by"] == "llm"
+    assert len(generator.client.requests) == 2